@@ -0,0 +1,159 @@
+"""
+Variantes async (ASGI) de vistas de solo lectura de DRF.
+
+DRF no ejecuta vistas async, así que estas vistas son de Django y toman de
+la vista DRF en `view_class` el queryset, los filtros, el serializer, los
+permisos y la paginación; la respuesta es la misma. El conteo, las filas de
+values() y las búsquedas por llave usan el ORM async; los serializers que
+necesitan instancias (relaciones anidadas o cargadas bajo demanda) se
+ejecutan con sync_to_async.
+
+En Django 5.2 el ORM async todavía ejecuta cada consulta en un hilo (uno por
+petición), así que para lecturas que solo esperan a la base de datos no hay
+ahorro de hilos ni más peticiones por segundo que con WSGI (ver
+benchmarks/async_views.py). Sirven para no bloquear el servidor ASGI que
+también atiende vistas que esperan a servicios externos o mantienen
+conexiones abiertas.
+
+Aceptan GET y HEAD (las subclases pueden agregar otros métodos) con JWT, o
+sin autenticación si los permisos de la vista lo permiten, y aplican los
+throttles de la vista. Se sirven con un servidor ASGI, p. ej.:
+
+    uvicorn ascendya.asgi:application --workers 4
+"""
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from django.core.paginator import InvalidPage
+from django.http import HttpResponse
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.request import Request
+from rest_framework.views import exception_handler
+
+from ascendya.renderers import ORJSONRenderer
+from ascendya.serializers import represent_values, values_plan
+from users.authentication import AsyncJWTAuthentication
+
+
+class AsyncAPIView(View):
+    """
+    Base de las vistas async: autentica, revisa permisos y renderiza la
+    respuesta o el error como lo haría la vista DRF `view_class`
+    """
+    view_class = None
+    http_method_names = ['get', 'head']
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # Como en DRF: la autenticación es por JWT, sin cookies de sesión
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def get(self, request, *args, **kwargs):
+        return await self.handle(request, args, kwargs)
+
+    async def handle(self, request, args, kwargs):
+        authenticator = self.get_authenticator()
+        try:
+            view = await self.initialize(authenticator, request, args, kwargs)
+            return await self.respond(view)
+        except exceptions.APIException as exc:
+            return self.handle_exception(exc, authenticator, request)
+
+    def get_authenticator(self):
+        """
+        La autenticación JWT de `view_class` (p. ej. la de lecturas sin
+        consulta del usuario), o la que carga al usuario de la base de datos
+        """
+        for authentication in self.view_class.authentication_classes:
+            if issubclass(authentication, AsyncJWTAuthentication):
+                return authentication()
+        return AsyncJWTAuthentication()
+
+    async def initialize(self, authenticator, request, args, kwargs):
+        """
+        Instancia de `view_class` con el usuario autenticado, lista para
+        armar su queryset y serializer
+        """
+        auth = await authenticator.aauthenticate(request)
+        parsers = [parser() for parser in self.view_class.parser_classes]
+        drf_request = Request(request, parsers=parsers, authenticators=())
+        drf_request.user, drf_request.auth = auth or (AnonymousUser(), None)
+
+        view = self.view_class(request=drf_request, args=args, kwargs=kwargs, format_kwarg=None)
+        view.headers = {}
+        for permission in view.get_permissions():
+            if not permission.has_permission(drf_request, view):
+                if auth is None:
+                    raise exceptions.NotAuthenticated()
+                raise exceptions.PermissionDenied()
+        for throttle in view.get_throttles():
+            if not throttle.allow_request(drf_request, view):
+                raise exceptions.Throttled(throttle.wait())
+        return view
+
+    async def respond(self, view):
+        return self.render(await self.get_data(view))
+
+    async def get_data(self, view):
+        raise NotImplementedError
+
+    def render(self, data, status=200):
+        return HttpResponse(
+            ORJSONRenderer().render(data), status=status, content_type='application/json'
+        )
+
+    def handle_exception(self, exc, authenticator, request):
+        response = exception_handler(exc, {})
+        rendered = self.render(response.data, status=response.status_code)
+        # Retry-After de los throttles, p. ej.
+        for name, value in response.items():
+            if name != 'Content-Type':
+                rendered[name] = value
+        if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+            rendered['WWW-Authenticate'] = authenticator.authenticate_header(request)
+        return rendered
+
+
+class AsyncListView(AsyncAPIView):
+    """
+    Variante async de un listado con PageNumberPagination. Con un serializer
+    plano las filas se leen con values() como en ValuesListMixin.
+    """
+    async def get_data(self, view):
+        queryset = view.filter_queryset(view.get_queryset())
+        plan = values_plan(view.get_serializer(), queryset)
+        paginator = view.paginator
+        if not isinstance(paginator, PageNumberPagination):
+            raise TypeError(f'{self.view_class.__name__} debe usar PageNumberPagination')
+
+        page = await self.get_page(paginator, view.request, queryset)
+        bottom = (page.number - 1) * page.paginator.per_page
+        top = bottom + page.paginator.per_page
+        if plan is not None:
+            keys = {key for name, key, convert in plan}
+            rows = queryset.prefetch_related(None).values(*keys)[bottom:top]
+            data = represent_values([row async for row in rows], plan)
+        else:
+            data = await sync_to_async(
+                lambda: view.get_serializer(list(queryset[bottom:top]), many=True).data
+            )()
+        return paginator.get_paginated_response(data).data
+
+    async def get_page(self, paginator, request, queryset):
+        """
+        La página pedida, contada con el ORM async; sus filas se leen aparte
+        """
+        django_paginator = paginator.django_paginator_class([], paginator.get_page_size(request))
+        django_paginator.count = await queryset.acount()
+        page_number = paginator.get_page_number(request, django_paginator)
+        try:
+            paginator.page = django_paginator.page(page_number)
+        except InvalidPage as exc:
+            raise exceptions.NotFound(paginator.invalid_page_message.format(
+                page_number=page_number, message=str(exc)
+            ))
+        paginator.request = request
+        return paginator.page
@@ -0,0 +1,123 @@
+"""
+Cliente del modelo de lenguaje.
+
+Habla la API REST de Gemini (generateContent y streamGenerateContent) en
+AI_MODEL_URL, así que en pruebas y desarrollo se puede apuntar a cualquier
+servidor que responda el mismo formato. Usa urllib para no agregar
+dependencias; la llave va en el encabezado x-goog-api-key y no en la URL,
+para que no quede en los logs.
+"""
+
+import http.client
+import json
+import urllib.error
+import urllib.request
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+
+class ModelError(Exception):
+    """
+    El modelo no respondió, respondió con error o con un formato inesperado
+    """
+
+
+def user_message(text):
+    return {'role': 'user', 'parts': [{'text': text}]}
+
+
+def post(method, body, timeout=None):
+    """
+    POST a `AI_MODEL_URL:<method>`; regresa la respuesta abierta
+    """
+    headers = {'Content-Type': 'application/json'}
+    if settings.AI_API_KEY:
+        headers['x-goog-api-key'] = settings.AI_API_KEY
+    request = urllib.request.Request(
+        f'{settings.AI_MODEL_URL}:{method}', data=json.dumps(body).encode(),
+        headers=headers, method='POST'
+    )
+    try:
+        return urllib.request.urlopen(request, timeout=timeout or settings.AI_TIMEOUT)
+    except urllib.error.HTTPError as exc:
+        raise ModelError(f'El modelo respondió {exc.code}') from exc
+    except (urllib.error.URLError, http.client.HTTPException, OSError) as exc:
+        # URLError y TimeoutError son OSError; RemoteDisconnected y
+        # ConnectionResetError salen de getresponse()
+        raise ModelError(f'No se pudo contactar al modelo: {exc}') from exc
+
+
+def candidate_text(payload):
+    try:
+        parts = payload['candidates'][0]['content']['parts']
+    except (KeyError, IndexError, TypeError) as exc:
+        raise ModelError('Respuesta del modelo sin candidatos') from exc
+    return ''.join(part.get('text', '') for part in parts)
+
+
+def request_body(contents, system, generation_config):
+    body = {'contents': contents}
+    if system:
+        body['systemInstruction'] = {'parts': [{'text': system}]}
+    if generation_config:
+        body['generationConfig'] = generation_config
+    return body
+
+
+def generate(contents, system=None, **generation_config):
+    """
+    Texto completo de una respuesta del modelo para `contents` (lista de
+    mensajes con role y parts) con las instrucciones de sistema `system`
+    """
+    body = request_body(contents, system, generation_config)
+    with post('generateContent', body) as response:
+        try:
+            payload = json.load(response)
+        except (ValueError, OSError, http.client.HTTPException) as exc:
+            raise ModelError('Respuesta del modelo ilegible') from exc
+    return candidate_text(payload)
+
+
+def event_text(line):
+    """
+    Texto de una línea `data: {...}` del stream; vacío para el resto de las
+    líneas y para los eventos sin texto (p. ej. el de finishReason)
+    """
+    if not line.startswith(b'data:'):
+        return ''
+    try:
+        return candidate_text(json.loads(line[5:]))
+    except ValueError as exc:
+        raise ModelError('Evento del modelo ilegible') from exc
+    except ModelError:
+        return ''
+
+
+async def astream(contents, system=None, **generation_config):
+    """
+    Fragmentos de texto de la respuesta del modelo conforme llegan
+    (streamGenerateContent con server-sent events).
+
+    No hay un cliente HTTP async instalado: la conexión y cada lectura
+    bloqueante corren en el pool de hilos, así que el loop de ASGI sigue
+    libre mientras el modelo genera.
+    """
+    body = request_body(contents, system, generation_config)
+    response = await sync_to_async(post, thread_sensitive=False)(
+        'streamGenerateContent?alt=sse', body
+    )
+    readline = sync_to_async(response.readline, thread_sensitive=False)
+    try:
+        while True:
+            try:
+                line = await readline()
+            except (OSError, http.client.HTTPException) as exc:
+                raise ModelError(f'Se interrumpió la respuesta del modelo: {exc}') from exc
+            if not line:
+                return
+            text = event_text(line.strip())
+            if text:
+                yield text
+    finally:
+        response.close()
@@ -0,0 +1,164 @@
+import hashlib
+
+from django.db.models import Count, Max, Subquery, Value
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+
+from ascendya.serializers import (
+    prune_queryset, represent_values, requested_fields, values_plan
+)
+
+
+class ConditionalGetMixin:
+    """
+    Mixin para ViewSets de catálogo que responde 304 Not Modified en list y
+    retrieve cuando el ETag enviado en If-None-Match sigue vigente.
+
+    El ETag se calcula con una sola consulta: Max(updated_at) y el conteo de
+    filas del modelo y de cada relación en `etag_related`. Cada relación se
+    agrega en su propia subconsulta sobre su tabla, para no multiplicar las
+    filas de unas relaciones por las de otras con JOINs. Con un 304 la
+    respuesta no se serializa.
+    """
+    etag_related = []
+
+    def get_etag_queryset(self):
+        queryset = self.queryset.model._default_manager.all()
+        if self.action == 'retrieve':
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            queryset = queryset.filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        return queryset
+
+    def related_aggregates(self, queryset, related):
+        """
+        Subconsultas con Max(updated_at) y el conteo de las filas de
+        `related` (p. ej. 'path_courses__course') que cuelgan de `queryset`
+        """
+        model = queryset.model
+        lookups = []
+        for name in related.split('__'):
+            field = model._meta.get_field(name)
+            # El camino de regreso: el FK de una relación inversa o el
+            # related_query_name de un FK
+            lookups.append(field.field.name if field.auto_created and not field.concrete
+                           else field.related_query_name())
+            model = field.related_model
+        rows = model._default_manager.filter(
+            **{'__'.join(reversed(lookups)) + '__in': queryset.values('pk')}
+        ).order_by()
+        # Sin GROUP BY: una sola fila con el agregado de todas
+        rows = rows.annotate(group=Value(1)).values('group')
+        return {
+            f'{related}__updated_at': rows.annotate(last=Max('updated_at')).values('last'),
+            f'{related}__total': rows.annotate(total=Count('pk', distinct=True)).values('total'),
+        }
+
+    def get_etag(self):
+        queryset = self.get_etag_queryset().order_by()
+        aggregates = {'updated_at': Max('updated_at'), 'total': Count('pk')}
+        for related in self.etag_related:
+            # Max() de una subconsulta sin correlación: se evalúa una vez
+            aggregates.update({
+                key: Max(Subquery(rows))
+                for key, rows in self.related_aggregates(queryset, related).items()
+            })
+        values = queryset.aggregate(**aggregates)
+
+        # La misma versión de datos se representa distinto por página y formato
+        parts = [self.request.get_full_path(), self.request.accepted_media_type]
+        parts += [f'{key}={values[key]}' for key in sorted(values)]
+        return quote_etag(hashlib.md5('|'.join(parts).encode()).hexdigest())
+
+    def get_conditional(self, handler, request, *args, **kwargs):
+        etag = self.get_etag()
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return not_modified
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            response['ETag'] = etag
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.get_conditional(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_conditional(super().retrieve, request, *args, **kwargs)
+
+
+class SparseQuerysetMixin:
+    """
+    Mixin para vistas con serializers de campos dispersos (ver
+    ascendya/serializers.py): con ?fields= el queryset solo carga las
+    columnas y relaciones que usan los campos pedidos.
+
+    Las anotaciones no se pueden quitar de un queryset; las vistas las
+    agregan solo si `wants_field()` indica que el campo se va a enviar.
+    """
+    def wants_field(self, name):
+        selection = requested_fields(self.request)
+        return selection is None or name in selection[0]
+    
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if requested_fields(self.request) is None:
+            return queryset
+        # El orden de la paginación por cursor se lee de los objetos
+        keep = [name.lstrip('-') for name in getattr(self, 'keyset_ordering', ())]
+        return prune_queryset(queryset, self.get_serializer(), keep)
+
+
+class ValuesRows:
+    """
+    Filas de queryset.values() que la paginación cuenta con el queryset
+    original: su COUNT(*) descarta las anotaciones que no filtran ni ordenan,
+    el de values() las calcularía para todas las filas
+    """
+    def __init__(self, queryset, keys):
+        self.queryset = queryset
+        self.rows = queryset.prefetch_related(None).values(*keys)
+    
+    @property
+    def ordered(self):
+        return self.queryset.ordered
+    
+    def count(self):
+        return self.queryset.count()
+    
+    def __len__(self):
+        return self.count()
+    
+    def __getitem__(self, index):
+        return self.rows[index]
+    
+    def __iter__(self):
+        return iter(self.rows)
+
+
+class ValuesListMixin:
+    """
+    Mixin para listados de solo lectura con serializers planos: arma la
+    respuesta directamente desde queryset.values(), sin instanciar modelos
+    ni pasar cada objeto por el serializer.
+
+    El serializer se consulta una vez por petición para saber qué llave de
+    values() y qué conversión usa cada campo (ver values_plan()); la salida
+    es la misma que la del serializer. Si algún campo necesita la instancia
+    (relaciones anidadas, métodos, propiedades) o la paginación es por
+    cursor, se usa el list() normal.
+    """
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        plan = values_plan(self.get_serializer(), queryset)
+        if plan is None or isinstance(self.paginator, CursorPagination):
+            return super().list(request, *args, **kwargs)
+        
+        rows = ValuesRows(queryset, {key for name, key, convert in plan})
+        page = self.paginate_queryset(rows)
+        data = represent_values(rows if page is None else page, plan)
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
@@ -0,0 +1,19 @@
+from rest_framework.pagination import CursorPagination
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Paginación por cursor (keyset) para listados de alto volumen.
+
+    Filtra a partir de la posición del último elemento en lugar de usar
+    OFFSET y no ejecuta COUNT(*), por lo que el costo de una página no depende
+    de su profundidad. Cada ViewSet define su orden en `keyset_ordering`; el
+    primer campo determina la posición del cursor y el último debe ser único
+    (p. ej. el id) para desempatar. El orden debe estar respaldado por un
+    índice.
+    """
+    def get_ordering(self, request, queryset, view):
+        ordering = getattr(view, 'keyset_ordering', None)
+        if ordering:
+            return tuple(ordering)
+        return super().get_ordering(request, queryset, view)
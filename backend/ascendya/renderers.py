@@ -0,0 +1,59 @@
+"""
+Renderer JSON basado en orjson, con la misma salida que el JSONRenderer de
+DRF para las respuestas de la API.
+
+orjson es opcional: si no está instalado, o la respuesta pide sangría (como
+la API navegable), se usa el JSONRenderer de DRF. Los tipos que orjson no
+conoce (Decimal, textos traducibles, fechas) pasan por el JSONEncoder de
+DRF para que se representen igual. orjson envía NaN e infinito como null;
+si la salida tiene algún null se revisan los números y, si hay alguno no
+finito, se usa el JSONRenderer de DRF, que falla con ValueError como con
+STRICT_JSON (o los envía como NaN e Infinity sin él).
+"""
+
+import math
+from decimal import Decimal
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def all_finite(data):
+    if isinstance(data, (float, Decimal)):
+        return math.isfinite(data)
+    if isinstance(data, dict):
+        return all(all_finite(value) for value in data.values())
+    if isinstance(data, (list, tuple)):
+        return all(all_finite(value) for value in data)
+    return True
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    Renderer JSON con orjson y respaldo en el JSONRenderer de DRF
+    """
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None or self.ensure_ascii or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+
+        ret = orjson.dumps(
+            data, default=self.encoder_class().default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        )
+        if b'null' in ret and not all_finite(data):
+            return super().render(data, accepted_media_type, renderer_context)
+        # Igual que DRF, \u2028 y \u2029 se escapan para que la salida sea
+        # JavaScript válido
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
@@ -0,0 +1,299 @@
+"""
+Campos dispersos (?fields=) y expansión de relaciones (?expand=) para los
+serializers de la API.
+
+Sin `fields` la respuesta no cambia. Con `fields` solo se envían los campos
+listados, separados por comas; los campos de una relación anidada se piden
+con punto:
+
+    /api/learning/user-learning-paths/?fields=id,progreso,path.nombre
+
+Una relación anidada listada sin subcampos se envía como su llave primaria
+(o lista de llaves), a menos que también aparezca en `expand`:
+
+    ?fields=id,path            ->  {"id": 1, "path": 3}
+    ?fields=id,path&expand=path  ->  {"id": 1, "path": {...}}
+
+Los nombres desconocidos se ignoran. Solo aplica a GET, HEAD y OPTIONS; en
+escrituras los campos de entrada no cambian.
+
+`prune_queryset()` recorta además el queryset de la vista (columnas con
+defer(), select_related y prefetch_related) a lo que usan los campos
+pedidos; lo aplica `ascendya.mixins.SparseQuerysetMixin`.
+
+`values_plan()` y `represent_values()` arman la misma representación de un
+serializer plano directamente desde queryset.values(), sin instancias de
+modelo; los usa `ascendya.mixins.ValuesListMixin`.
+"""
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+
+def parse_fields(value):
+    """
+    Convierte 'id,path.nombre' en {'id': {}, 'path': {'nombre': {}}}
+    """
+    tree = {}
+    for name in value.split(','):
+        node = tree
+        for part in name.strip().split('.'):
+            if part:
+                node = node.setdefault(part, {})
+    return tree
+
+
+def requested_fields(request):
+    """
+    Regresa (fields, expand) como árboles, o None si la petición no pide
+    campos dispersos
+    """
+    if request is None or request.method not in SAFE_METHODS:
+        return None
+    fields = request.query_params.get('fields', '')
+    if not fields.strip():
+        return None
+    return parse_fields(fields), parse_fields(request.query_params.get('expand', ''))
+
+
+def is_nested(field):
+    return isinstance(field, serializers.BaseSerializer)
+
+
+def collapse(field):
+    # Una relación no expandida se envía como llave primaria
+    if isinstance(field, serializers.ListSerializer):
+        return serializers.PrimaryKeyRelatedField(many=True, read_only=True, source=field.source)
+    return serializers.PrimaryKeyRelatedField(read_only=True, source=field.source)
+
+
+class SparseFieldsMixin:
+    """
+    Mixin para serializers que responde solo con los campos de ?fields= y
+    expande las relaciones de ?expand=.
+
+    `Meta.sparse_sources` indica qué usan los campos cuyo origen no es una
+    columna o relación del modelo (métodos, propiedades, anotaciones), para
+    que `prune_queryset()` pueda recortar el queryset; sin esa información
+    el queryset de ese nivel se deja completo.
+    """
+    def get_sparse_path(self):
+        path = []
+        node = self
+        while node.parent is not None:
+            if node.field_name:
+                path.append(node.field_name)
+            node = node.parent
+        return path[::-1]
+
+    def get_sparse_selection(self):
+        """
+        (fields, expand) para este nivel; fields vacío significa todos
+        """
+        selection = requested_fields(self.context.get('request'))
+        if selection is None:
+            return None
+        fields, expand = selection
+        for name in self.get_sparse_path():
+            fields = fields.get(name, {})
+            expand = expand.get(name, {})
+        return fields, expand
+
+    def get_fields(self):
+        fields = super().get_fields()
+        selection = self.get_sparse_selection()
+        if selection is None or not selection[0]:
+            return fields
+
+        requested, expand = selection
+        sparse_fields = {}
+        for name, field in fields.items():
+            if name not in requested:
+                continue
+            if is_nested(field) and not requested[name] and name not in expand:
+                field = collapse(field)
+            sparse_fields[name] = field
+        return sparse_fields
+
+
+def flatten_select(name, tree):
+    if not tree:
+        return [name]
+    return [f'{name}__{lookup}' for child, subtree in tree.items()
+            for lookup in flatten_select(child, subtree)]
+
+
+def field_sources(serializer, field):
+    sparse_sources = getattr(getattr(serializer, 'Meta', None), 'sparse_sources', {})
+    if field.field_name in sparse_sources:
+        return sparse_sources[field.field_name]
+    if not field.source_attrs:
+        return None
+    return [field.source_attrs[0]]
+
+
+def prune_queryset(queryset, serializer, keep=()):
+    """
+    Difiere las columnas y quita los select_related/prefetch_related que no
+    usan los campos de `serializer`. `keep` son columnas que deben cargarse
+    aunque el serializer no las use (orden, llave de la relación padre).
+    """
+    if isinstance(serializer, serializers.ListSerializer):
+        serializer = serializer.child
+    if not isinstance(serializer, SparseFieldsMixin):
+        return queryset
+    selection = serializer.get_sparse_selection()
+    if selection is None or not selection[0]:
+        return queryset
+
+    opts = queryset.model._meta
+    columns = set(keep)
+    columns.update(name.lstrip('-') for name in queryset.query.order_by if isinstance(name, str))
+    columns.update(name.lstrip('-') for name in opts.ordering if isinstance(name, str))
+    joined = {}
+    for field in serializer.fields.values():
+        sources = field_sources(serializer, field)
+        if sources is None:
+            # Origen desconocido (método o propiedad): no se recorta este nivel
+            return queryset
+        for source in sources:
+            try:
+                model_field = opts.get_field(source)
+            except FieldDoesNotExist:
+                if source in queryset.query.annotations:
+                    continue
+                return queryset
+            if model_field.concrete:
+                columns.add(source)
+            # Una llave foránea como llave primaria no necesita el objeto relacionado
+            pk_only = (
+                isinstance(field, serializers.PrimaryKeyRelatedField)
+                and len(field.source_attrs) == 1
+            )
+            if model_field.is_relation and not pk_only:
+                joined[source] = field if is_nested(field) else None
+
+    select = queryset.query.select_related
+    if isinstance(select, dict):
+        lookups = [
+            lookup for name, tree in select.items() if name in joined
+            for lookup in flatten_select(name, tree)
+        ]
+        queryset = queryset.select_related(None)
+        if lookups:
+            queryset = queryset.select_related(*lookups)
+
+    prefetches = []
+    for lookup in queryset._prefetch_related_lookups:
+        through = lookup.prefetch_through if isinstance(lookup, Prefetch) else lookup
+        name = through.split('__')[0]
+        if name not in joined:
+            continue
+        nested = joined[name]
+        if nested is not None and '__' not in through:
+            related = opts.get_field(name)
+            inner = lookup.queryset if isinstance(lookup, Prefetch) else None
+            if inner is None:
+                inner = related.related_model._default_manager.all()
+            # Las relaciones inversas necesitan la llave hacia el padre
+            parent_key = [related.field.name] if related.one_to_many else []
+            if not related.many_to_many:
+                lookup = Prefetch(
+                    through, queryset=prune_queryset(inner, nested, parent_key),
+                    to_attr=getattr(lookup, 'to_attr', None)
+                )
+        prefetches.append(lookup)
+    queryset = queryset.prefetch_related(None)
+    if prefetches:
+        queryset = queryset.prefetch_related(*prefetches)
+
+    deferred = [
+        field.name for field in opts.concrete_fields
+        if not field.primary_key and field.name not in columns
+        and field.attname not in columns
+    ]
+    return queryset.defer(*deferred) if deferred else queryset
+
+
+# Campos cuya representación es el mismo valor que regresa values()
+IDENTITY_REPRESENTATIONS = {
+    serializers.CharField.to_representation,
+    serializers.IntegerField.to_representation,
+    serializers.BooleanField.to_representation,
+    serializers.ChoiceField.to_representation,
+}
+
+
+def values_key(opts, source_attrs, annotations):
+    """
+    Llave de values() para `source_attrs`, o None si el origen no es una
+    columna alcanzable por llaves foráneas obligatorias
+    """
+    if len(source_attrs) == 1 and source_attrs[0] in annotations:
+        return source_attrs[0]
+    for position, attr in enumerate(source_attrs):
+        try:
+            field = opts.get_field(attr)
+        except FieldDoesNotExist:
+            return None
+        if not field.concrete or field.many_to_many:
+            return None
+        if position < len(source_attrs) - 1:
+            # Con una llave nula DRF omitiría el campo en lugar de enviar null
+            if not field.many_to_one or field.null:
+                return None
+            opts = field.related_model._meta
+    return '__'.join(source_attrs)
+
+
+def values_plan(serializer, queryset):
+    """
+    Regresa [(campo, llave de values(), conversión)] para armar la
+    representación de `serializer` desde queryset.values(), o None si algún
+    campo necesita la instancia del modelo. La conversión es None cuando el
+    valor se envía tal cual.
+    """
+    opts = queryset.model._meta
+    annotations = queryset.query.annotations
+    plan = []
+    for field in serializer._readable_fields:
+        if isinstance(field, serializers.SerializerMethodField):
+            # Solo los métodos que regresan una anotación (p. ej. los conteos)
+            sources = field_sources(serializer, field) or []
+            if len(sources) != 1 or sources[0] not in annotations:
+                return None
+            plan.append((field.field_name, sources[0], None))
+            continue
+        if is_nested(field) or isinstance(field, serializers.ManyRelatedField):
+            return None
+        if isinstance(field, serializers.RelatedField):
+            if not isinstance(field, serializers.PrimaryKeyRelatedField) or field.pk_field:
+                return None
+            convert = None
+        elif type(field).to_representation in IDENTITY_REPRESENTATIONS:
+            convert = None
+        else:
+            convert = field.to_representation
+        key = values_key(opts, field.source_attrs, annotations)
+        if key is None:
+            return None
+        plan.append((field.field_name, key, convert))
+    return plan
+
+
+def represent_values(rows, plan):
+    """
+    Arma la representación de cada fila de values() como lo haría el
+    serializer, incluido None sin convertir
+    """
+    return [
+        {
+            name: value if convert is None or value is None else convert(value)
+            for name, value, convert in (
+                (name, row[key], convert) for name, key, convert in plan
+            )
+        }
+        for row in rows
+    ]
@@ -10,8 +10,12 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+from importlib.util import find_spec
 from pathlib import Path
 
+from decouple import config
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -84,13 +88,149 @@ WSGI_APPLICATION = "ascendya.wsgi.application"
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
+# SQLite por defecto. Con DB_ENGINE=postgresql se usa PostgreSQL con psycopg 3
+# (requirements.txt). Para probar contra una base desechable:
+#   docker run --rm -p 5432:5432 -e POSTGRES_PASSWORD=ascendya postgres:16
+#   DB_ENGINE=postgresql DB_PASSWORD=ascendya python manage.py test
+
+DB_ENGINE = config('DB_ENGINE', default='sqlite')
+
+# Ajustes opcionales de SQLite (SQLITE_TUNING=True) para un solo servidor con
+# varios workers. Se aplican a cada conexión nueva:
+# - WAL: las lecturas no esperan a las escrituras y cada commit escribe menos.
+# - synchronous=NORMAL: seguro con WAL; solo sincroniza a disco en checkpoints.
+# - busy_timeout: una escritura espera el candado en lugar de fallar con
+#   "database is locked".
+# - Transacciones IMMEDIATE: toman el candado de escritura al empezar, así que
+#   la espera cubre toda la transacción y no falla al pasar de leer a escribir.
+SQLITE_TUNED_OPTIONS = {
+    "transaction_mode": "IMMEDIATE",
+    "init_command": ";".join([
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        f"PRAGMA busy_timeout={config('SQLITE_BUSY_TIMEOUT', default=5000, cast=int)}",
+        f"PRAGMA mmap_size={config('SQLITE_MMAP_SIZE', default=128 * 1024 * 1024, cast=int)}",
+        # Negativo: tamaño en KiB
+        f"PRAGMA cache_size={-config('SQLITE_CACHE_SIZE_KB', default=32 * 1024, cast=int)}",
+        "PRAGMA temp_store=MEMORY",
+    ]),
+}
 
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+if DB_ENGINE == 'postgresql':
+    # Con DB_POOL cada worker toma conexiones de un pool de psycopg; sin él,
+    # Django conserva una conexión por hilo durante DB_CONN_MAX_AGE segundos.
+    # En ambos casos una conexión caída se detecta antes de usarla.
+    DB_POOL = config('DB_POOL', default=True, cast=bool)
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": config('DB_NAME', default='ascendya'),
+            "USER": config('DB_USER', default='postgres'),
+            "PASSWORD": config('DB_PASSWORD', default=''),
+            "HOST": config('DB_HOST', default='localhost'),
+            "PORT": config('DB_PORT', default='5432'),
+            "CONN_MAX_AGE": 0 if DB_POOL else config('DB_CONN_MAX_AGE', default=60, cast=int),
+            "CONN_HEALTH_CHECKS": True,
+            "OPTIONS": {
+                "connect_timeout": config('DB_CONNECT_TIMEOUT', default=5, cast=int),
+                "sslmode": config('DB_SSLMODE', default='prefer'),
+            },
+        }
     }
-}
+    if DB_POOL:
+        from psycopg_pool import ConnectionPool
+
+        DATABASES["default"]["OPTIONS"]["pool"] = {
+            "min_size": config('DB_POOL_MIN_SIZE', default=2, cast=int),
+            "max_size": config('DB_POOL_MAX_SIZE', default=10, cast=int),
+            # Segundos que una petición espera una conexión libre
+            "timeout": config('DB_POOL_TIMEOUT', default=10, cast=int),
+            "check": ConnectionPool.check_connection,
+        }
+elif DB_ENGINE == 'sqlite':
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": config('DB_NAME', default=str(BASE_DIR / "db.sqlite3")),
+        }
+    }
+    if config('SQLITE_TUNING', default=False, cast=bool):
+        DATABASES["default"]["OPTIONS"] = SQLITE_TUNED_OPTIONS
+else:
+    raise ImproperlyConfigured(f"DB_ENGINE debe ser 'sqlite' o 'postgresql', no {DB_ENGINE!r}")
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Memoria local por defecto; define REDIS_URL para compartir la caché entre workers
+
+REDIS_URL = config('REDIS_URL', default='')
+
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "ascendya",
+        }
+    }
+
+# Segundos que vive en caché el detalle de una universidad
+UNIVERSITY_DETAIL_CACHE_TIMEOUT = config('UNIVERSITY_DETAIL_CACHE_TIMEOUT', default=60 * 15, cast=int)
+
+# Segundos que se acumulan en caché los latidos de las lecciones antes de
+# volcarse a la base de datos, y ventanas sin volcar que se conservan
+HEARTBEAT_FLUSH_INTERVAL = config('HEARTBEAT_FLUSH_INTERVAL', default=60, cast=int)
+HEARTBEAT_RETENTION_WINDOWS = config('HEARTBEAT_RETENTION_WINDOWS', default=60 * 24, cast=int)
+
+# Modelo de lenguaje (API REST de Gemini o un servidor compatible, ver
+# ascendya/llm.py). AI_MODEL_URL es la URL del modelo sin el método.
+AI_MODEL_URL = config(
+    'AI_MODEL_URL',
+    default='https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash'
+)
+AI_API_KEY = config('AI_API_KEY', default='')
+AI_TIMEOUT = config('AI_TIMEOUT', default=30, cast=int)
+
+# Rutas generadas por el modelo: segundos que se reutiliza la ruta de unas
+# mismas respuestas del quiz y entradas de la caché en memoria de cada proceso
+# (ver learning/routes.py)
+AI_ROUTE_CACHE_TIMEOUT = config('AI_ROUTE_CACHE_TIMEOUT', default=60 * 60 * 24 * 7, cast=int)
+AI_ROUTE_CACHE_SIZE = config('AI_ROUTE_CACHE_SIZE', default=1024, cast=int)
+
+# Asistente virtual: mensajes recientes que se envían completos al modelo (los
+# anteriores se resumen) y segundos sin actividad que se conserva cada
+# conversación en caché (ver learning/assistant.py)
+ASSISTANT_HISTORY_MESSAGES = config('ASSISTANT_HISTORY_MESSAGES', default=6, cast=int)
+ASSISTANT_CONVERSATION_TIMEOUT = config(
+    'ASSISTANT_CONVERSATION_TIMEOUT', default=60 * 60 * 24, cast=int
+)
+
+
+# Password hashing
+# https://docs.djangoproject.com/en/5.2/topics/auth/passwords/
+# Argon2 si argon2-cffi está instalado; si no, PBKDF2. El costo de cada uno se
+# ajusta por entorno (0 usa el de Django) y los hashes existentes se
+# actualizan al hasher y costo actuales en el siguiente login (users/hashers.py)
+
+PASSWORD_HASHERS = [
+    "users.hashers.PBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+]
+if find_spec('argon2') is not None:
+    PASSWORD_HASHERS.insert(0, "users.hashers.Argon2PasswordHasher")
+
+PASSWORD_PBKDF2_ITERATIONS = config('PASSWORD_PBKDF2_ITERATIONS', default=0, cast=int)
+ARGON2_TIME_COST = config('ARGON2_TIME_COST', default=0, cast=int)
+ARGON2_MEMORY_COST = config('ARGON2_MEMORY_COST', default=0, cast=int)
+ARGON2_PARALLELISM = config('ARGON2_PARALLELISM', default=0, cast=int)
 
 
 # Password validation
@@ -139,10 +279,32 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    # Las vistas de lectura que no consultan al usuario lo declaran con
+    # STATELESS_READ_AUTHENTICATION (ver users/authentication.py)
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework_simplejwt.authentication.JWTAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
+    # orjson si está instalado; si no, el JSON de DRF (ver ascendya/renderers.py)
+    'DEFAULT_RENDERER_CLASSES': [
+        'ascendya.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'ascendya.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    # Ventana deslizante por IP y por email en los endpoints de login (ver
+    # users/throttles.py)
+    'DEFAULT_THROTTLE_RATES': {
+        'login_ip': config('LOGIN_RATE_IP', default='30/min'),
+        'login_email': config('LOGIN_RATE_EMAIL', default='10/min'),
+        # Generación de rutas con el modelo, por usuario
+        'ai_route': config('AI_ROUTE_RATE', default='30/hour'),
+        # Mensajes al asistente virtual, por usuario
+        'ai_chat': config('AI_CHAT_RATE', default='30/min'),
+    },
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20
 }
@@ -188,11 +350,19 @@ SIMPLE_JWT = {
     
     'JTI_CLAIM': 'jti',
     
+    # Lista negra con caché (ver users/tokens.py)
+    'TOKEN_REFRESH_SERIALIZER': 'users.serializers.CachedTokenRefreshSerializer',
+    'TOKEN_VERIFY_SERIALIZER': 'users.serializers.CachedTokenVerifySerializer',
+    
     'SLIDING_TOKEN_REFRESH_EXP_CLAIM': 'refresh_exp',
     'SLIDING_TOKEN_LIFETIME': timedelta(minutes=60),
     'SLIDING_TOKEN_REFRESH_LIFETIME': timedelta(days=7),
 }
 
+# Segundos que se recuerda en caché que un refresh token no está en la
+# lista negra (ver users/tokens.py)
+JWT_BLACKLIST_MISS_TIMEOUT = config('JWT_BLACKLIST_MISS_TIMEOUT', default=60, cast=int)
+
 # Internationalization - Spanish
 LANGUAGE_CODE = "es-mx"
 TIME_ZONE = "America/Mexico_City"
@@ -0,0 +1,419 @@
+"""
+Utilidades de pruebas para medir el costo de los endpoints de la API.
+
+Incluye un generador de datos con volúmenes realistas, un TestCase base que
+verifica que cada endpoint se mantenga dentro de su presupuesto de consultas
+SQL y de tiempo de respuesta, y un servidor local que responde como el modelo
+de lenguaje (ver ascendya/llm.py).
+
+Variables de entorno:
+    ASCENDYA_BUDGET_SCALE: multiplica el volumen de datos generado (default 1).
+    ASCENDYA_BUDGET_TIME_FACTOR: multiplica los presupuestos de tiempo, útil en
+        máquinas de CI lentas (default 1).
+"""
+
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLResolver, get_resolver
+from rest_framework.test import APIClient
+
+from learning import dashboard, progress, routes
+from learning.models import (
+    LearningPath, Course, Lesson, UserLearningPath,
+    LessonProgress, UserCourseProgress, LearningPathCourse
+)
+from universities.models import University, Program, Scholarship
+from users.models import User
+from users.serializers import CustomTokenObtainPairSerializer
+from vocational.models import VocationalTest, VocationalAnswer, VocationalQuestion, VocationalOption
+
+
+SEED_PASSWORD = 'presupuesto-2025'
+
+# Módulos de URLs que no forman parte de la API pública
+EXCLUDED_URLCONFS = ['rest_framework.urls']
+EXCLUDED_PREFIXES = ['admin/']
+
+
+@dataclass
+class Budget:
+    """
+    Presupuesto de un endpoint.
+
+    `path` y `data` se formatean con los objetos generados por `seed_volume`,
+    p. ej. '/api/learning/courses/{course.pk}/'. `data` también puede ser una
+    función que recibe esos objetos.
+    """
+    path: str
+    queries: int
+    ms: float = 250
+    method: str = 'get'
+    data: object = None
+    auth: bool = True
+    status: tuple = (200,)
+    params: dict = field(default_factory=dict)
+
+
+def get_scale():
+    return float(os.environ.get('ASCENDYA_BUDGET_SCALE', 1))
+
+
+def get_time_factor():
+    return float(os.environ.get('ASCENDYA_BUDGET_TIME_FACTOR', 1))
+
+
+def iter_endpoint_names():
+    """
+    Genera los nombres `<módulo>:<nombre>` de todas las rutas registradas en
+    ascendya/urls.py, sin incluir el admin ni el login de la API navegable.
+    """
+    seen = set()
+
+    def walk(patterns, prefix, module):
+        for pattern in patterns:
+            route = prefix + str(pattern.pattern)
+            if isinstance(pattern, URLResolver):
+                # include('app.urls') guarda el módulo; include(router.urls) una lista
+                urlconf = getattr(pattern.urlconf_name, '__name__', None)
+                if urlconf in EXCLUDED_URLCONFS:
+                    continue
+                if any(route.startswith(excluded) for excluded in EXCLUDED_PREFIXES):
+                    continue
+                submodule = urlconf.split('.')[0] if urlconf else module
+                yield from walk(pattern.url_patterns, route, submodule)
+            elif pattern.name:
+                name = f'{module}:{pattern.name}'
+                if name not in seen:
+                    seen.add(name)
+                    yield name
+
+    yield from walk(get_resolver().url_patterns, '', 'ascendya')
+
+
+def seed_volume(scale=None):
+    """
+    Genera datos con volúmenes similares a producción usando bulk_create.
+
+    Con scale=1 se crean ~1,000 universidades, ~3,000 programas, ~1,000 cursos,
+    ~5,000 lecciones y ~20,000 registros de progreso de lecciones.
+    """
+    scale = get_scale() if scale is None else scale
+
+    def amount(value):
+        return max(1, int(value * scale))
+
+    password = make_password(SEED_PASSWORD)
+    users = User.objects.bulk_create([
+        User(
+            username=f'estudiante{i}', email=f'estudiante{i}@example.com',
+            nombres=f'Nombre{i}', apellidos=f'Apellido{i}', password=password,
+            estado='Jalisco'
+        )
+        for i in range(amount(20))
+    ])
+    staff = User.objects.create(
+        username='staff', email='staff@example.com', nombres='Staff',
+        apellidos='Ascendya', password=password, is_staff=True
+    )
+
+    estados = ['Jalisco', 'Nuevo León', 'Ciudad de México', 'Puebla', 'Yucatán']
+    areas = ['Ingeniería', 'Ciencias de la Salud', 'Educación', 'Artes', 'Negocios']
+    universities = University.objects.bulk_create([
+        University(
+            nombre=f'Universidad {i}', estado=estados[i % len(estados)],
+            tipo='publica' if i % 2 else 'privada',
+            descripcion=f'Descripción de la universidad {i} con programas de educación'
+        )
+        for i in range(amount(1000))
+    ])
+    Program.objects.bulk_create([
+        Program(
+            universidad=universities[i % len(universities)],
+            nombre=f'Licenciatura {i}', area=areas[i % len(areas)],
+            beca_disponible=bool(i % 3)
+        )
+        for i in range(amount(3000))
+    ], batch_size=1000)
+    Scholarship.objects.bulk_create([
+        Scholarship(
+            universidad=universities[i % len(universities)], nombre=f'Beca {i}',
+            tipo=['academica', 'socioeconomica', 'deportiva', 'interna'][i % 4],
+            requisitos='Promedio mínimo de 8.5 y carta de motivos'
+        )
+        for i in range(amount(2000))
+    ], batch_size=1000)
+
+    courses = Course.objects.bulk_create([
+        Course(
+            titulo=f'Curso {i}', descripcion=f'Descripción del curso {i}',
+            categoria=areas[i % len(areas)],
+            nivel=['basico', 'intermedio', 'avanzado'][i % 3]
+        )
+        for i in range(amount(1000))
+    ], batch_size=1000)
+    lessons = Lesson.objects.bulk_create([
+        Lesson(
+            course=courses[i % len(courses)], titulo=f'Lección {i}',
+            contenido='Contenido de la lección. ' * 40, orden=i // len(courses),
+            duracion_estimada=15
+        )
+        for i in range(amount(5000))
+    ], batch_size=1000)
+    paths = LearningPath.objects.bulk_create([
+        LearningPath(
+            nombre=f'Ruta {i}', descripcion=f'Descripción de la ruta {i}',
+            categoria=areas[i % len(areas)]
+        )
+        for i in range(amount(200))
+    ])
+    LearningPathCourse.objects.bulk_create([
+        LearningPathCourse(path=path, course=courses[(p * 5 + i) % len(courses)], orden=i)
+        for p, path in enumerate(paths)
+        for i in range(min(5, len(courses)))
+    ], batch_size=1000)
+
+    per_user = min(len(lessons), 1000)
+    LessonProgress.objects.bulk_create([
+        LessonProgress(user=user, lesson=lessons[i], completado=bool(i % 2), duracion_real=10)
+        for user in users
+        for i in range(per_user)
+    ], batch_size=2000)
+    UserCourseProgress.objects.bulk_create([
+        UserCourseProgress(user=user, course=courses[i], porcentaje=i % 100)
+        for user in users
+        for i in range(min(len(courses), 100))
+    ], batch_size=2000)
+    UserLearningPath.objects.bulk_create([
+        UserLearningPath(user=user, path=paths[i])
+        for user in users
+        for i in range(min(len(paths), 10))
+    ], batch_size=2000)
+
+    tests = VocationalTest.objects.bulk_create([
+        VocationalTest(user=user, resultado='Ingeniería', puntaje=80)
+        for user in users
+        for i in range(20)
+    ], batch_size=2000)
+    questions = VocationalQuestion.objects.resolve(f'Pregunta {i}' for i in range(10))
+    options = VocationalOption.objects.resolve(['Sí', 'No'])
+    VocationalAnswer.objects.bulk_create([
+        VocationalAnswer(
+            test=test, question_id=questions[f'Pregunta {i}'], option_id=options['Sí']
+        )
+        for test in tests
+        for i in range(10)
+    ], batch_size=2000)
+
+    # Los bulk_create anteriores no emiten señales
+    progress.recompute()
+    for user in users:
+        dashboard.rebuild(user)
+
+    user = users[0]
+    return SimpleNamespace(
+        user=user,
+        staff=staff,
+        university=universities[0],
+        program=Program.objects.filter(universidad=universities[0]).first(),
+        scholarship=Scholarship.objects.filter(universidad=universities[0]).first(),
+        course=courses[0],
+        lesson=lessons[0],
+        path=paths[0],
+        new_course=courses[-1],
+        new_path=paths[-1],
+        user_path=UserLearningPath.objects.filter(user=user).first(),
+        lesson_progress=LessonProgress.objects.filter(user=user).first(),
+        course_progress=UserCourseProgress.objects.filter(user=user).first(),
+        test=VocationalTest.objects.filter(user=user).first(),
+        answer=VocationalAnswer.objects.filter(test__user=user).first(),
+    )
+
+
+# Ruta que responde StubModelServer por defecto
+STUB_ROUTE = {
+    'title': 'Ruta de Informática y Matemáticas',
+    'description': 'Programación y matemáticas aplicadas, 5 horas por semana',
+    'level': 'principiante',
+    'estimatedTime': '60',
+    'difficulty': 'principiante',
+    'interests': 'informatica, matematicas',
+    'courses': ['Fundamentos de programación', 'Álgebra para computación', 'Proyecto final'],
+    'skills': ['Pensamiento lógico'],
+    'careerPaths': ['Ingeniería de software'],
+    'modules': [],
+}
+
+
+class StubModelHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        stub = self.server.stub
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        with stub.lock:
+            stub.requests.append((self.path, body))
+        if stub.status is None:
+            # Cierra la conexión sin responder (RemoteDisconnected)
+            self.close_connection = True
+            return
+        if stub.status != 200:
+            self.send_error(stub.status)
+            return
+        chunks = stub.chunks(body)
+        if ':streamGenerateContent' in self.path:
+            self.stream(stub, chunks)
+            return
+        # La respuesta completa tarda lo mismo que el stream completo
+        time.sleep(stub.delay + stub.chunk_delay * (len(chunks) - 1))
+        payload = self.candidate(''.join(chunks))
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def candidate(self, text):
+        return json.dumps({
+            'candidates': [{'content': {'role': 'model', 'parts': [{'text': text}]}}]
+        }).encode()
+
+    def stream(self, stub, chunks):
+        # Un evento por fragmento, cada chunk_delay segundos; sin
+        # Content-Length la respuesta termina al cerrar la conexión
+        time.sleep(stub.delay)
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.end_headers()
+        for index, text in enumerate(chunks):
+            if index:
+                time.sleep(stub.chunk_delay)
+            self.wfile.write(b'data: ' + self.candidate(text) + b'\r\n\r\n')
+            self.wfile.flush()
+        finish = {'candidates': [{'finishReason': 'STOP'}]}
+        self.wfile.write(b'data: ' + json.dumps(finish).encode() + b'\r\n\r\n')
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubModelServer:
+    """
+    Servidor HTTP local que responde como generateContent y
+    streamGenerateContent de la API de Gemini, para probar sin red. Como
+    context manager arranca el servidor y apunta AI_MODEL_URL a él;
+    `requests` guarda (ruta, cuerpo) de cada petición recibida.
+
+    `reply` es el texto de la respuesta o una función que lo calcula con el
+    cuerpo de la petición. El stream lo envía palabra por palabra, una cada
+    `chunk_delay` segundos, después de esperar `delay` como las respuestas
+    completas. Con `status` distinto de 200 responde ese error y con None
+    cierra la conexión sin responder.
+    """
+    def __init__(self, reply=None, delay=0, status=200, chunk_delay=0):
+        self.reply = json.dumps(STUB_ROUTE) if reply is None else reply
+        self.delay = delay
+        self.status = status
+        self.chunk_delay = chunk_delay
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def chunks(self, body):
+        reply = self.reply(body) if callable(self.reply) else self.reply
+        words = reply.split(' ')
+        return [word if not index else f' {word}' for index, word in enumerate(words)]
+
+    def __enter__(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), StubModelHandler)
+        self.server.daemon_threads = True
+        self.server.stub = self
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        host, port = self.server.server_address
+        self.settings = override_settings(AI_MODEL_URL=f'http://{host}:{port}/v1beta/models/stub')
+        self.settings.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.settings.disable()
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class EndpointBudgetTestCase(TestCase):
+    """
+    TestCase base que genera datos de volumen y mide endpoints contra su
+    presupuesto de consultas SQL y tiempo.
+    """
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.model_server = cls.enterClassContext(StubModelServer())
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.seed = seed_volume()
+
+    def setUp(self):
+        # Medir siempre el costo sin caché
+        cache.clear()
+        routes.route_cache.clear()
+
+    def get_client(self, budget):
+        client = APIClient()
+        if budget.auth:
+            # Token real, con los claims del login, para que el costo de
+            # autenticación quede medido
+            token = CustomTokenObtainPairSerializer.get_token(self.seed.user).access_token
+            client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        return client
+
+    def resolve(self, value):
+        if callable(value):
+            return value(self.seed)
+        if isinstance(value, str):
+            return value.format(**vars(self.seed))
+        if isinstance(value, dict):
+            return {key: self.resolve(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self.resolve(item) for item in value]
+        return value
+
+    def measure(self, budget):
+        """
+        Ejecuta la petición y regresa (respuesta, número de consultas, ms)
+        """
+        client = self.get_client(budget)
+        request = getattr(client, budget.method)
+        path = self.resolve(budget.path)
+        if budget.method == 'get':
+            kwargs = {'data': self.resolve(budget.params)}
+        else:
+            kwargs = {'data': self.resolve(budget.data), 'format': 'json'}
+        with CaptureQueriesContext(connection) as context:
+            start = time.perf_counter()
+            response = request(path, **kwargs)
+            elapsed = (time.perf_counter() - start) * 1000
+        return response, len(context.captured_queries), elapsed
+
+    def assertWithinBudget(self, name, budget):
+        response, queries, elapsed = self.measure(budget)
+        self.assertIn(
+            response.status_code, budget.status,
+            f'{name}: status inesperado {response.status_code}'
+        )
+        self.assertLessEqual(
+            queries, budget.queries,
+            f'{name}: {queries} consultas SQL, presupuesto {budget.queries}'
+        )
+        limit = budget.ms * get_time_factor()
+        self.assertLessEqual(
+            elapsed, limit, f'{name}: {elapsed:.1f} ms, presupuesto {limit:.0f} ms'
+        )
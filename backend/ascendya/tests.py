@@ -0,0 +1,477 @@
+import datetime
+import io
+import json
+import os
+import tempfile
+from decimal import Decimal
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.db import connection
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from ascendya import async_views, mixins, parsers, renderers
+from learning import dashboard
+from users.serializers import CustomTokenObtainPairSerializer
+from ascendya.testing import (
+    SEED_PASSWORD, Budget, EndpointBudgetTestCase, iter_endpoint_names, seed_volume
+)
+
+
+def refresh_token(seed):
+    return {'refresh': str(RefreshToken.for_user(seed.user))}
+
+
+def access_token(seed):
+    return {'token': str(RefreshToken.for_user(seed.user).access_token)}
+
+
+CREDENTIALS = {'email': '{user.email}', 'password': SEED_PASSWORD}
+
+# Presupuesto de consultas SQL y tiempo (ms) por endpoint, con los datos de
+# seed_volume(). Las peticiones autenticadas usan un JWT real como el del
+# login e incluyen la consulta del usuario, salvo las lecturas de las vistas
+# con STATELESS_READ_AUTHENTICATION.
+ENDPOINT_BUDGETS = {
+    # JWT
+    'ascendya:token_obtain_pair': Budget(
+        '/api/token/', queries=3, ms=2000, method='post', data=CREDENTIALS, auth=False
+    ),
+    'ascendya:token_refresh': Budget(
+        '/api/token/refresh/', queries=3, method='post', data=refresh_token, auth=False
+    ),
+    'ascendya:token_verify': Budget(
+        '/api/token/verify/', queries=1, method='post', data=access_token, auth=False
+    ),
+    'ascendya:api-root': Budget('/api/', queries=1),
+
+    # Usuarios
+    'users:register': Budget(
+        '/api/auth/register/', queries=6, ms=2000, method='post', auth=False, status=(201,),
+        data={
+            'username': 'nuevo', 'email': 'nuevo@example.com', 'nombres': 'Nuevo',
+            'apellidos': 'Usuario', 'password': 'contraseña-segura-1',
+            'password_confirm': 'contraseña-segura-1'
+        }
+    ),
+    'users:login': Budget(
+        '/api/auth/login/', queries=3, ms=2000, method='post', data=CREDENTIALS, auth=False
+    ),
+    'users:login-custom': Budget(
+        '/api/auth/login-custom/', queries=2, ms=2000, method='post', data=CREDENTIALS,
+        auth=False
+    ),
+    'users:logout': Budget(
+        '/api/auth/logout/', queries=4, method='post', data=refresh_token
+    ),
+    'users:token-refresh': Budget(
+        '/api/auth/token/refresh/', queries=3, method='post', data=refresh_token, auth=False
+    ),
+    'users:profile': Budget('/api/auth/profile/', queries=1),
+    'users:users-list': Budget('/api/auth/users/', queries=3),
+    'users:users-detail': Budget('/api/auth/users/{user.pk}/', queries=2),
+    'users:api-root': Budget('/api/auth/', queries=1),
+
+    # Tests vocacionales
+    'vocational:my-tests': Budget('/api/vocational/my-tests/', queries=2),
+    'vocational:async-my-tests': Budget('/api/vocational/async/my-tests/', queries=2),
+    'vocational:create-test': Budget(
+        '/api/vocational/create-test/', queries=9, method='post', status=(201,),
+        data={
+            'resultado': 'Ingeniería', 'puntaje': 90,
+            'answers': [{'pregunta': f'Pregunta {i}', 'respuesta': 'Sí'} for i in range(10)]
+        }
+    ),
+    'vocational:create-tests': Budget(
+        '/api/vocational/create-tests/', queries=8, method='post', status=(201,),
+        data=[
+            {
+                'resultado': 'Ciencias', 'puntaje': 70 + n,
+                'answers': [{'pregunta': f'Pregunta {i}', 'respuesta': 'No'} for i in range(10)]
+            }
+            for n in range(5)
+        ]
+    ),
+    'vocational:vocationaltests-list': Budget('/api/vocational/tests/', queries=3),
+    'vocational:vocationaltests-detail': Budget('/api/vocational/tests/{test.pk}/', queries=3),
+    'vocational:vocationalanswers-list': Budget('/api/vocational/answers/', queries=2),
+    'vocational:vocationalanswers-detail': Budget(
+        '/api/vocational/answers/{answer.pk}/', queries=2
+    ),
+    'vocational:api-root': Budget('/api/vocational/', queries=1),
+
+    # Aprendizaje
+    'learning:enroll-course': Budget(
+        '/api/learning/enroll-course/', queries=10, method='post', status=(201,),
+        data={'course_id': lambda seed: seed.new_course.pk}
+    ),
+    'learning:enroll-path': Budget(
+        '/api/learning/enroll-path/', queries=10, method='post', status=(201,),
+        data={'path_id': lambda seed: seed.new_path.pk}
+    ),
+    'learning:my-courses': Budget('/api/learning/my-courses/', queries=3),
+    'learning:my-paths': Budget('/api/learning/my-paths/', queries=3),
+    'learning:my-lessons': Budget('/api/learning/my-lessons/', queries=2),
+    'learning:dashboard': Budget('/api/learning/dashboard/', queries=1),
+    'learning:generate-route': Budget(
+        '/api/learning/generate-route/', queries=8, method='post',
+        data={'answers': {
+            'learningStyle': 'practico', 'timeCommitment': '3-5_horas',
+            'academicInterests': ['informatica', 'matematicas'],
+        }}
+    ),
+    'learning:assistant-chat': Budget(
+        '/api/learning/assistant/chat/', queries=1, method='post', data={'message': 'Hola'}
+    ),
+    'learning:async-assistant-chat': Budget(
+        '/api/learning/async/assistant/chat/', queries=1, method='post',
+        data={'message': 'Hola'}
+    ),
+    'learning:async-my-courses': Budget('/api/learning/async/my-courses/', queries=3),
+    'learning:async-my-paths': Budget('/api/learning/async/my-paths/', queries=3),
+    'learning:async-my-lessons': Budget('/api/learning/async/my-lessons/', queries=2),
+    'learning:async-dashboard': Budget('/api/learning/async/dashboard/', queries=1),
+    'learning:heartbeat': Budget(
+        '/api/learning/heartbeat/', queries=1, method='post', status=(202,),
+        data={'deltas': [
+            {'lesson_id': lambda seed: seed.lesson.pk, 'segundos': 30},
+            {'lesson_id': lambda seed: seed.lesson.pk, 'segundos': 15},
+        ]}
+    ),
+    'learning:learningpaths-list': Budget('/api/learning/learning-paths/', queries=3),
+    'learning:learningpaths-detail': Budget(
+        '/api/learning/learning-paths/{path.pk}/', queries=4
+    ),
+    'learning:courses-list': Budget('/api/learning/courses/', queries=3),
+    'learning:courses-detail': Budget('/api/learning/courses/{course.pk}/', queries=3),
+    'learning:lessons-list': Budget('/api/learning/lessons/', queries=3),
+    'learning:lessons-detail': Budget('/api/learning/lessons/{lesson.pk}/', queries=2),
+    'learning:userlearningpaths-list': Budget('/api/learning/user-learning-paths/', queries=4),
+    'learning:userlearningpaths-detail': Budget(
+        '/api/learning/user-learning-paths/{user_path.pk}/', queries=3
+    ),
+    'learning:lessonprogress-list': Budget('/api/learning/lesson-progress/', queries=2),
+    'learning:lessonprogress-detail': Budget(
+        '/api/learning/lesson-progress/{lesson_progress.pk}/', queries=2
+    ),
+    'learning:courseprogress-list': Budget('/api/learning/course-progress/', queries=3),
+    'learning:courseprogress-detail': Budget(
+        '/api/learning/course-progress/{course_progress.pk}/', queries=3
+    ),
+    'learning:api-root': Budget('/api/learning/', queries=1),
+
+    # Universidades
+    'universities:search-universities': Budget(
+        '/api/universities/search-universities/', queries=2, params={'search': 'educación'}
+    ),
+    'universities:search-programs': Budget(
+        '/api/universities/search-programs/', queries=2, params={'search': 'Licenciatura 1'}
+    ),
+    'universities:search-scholarships': Budget(
+        '/api/universities/search-scholarships/', queries=2, params={'search': 'Beca 1'}
+    ),
+    'universities:async-search-universities': Budget(
+        '/api/universities/async/search-universities/', queries=2,
+        params={'search': 'educación'}
+    ),
+    'universities:async-search-programs': Budget(
+        '/api/universities/async/search-programs/', queries=2,
+        params={'search': 'Licenciatura 1'}
+    ),
+    'universities:async-search-scholarships': Budget(
+        '/api/universities/async/search-scholarships/', queries=2, params={'search': 'Beca 1'}
+    ),
+    'universities:programs-by-area': Budget(
+        '/api/universities/programs-by-area/', queries=2, params={'area': 'Ingeniería'}
+    ),
+    'universities:scholarships-by-type': Budget(
+        '/api/universities/scholarships-by-type/', queries=2, params={'tipo': 'academica'}
+    ),
+    'universities:universities-list': Budget('/api/universities/universities/', queries=3),
+    'universities:universities-detail': Budget(
+        '/api/universities/universities/{university.pk}/', queries=3
+    ),
+    'universities:programs-list': Budget('/api/universities/programs/', queries=3),
+    'universities:programs-detail': Budget(
+        '/api/universities/programs/{program.pk}/', queries=2
+    ),
+    'universities:scholarships-list': Budget('/api/universities/scholarships/', queries=3),
+    'universities:scholarships-detail': Budget(
+        '/api/universities/scholarships/{scholarship.pk}/', queries=2
+    ),
+    'universities:api-root': Budget('/api/universities/', queries=1),
+}
+
+
+class EndpointBudgetTests(EndpointBudgetTestCase):
+    """
+    Falla cuando un endpoint excede su presupuesto de consultas o de tiempo
+    """
+    def test_every_endpoint_has_budget(self):
+        missing = set(iter_endpoint_names()) - set(ENDPOINT_BUDGETS)
+        self.assertFalse(missing, f'Endpoints sin presupuesto: {sorted(missing)}')
+
+    def test_endpoints_within_budget(self):
+        for name, budget in ENDPOINT_BUDGETS.items():
+            with self.subTest(endpoint=name):
+                self.assertWithinBudget(name, budget)
+
+
+class ORJSONTests(SimpleTestCase):
+    """
+    Verifica que el renderer y el parser con orjson produzcan lo mismo que
+    los de DRF
+    """
+    data = {
+        'nombre': 'Universidad Autónoma\u2028de México',
+        'fecha': datetime.datetime(2025, 3, 1, 12, 30, tzinfo=datetime.timezone.utc),
+        'dia': datetime.date(2025, 3, 1),
+        'promedio': Decimal('9.5'),
+        'mensaje': gettext_lazy('Este campo es requerido.'),
+        1: [None, True, 2.5],
+    }
+
+    def test_render_matches_drf(self):
+        self.assertEqual(
+            renderers.ORJSONRenderer().render(self.data), JSONRenderer().render(self.data)
+        )
+
+    def test_render_rejects_non_finite_numbers_like_drf(self):
+        for value in [float('nan'), float('inf'), Decimal('-Infinity')]:
+            data = {'puntajes': [1.5, {'promedio': value}]}
+            with self.subTest(value=value):
+                with self.assertRaises(ValueError):
+                    JSONRenderer().render(data)
+                with self.assertRaises(ValueError):
+                    renderers.ORJSONRenderer().render(data)
+
+    def test_render_falls_back_without_orjson(self):
+        expected = JSONRenderer().render(self.data)
+        with mock.patch.object(renderers, 'orjson', None):
+            self.assertEqual(renderers.ORJSONRenderer().render(self.data), expected)
+        indented = renderers.ORJSONRenderer().render(
+            self.data, 'application/json; indent=4'
+        )
+        self.assertEqual(indented, JSONRenderer().render(self.data, 'application/json; indent=4'))
+
+    def test_parse_matches_drf(self):
+        body = json.dumps({'nombre': 'Año', 'puntaje': [1, 2.5, None]}).encode()
+        self.assertEqual(
+            parsers.ORJSONParser().parse(io.BytesIO(body)),
+            JSONParser().parse(io.BytesIO(body))
+        )
+        for invalid in [b'{"a": ', b'{"a": NaN}']:
+            with self.subTest(body=invalid), self.assertRaises(ParseError):
+                parsers.ORJSONParser().parse(io.BytesIO(invalid))
+
+
+class ValuesListParityTests(TestCase):
+    """
+    Verifica que los listados armados con values() respondan exactamente lo
+    mismo que los serializers
+    """
+    urls = [
+        '/api/learning/courses/',
+        '/api/learning/courses/?page=2',
+        '/api/learning/learning-paths/',
+        '/api/learning/lessons/',
+        '/api/universities/universities/',
+        '/api/universities/programs/',
+        '/api/universities/programs/?fields=id,universidad_nombre,created_at',
+        '/api/universities/scholarships/',
+        '/api/universities/search-universities/?search=educación',
+        '/api/universities/search-programs/?search=Licenciatura',
+        '/api/universities/search-scholarships/?search=Beca',
+        '/api/universities/programs-by-area/?area=Ingeniería',
+        '/api/universities/scholarships-by-type/?tipo=academica',
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_volume(0.05)
+
+    def test_values_lists_match_serializers(self):
+        client = APIClient()
+        for url in self.urls:
+            with self.subTest(url=url):
+                with mock.patch.object(
+                    mixins, 'represent_values', wraps=mixins.represent_values
+                ) as represent:
+                    fast = client.get(url)
+                self.assertTrue(represent.called)
+                with mock.patch.object(mixins, 'values_plan', return_value=None):
+                    expected = client.get(url)
+                self.assertEqual(fast.status_code, 200)
+                self.assertGreater(len(fast.data['results']), 0)
+                self.assertEqual(fast.content, expected.content)
+
+
+class AsyncViewParityTests(TestCase):
+    """
+    Verifica que las vistas async respondan exactamente lo mismo que sus
+    equivalentes DRF, incluidos los errores
+    """
+    urls = [
+        '/api/learning/{}my-courses/',
+        '/api/learning/{}my-paths/',
+        '/api/learning/{}my-lessons/?page=2&page_size=5',
+        '/api/learning/{}dashboard/',
+        '/api/universities/{}search-universities/?search=educación',
+        '/api/universities/{}search-programs/?search=Licenciatura&fields=id,nombre',
+        '/api/universities/{}search-scholarships/?search=Beca',
+        '/api/universities/{}search-scholarships/?page=999',
+        '/api/vocational/{}my-tests/',
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.seed = seed_volume(0.05)
+
+    def assertSameResponses(self, client, urls):
+        for url in urls:
+            with self.subTest(url=url):
+                expected = client.get(url.format(''))
+                response = client.get(url.format('async/'))
+                self.assertEqual(response.status_code, expected.status_code)
+                # Los enlaces de paginación apuntan a la misma vista
+                self.assertEqual(response.content.replace(b'async/', b''), expected.content)
+                self.assertEqual(
+                    response.get('WWW-Authenticate'), expected.get('WWW-Authenticate')
+                )
+
+    def test_responses_match_drf_views(self):
+        client = APIClient()
+        token = CustomTokenObtainPairSerializer.get_token(self.seed.user).access_token
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.assertSameResponses(client, self.urls)
+
+    def test_my_tests_read_from_values(self):
+        client = APIClient()
+        token = CustomTokenObtainPairSerializer.get_token(self.seed.user).access_token
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        with mock.patch.object(
+            async_views, 'represent_values', wraps=async_views.represent_values
+        ) as represent:
+            response = client.get('/api/vocational/async/my-tests/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(represent.called)
+        self.assertGreater(len(represent.call_args.args[0]), 0)
+
+    def test_errors_match_drf_views(self):
+        client = APIClient()
+        self.assertSameResponses(client, self.urls)
+        client.credentials(HTTP_AUTHORIZATION='Bearer invalido')
+        self.assertSameResponses(client, self.urls[:2])
+
+    def test_only_reads(self):
+        response = APIClient().post('/api/learning/async/my-courses/')
+        self.assertEqual(response.status_code, 405)
+
+
+class SQLiteTuningTests(SimpleTestCase):
+    """
+    Verifica que SQLITE_TUNED_OPTIONS aplique los PRAGMA en cada conexión
+    nueva
+    """
+    def setUp(self):
+        directory = tempfile.mkdtemp(prefix='ascendya-sqlite-')
+        self.name = os.path.join(directory, 'tuned.sqlite3')
+
+    def tearDown(self):
+        for suffix in ['', '-wal', '-shm']:
+            if os.path.exists(self.name + suffix):
+                os.remove(self.name + suffix)
+        os.rmdir(os.path.dirname(self.name))
+
+    def open(self):
+        wrapper = DatabaseWrapper(
+            {**connection.settings_dict, 'NAME': self.name,
+             'OPTIONS': settings.SQLITE_TUNED_OPTIONS},
+            alias='tuned'
+        )
+        self.addCleanup(wrapper.close)
+        return wrapper
+
+    def pragma(self, wrapper, name):
+        with wrapper.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_pragmas_applied_on_connect(self):
+        wrapper = self.open()
+        self.assertEqual(self.pragma(wrapper, 'journal_mode'), 'wal')
+        # 1 = NORMAL
+        self.assertEqual(self.pragma(wrapper, 'synchronous'), 1)
+        self.assertGreater(self.pragma(wrapper, 'busy_timeout'), 0)
+        self.assertLess(self.pragma(wrapper, 'cache_size'), 0)
+        # atomic() abre con BEGIN IMMEDIATE
+        self.assertEqual(wrapper.transaction_mode, 'IMMEDIATE')
+
+
+@skipUnless(connection.vendor == 'sqlite', 'Usa EXPLAIN QUERY PLAN de SQLite')
+class QueryPlanTests(TestCase):
+    """
+    Verifica con EXPLAIN que las consultas de los filtros y órdenes más usados
+    lean por su índice en lugar de recorrer la tabla completa
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.seed = seed_volume(0.05)
+
+    def plans(self, table, run):
+        """
+        Planes de las consultas SELECT sobre `table` que ejecuta `run`
+        """
+        with CaptureQueriesContext(connection) as queries:
+            run()
+        plans = []
+        with connection.cursor() as cursor:
+            for query in queries.captured_queries:
+                sql = query['sql']
+                if sql.startswith('SELECT') and f'"{table}"' in sql:
+                    cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                    plans.append([row[-1] for row in cursor.fetchall()])
+        self.assertTrue(plans, f'No hubo consultas sobre {table}')
+        return plans
+
+    def assertUsesIndex(self, table, index, run, ordered=False):
+        for plan in self.plans(table, run):
+            with self.subTest(plan=plan):
+                self.assertTrue(any(f'INDEX {index}' in step for step in plan))
+                self.assertFalse([step for step in plan if step.startswith(f'SCAN {table}')])
+                if ordered:
+                    self.assertNotIn('USE TEMP B-TREE FOR ORDER BY', plan)
+
+    def test_user_vocational_tests_by_date(self):
+        client = APIClient()
+        client.force_authenticate(self.seed.user)
+        self.assertUsesIndex(
+            'vocational_tests', 'vocational_test_user_fecha_idx',
+            lambda: client.get('/api/vocational/my-tests/'), ordered=True
+        )
+
+    def test_dashboard_top_path(self):
+        self.assertUsesIndex(
+            'user_learning_paths', 'user_path_estado_idx',
+            lambda: dashboard.top_path(self.seed.user.pk), ordered=True
+        )
+
+    def test_filters_by_tipo(self):
+        client = APIClient()
+        cases = [
+            ('universities', 'universities_tipo_idx',
+             '/api/universities/search-universities/?tipo=publica'),
+            ('scholarships', 'scholarships_tipo_idx',
+             '/api/universities/scholarships-by-type/?tipo=academica'),
+        ]
+        for table, index, url in cases:
+            with self.subTest(url=url):
+                self.assertUsesIndex(table, index, lambda: client.get(url))
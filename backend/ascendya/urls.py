@@ -22,6 +22,7 @@ from rest_framework_simplejwt.views import (
     TokenRefreshView,
     TokenVerifyView,
 )
+from users.throttles import LoginEmailThrottle, LoginIPThrottle
 
 # Router principal para las APIs
 router = DefaultRouter()
@@ -31,7 +32,11 @@ urlpatterns = [
     path("admin/", admin.site.urls),
     
     # JWT Authentication endpoints
-    path('api/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
+    path(
+        'api/token/',
+        TokenObtainPairView.as_view(throttle_classes=[LoginIPThrottle, LoginEmailThrottle]),
+        name='token_obtain_pair'
+    ),
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('api/token/verify/', TokenVerifyView.as_view(), name='token_verify'),
     
@@ -0,0 +1,69 @@
+"""
+Benchmarks del backend.
+
+Cada módulo se ejecuta desde backend/ con `python -m benchmarks.<modulo>` y
+trabaja sobre una base de datos de prueba temporal, nunca sobre db.sqlite3.
+"""
+
+import os
+import statistics
+import tempfile
+import time
+from contextlib import contextmanager
+
+
+def setup_django():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ascendya.settings')
+    import django
+    django.setup()
+
+
+@contextmanager
+def test_database(on_disk=True):
+    """
+    Crea la base de datos de prueba y la elimina al terminar.
+
+    Con on_disk=True SQLite usa un archivo temporal en lugar de memoria, para
+    que los commits paguen el costo real de escritura.
+    """
+    setup_django()
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    if on_disk and connection.vendor == 'sqlite':
+        directory = tempfile.mkdtemp(prefix='ascendya-bench-')
+        connection.settings_dict['TEST']['NAME'] = os.path.join(directory, 'bench.sqlite3')
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def measure(function, repeat=5, setup=None):
+    """
+    Ejecuta `function` `repeat` veces y regresa la mediana en segundos.
+    `setup` se ejecuta antes de cada repetición, fuera de la medición.
+    """
+    timings = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def report(title, rows, headers):
+    print(f'\n{title}')
+    widths = [
+        max(len(str(value)) for value in [header, *[row[i] for row in rows]])
+        for i, header in enumerate(headers)
+    ]
+    print('  '.join(str(header).ljust(width) for header, width in zip(headers, widths)))
+    for row in rows:
+        print('  '.join(str(value).ljust(width) for value, width in zip(row, widths)))
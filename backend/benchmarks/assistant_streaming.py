@@ -0,0 +1,175 @@
+"""
+Asistente virtual: respuesta completa (POST assistant/chat/) contra server-
+sent events por ASGI (POST async/assistant/chat/), con un servidor local que
+genera `palabras` palabras, una cada `ms` milisegundos, como el modelo.
+
+Se mide el tiempo hasta el primer fragmento de texto que recibe el cliente y
+el tamaño de lo que se envía al modelo en cada turno de una conversación de
+`turnos` mensajes: antes el cliente mandaba las instrucciones y los últimos
+10 mensajes como un solo texto; ahora el servidor manda un resumen y a lo más
+ASSISTANT_HISTORY_MESSAGES mensajes.
+
+Con 150 palabras cada 10 ms el primer texto llega en ~3 ms por SSE contra
+~1,500 ms con la respuesta completa. En 20 turnos el texto por turno baja de
+un máximo de 8,462 a 6,595 bytes y el total de 147,780 a 127,446 bytes,
+contando las llamadas de resumen.
+
+Uso: python -m benchmarks.assistant_streaming [palabras] [ms] [turnos]
+"""
+
+import asyncio
+import json
+import statistics
+import sys
+import time
+
+from benchmarks import report, test_database
+
+
+async def asgi_post(application, path, body, token):
+    """
+    Regresa (segundos al primer fragmento del cuerpo, segundos al final)
+    """
+    start = time.perf_counter()
+    responded = asyncio.Event()
+    received = []
+    timings = {}
+
+    async def receive():
+        if not received:
+            received.append(True)
+            return {'type': 'http.request', 'body': body, 'more_body': False}
+        await responded.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        if message['type'] != 'http.response.body':
+            return
+        if message.get('body') and b'"text"' in message['body']:
+            timings.setdefault('first', time.perf_counter() - start)
+        if not message.get('more_body'):
+            timings['end'] = time.perf_counter() - start
+            responded.set()
+
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'POST',
+        'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': b'',
+        'root_path': '', 'client': ('127.0.0.1', 0), 'server': ('testserver', 80),
+        'headers': [
+            (b'host', b'testserver'), (b'content-type', b'application/json'),
+            (b'content-length', str(len(body)).encode()),
+            (b'authorization', f'Bearer {token}'.encode()),
+        ],
+    }
+    await application(scope, receive, send)
+    return timings['first'], timings['end']
+
+
+def client_prompt(history, message):
+    # El prompt que armaba chatbotService.js con los últimos 10 mensajes
+    from learning.assistant import ASSISTANT_CONTEXT
+
+    text = ASSISTANT_CONTEXT
+    if history:
+        text += '\n\nHistorial de conversación:\n' + '\n'.join(
+            f'{role}: {content}' for role, content in history[-10:]
+        )
+    return f'{text}\n\nUsuario: {message}'
+
+
+def main(words=150, delay=10, turns=20):
+    with test_database(on_disk=True):
+        from django.conf import settings
+        from django.core.cache import cache
+        from rest_framework.test import APIClient
+        from ascendya.asgi import application
+        from ascendya.testing import StubModelServer
+        from users.models import User
+        from users.serializers import CustomTokenObtainPairSerializer
+
+        settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']['ai_chat'] = None
+        user = User.objects.create_user(
+            username='asistente', email='asistente@example.com', password='x',
+            nombres='Usuario', apellidos='Asistente'
+        )
+        token = str(CustomTokenObtainPairSerializer.get_token(user).access_token)
+        reply = ' '.join(f'palabra{i % 10}' for i in range(words))
+        # Los resúmenes tienen a lo más 150 palabras
+        summary = ' '.join(f'resumen{i % 10}' for i in range(120))
+
+        def respond(body):
+            return reply if 'systemInstruction' in body else summary
+
+        message = 'Explícame cómo preparar el examen de admisión de matemáticas'
+        body = json.dumps({'message': message}).encode()
+        repeat = 5
+
+        with StubModelServer(reply=respond, chunk_delay=delay / 1000) as model:
+            client = APIClient()
+            client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+            complete = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                client.post('/api/learning/assistant/chat/', {'message': message}, format='json')
+                complete.append(time.perf_counter() - start)
+
+            streamed = [
+                asyncio.run(asgi_post(
+                    application, '/api/learning/async/assistant/chat/', body, token
+                ))
+                for _ in range(repeat)
+            ]
+            first = statistics.median(first for first, end in streamed)
+            end = statistics.median(end for first, end in streamed)
+            report(
+                f'Primer texto al cliente, {words} palabras cada {delay} ms (mediana de {repeat})',
+                [
+                    ['respuesta completa', f'{statistics.median(complete) * 1000:.0f}',
+                     f'{statistics.median(complete) * 1000:.0f}'],
+                    ['SSE por ASGI', f'{first * 1000:.0f}', f'{end * 1000:.0f}'],
+                ],
+                ['endpoint', 'primer texto ms', 'respuesta completa ms']
+            )
+
+            # Tamaño del prompt por turno en una conversación
+            cache.clear()
+            model.chunk_delay = 0
+            model.requests.clear()
+            history = [('assistant', 'Hola, soy Ascend AI. ¿En qué puedo ayudarte?')]
+            before = []
+            conversation_id = None
+            for turn in range(turns):
+                text = f'{message} (pregunta {turn})'
+                before.append(len(client_prompt(history, text).encode()))
+                history += [('user', text), ('assistant', reply)]
+                data = {'message': text}
+                if conversation_id:
+                    data['conversation_id'] = conversation_id
+                response = client.post('/api/learning/assistant/chat/', data, format='json')
+                conversation_id = response.data['conversation_id']
+            after = []
+            summaries = []
+            for path, body in model.requests:
+                # Solo el texto, sin el JSON que lo envuelve
+                size = sum(len(content['parts'][0]['text'].encode()) for content in body['contents'])
+                if 'systemInstruction' in body:
+                    after.append(size + len(body['systemInstruction']['parts'][0]['text'].encode()))
+                else:
+                    summaries.append(size)
+
+    rows = [
+        [turn + 1, before[turn], after[turn]]
+        for turn in sorted({0, 1, 4, 9, turns - 1}) if turn < turns
+    ]
+    rows.append(['máximo', max(before), max(after)])
+    rows.append(['total', sum(before), f'{sum(after) + sum(summaries)} (resúmenes incluidos)'])
+    report(
+        f'Bytes de texto enviados al modelo por turno ({len(summaries)} llamadas de resumen '
+        f'en {turns} turnos)',
+        rows,
+        ['turno', 'antes (cliente)', 'ahora (servidor)']
+    )
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:4]))
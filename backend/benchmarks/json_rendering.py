@@ -0,0 +1,96 @@
+"""
+Rendimiento del JSON de la API: JSONRenderer/JSONParser de DRF (módulo json
+de la biblioteca estándar) contra ORJSONRenderer/ORJSONParser.
+
+Los datos son el `response.data` de los endpoints con las respuestas más
+grandes, sobre seed_volume() más una universidad con muchos programas y becas
+y un curso con muchas lecciones. Solo se mide el paso a bytes y de regreso,
+no las consultas ni la serialización de modelos.
+
+Uso: python -m benchmarks.json_rendering [escala] [repeticiones]
+"""
+
+import io
+import sys
+
+from benchmarks import measure, report, test_database
+
+
+def main(scale=0.2, repeat=50):
+    with test_database(on_disk=False):
+        from rest_framework.parsers import JSONParser
+        from rest_framework.renderers import JSONRenderer
+        from rest_framework.test import APIClient
+        from ascendya.parsers import ORJSONParser
+        from ascendya.renderers import ORJSONRenderer, orjson
+        from ascendya.testing import seed_volume
+        from learning.models import Course, Lesson
+        from universities.models import University, Program, Scholarship
+
+        if orjson is None:
+            print('orjson no está instalado: ORJSONRenderer usa el JSON de DRF')
+
+        seed = seed_volume(scale)
+        university = University.objects.create(
+            nombre='Universidad Nacional', estado='Ciudad de México', tipo='publica',
+            descripcion='Universidad con oferta amplia ' * 20
+        )
+        Program.objects.bulk_create([
+            Program(universidad=university, nombre=f'Licenciatura en área {i}', area='Ingeniería',
+                    plan_estudios_url=f'https://example.com/planes/{i}')
+            for i in range(500)
+        ])
+        Scholarship.objects.bulk_create([
+            Scholarship(universidad=university, nombre=f'Beca {i}', tipo='academica',
+                        requisitos='Promedio mínimo de 8.5 y carta de motivos ' * 3)
+            for i in range(300)
+        ])
+        course = Course.objects.create(
+            titulo='Programación', descripcion='Curso de programación', categoria='tecnologia',
+            nivel='basico'
+        )
+        Lesson.objects.bulk_create([
+            Lesson(course=course, titulo=f'Tema {i}', contenido='Contenido', orden=i,
+                   duracion_estimada=15)
+            for i in range(1000)
+        ])
+
+        client = APIClient()
+        client.force_authenticate(seed.staff)
+        endpoints = [
+            f'/api/universities/universities/{university.pk}/',
+            f'/api/learning/courses/{course.pk}/',
+            '/api/universities/universities/',
+            '/api/universities/programs/',
+            '/api/learning/lesson-progress/',
+        ]
+        rows = []
+        for url in endpoints:
+            data = client.get(url).data
+            body = JSONRenderer().render(data)
+            assert ORJSONRenderer().render(data) == body
+            timings = [
+                measure(lambda: renderer.render(data), repeat=repeat)
+                for renderer in (JSONRenderer(), ORJSONRenderer())
+            ]
+            parse_timings = [
+                measure(lambda: parser.parse(io.BytesIO(body)), repeat=repeat)
+                for parser in (JSONParser(), ORJSONParser())
+            ]
+            megabytes = len(body) / 1024 / 1024
+            rows.append([
+                url, f'{len(body) / 1024:.1f}',
+                f'{megabytes / timings[0]:.0f}', f'{megabytes / timings[1]:.0f}',
+                f'{timings[0] / timings[1]:.1f}x',
+                f'{megabytes / parse_timings[0]:.0f}', f'{megabytes / parse_timings[1]:.0f}',
+            ])
+        report(
+            f'Throughput en MB/s, mediana de {repeat} repeticiones', rows,
+            ['endpoint', 'KB', 'render json', 'render orjson', 'mejora', 'parse json',
+             'parse orjson']
+        )
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:3]
+    main(float(args[0]) if args else 0.2, *(int(arg) for arg in args[1:]))
@@ -0,0 +1,80 @@
+"""
+Tamaño, tiempo y memoria del detalle de un curso: lecciones anidadas con su
+contenido completo (implementación anterior) contra lecciones sin contenido
+cargadas con defer('contenido').
+
+Ambos lados serializan y renderizan a JSON el mismo curso; la memoria es el
+pico de tracemalloc durante la consulta y la serialización. También se
+reporta el detalle de una lección, con y sin gzip.
+
+Uso: python -m benchmarks.lesson_payloads [lecciones] [kb_por_leccion]
+"""
+
+import gzip
+import sys
+import tracemalloc
+
+from benchmarks import measure, report, test_database
+
+
+def peak_memory(function):
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main(lessons=40, kb=20):
+    with test_database() as connection:
+        from django.db.models import Prefetch
+        from rest_framework.renderers import JSONRenderer
+        from learning.models import Course, Lesson
+        from learning.serializers import CourseSerializer, LessonSerializer
+
+        class FullCourseSerializer(CourseSerializer):
+            lessons = LessonSerializer(many=True, read_only=True)
+
+        course = Course.objects.create(
+            titulo='Cálculo', descripcion='Curso de cálculo', categoria='ciencias', nivel='basico'
+        )
+        paragraph = 'Una función es continua en un punto si su límite coincide con su valor. '
+        Lesson.objects.bulk_create([
+            Lesson(
+                course=course, titulo=f'Tema {i}', contenido=paragraph * (kb * 1024 // len(paragraph)),
+                orden=i, duracion_estimada=15
+            )
+            for i in range(lessons)
+        ])
+
+        def render(serializer_class, lessons_queryset):
+            def run():
+                instance = Course.objects.with_lessons_count().prefetch_related(
+                    Prefetch('lessons', queryset=lessons_queryset)
+                ).get(pk=course.pk)
+                return JSONRenderer().render(serializer_class(instance).data)
+            return run
+
+        full = render(FullCourseSerializer, Lesson.objects.all())
+        slim = render(CourseSerializer, Lesson.objects.without_content())
+        rows = []
+        for name, function in [('contenido completo', full), ('sin contenido', slim)]:
+            rows.append([
+                name, f'{len(function()) / 1024:.1f}', f'{measure(function) * 1000:.2f}',
+                f'{peak_memory(function) / 1024:.0f}'
+            ])
+        report(
+            f'Detalle de curso, {lessons} lecciones de {kb} KB', rows,
+            ['variante', 'KB', 'ms', 'pico KB']
+        )
+
+        lesson = JSONRenderer().render(LessonSerializer(Lesson.objects.first()).data)
+        report('Detalle de lección', [
+            ['json', f'{len(lesson) / 1024:.1f}'],
+            ['gzip', f'{len(gzip.compress(lesson)) / 1024:.1f}'],
+        ], ['variante', 'KB'])
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:3]))
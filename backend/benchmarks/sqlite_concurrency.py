@@ -0,0 +1,129 @@
+"""
+Escrituras concurrentes sobre SQLite: configuración por defecto (journal
+DELETE, transacciones diferidas) contra SQLITE_TUNED_OPTIONS (WAL,
+synchronous=NORMAL, busy_timeout y transacciones IMMEDIATE).
+
+Cada hilo es un usuario que se inscribe a cursos (POST enroll-course/) y
+marca lecciones como completadas (PATCH lesson-progress/<id>/), con su propia
+conexión a una base de datos en archivo. Se reportan las escrituras exitosas
+por segundo y las que fallaron con "database is locked".
+
+Uso: python -m benchmarks.sqlite_concurrency [hilos] [operaciones por hilo]
+"""
+
+import logging
+import sys
+import threading
+import time
+
+from benchmarks import report, setup_django, test_database
+
+
+def run(options, threads, operations):
+    from django.conf import settings
+
+    settings.DATABASES['default']['OPTIONS'] = options
+    with test_database(on_disk=True) as connection:
+        from django.db import OperationalError, connections
+        from rest_framework.test import APIClient
+        from learning.models import Course, Lesson, LessonProgress
+        from users.models import User
+
+        courses = Course.objects.bulk_create([
+            Course(titulo=f'Curso {i}', descripcion='Curso', categoria='tecnologia', nivel='basico')
+            for i in range(operations)
+        ])
+        lessons = Lesson.objects.bulk_create([
+            Lesson(course=course, titulo='Tema', contenido='Contenido', orden=1,
+                   duracion_estimada=15)
+            for course in courses
+        ])
+        users = [
+            User.objects.create_user(
+                username=f'usuario{i}', email=f'usuario{i}@example.com', password='x',
+                nombres='Usuario', apellidos=str(i)
+            )
+            for i in range(threads)
+        ]
+        progress = {
+            user.pk: LessonProgress.objects.bulk_create([
+                LessonProgress(user=user, lesson=lesson) for lesson in lessons
+            ])
+            for user in users
+        }
+        journal_mode = connection.cursor().execute('PRAGMA journal_mode').fetchone()[0]
+        connection.close()
+
+        counts = {'ok': 0, 'locked': 0}
+        lock = threading.Lock()
+        barrier = threading.Barrier(threads + 1)
+
+        def worker(user):
+            client = APIClient()
+            client.force_authenticate(user)
+            barrier.wait()
+            ok = locked = 0
+            try:
+                for course, lesson_progress in zip(courses, progress[user.pk]):
+                    requests = [
+                        lambda: client.post('/api/learning/enroll-course/',
+                                            {'course_id': course.pk}),
+                        lambda: client.patch(f'/api/learning/lesson-progress/{lesson_progress.pk}/',
+                                             {'completado': True}),
+                    ]
+                    for request in requests:
+                        try:
+                            response = request()
+                        except OperationalError:
+                            locked += 1
+                            continue
+                        if response.status_code < 300:
+                            ok += 1
+            finally:
+                connections.close_all()
+            with lock:
+                counts['ok'] += ok
+                counts['locked'] += locked
+
+        workers = [threading.Thread(target=worker, args=(user,)) for user in users]
+        # Los "database is locked" se cuentan; no hace falta el traceback de cada uno
+        logging.disable(logging.ERROR)
+        try:
+            for thread in workers:
+                thread.start()
+            barrier.wait()
+            start = time.perf_counter()
+            for thread in workers:
+                thread.join()
+            elapsed = time.perf_counter() - start
+        finally:
+            logging.disable(logging.NOTSET)
+    return journal_mode, counts['ok'], counts['locked'], elapsed
+
+
+def main(threads=8, operations=50):
+    setup_django()
+    from django.conf import settings
+    from django.db import connection
+
+    if connection.vendor != 'sqlite':
+        print('La base de datos configurada no es SQLite')
+        return
+    variants = [('por defecto', {}), ('SQLITE_TUNED_OPTIONS', settings.SQLITE_TUNED_OPTIONS)]
+    original = settings.DATABASES['default'].get('OPTIONS', {})
+    rows = []
+    try:
+        for name, options in variants:
+            journal_mode, ok, locked, elapsed = run(options, threads, operations)
+            rows.append([name, journal_mode, ok, locked, f'{elapsed:.2f}', f'{ok / elapsed:,.0f}'])
+    finally:
+        settings.DATABASES['default']['OPTIONS'] = original
+    report(
+        f'{threads} hilos, {operations * 2} escrituras por hilo',
+        rows,
+        ['configuración', 'journal', 'exitosas', 'bloqueadas', 'segundos', 'escrituras/s']
+    )
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:3]))
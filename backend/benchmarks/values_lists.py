@@ -0,0 +1,73 @@
+"""
+Listados planos: ModelSerializer(many=True) sobre instancias contra
+represent_values() sobre queryset.values() (ValuesListMixin).
+
+Cada lado incluye la consulta y la representación de `rows` filas, sin
+renderizar a JSON; también se mide una página de 20 por HTTP con el mismo
+list() de la vista.
+
+Uso: python -m benchmarks.values_lists [filas] [repeticiones]
+"""
+
+import sys
+from unittest import mock
+
+from benchmarks import measure, report, test_database
+
+
+def main(rows=2000, repeat=10):
+    with test_database(on_disk=False):
+        from rest_framework.test import APIClient
+        from ascendya import mixins
+        from ascendya.serializers import represent_values, values_plan
+        from ascendya.testing import seed_volume
+        from learning.models import Course
+        from learning.serializers import CourseListSerializer
+        from universities.models import Program, Scholarship
+        from universities.serializers import ProgramListSerializer, ScholarshipListSerializer
+
+        seed_volume(rows / 1000)
+        cases = [
+            ('cursos', CourseListSerializer, Course.objects.with_lessons_count(),
+             '/api/learning/courses/'),
+            ('programas', ProgramListSerializer, Program.objects.for_listing(),
+             '/api/universities/programs/'),
+            ('becas', ScholarshipListSerializer, Scholarship.objects.for_listing(),
+             '/api/universities/scholarships/'),
+        ]
+        client = APIClient()
+        table = []
+        for name, serializer_class, queryset, url in cases:
+            queryset = queryset.order_by('pk')[:rows]
+            plan = values_plan(serializer_class(), queryset)
+            keys = {key for field, key, convert in plan}
+
+            def serializer():
+                return serializer_class(queryset.all(), many=True).data
+
+            def values():
+                return represent_values(queryset.values(*keys), plan)
+
+            assert list(map(dict, serializer())) == values()
+            count = len(values())
+            before = measure(serializer, repeat=repeat)
+            after = measure(values, repeat=repeat)
+
+            page_after = measure(lambda: client.get(url), repeat=repeat)
+            with mock.patch.object(mixins, 'values_plan', return_value=None):
+                page_before = measure(lambda: client.get(url), repeat=repeat)
+
+            table.append([
+                name, count, f'{count / before:,.0f}', f'{count / after:,.0f}',
+                f'{before / after:.1f}x', f'{page_before * 1000:.2f}', f'{page_after * 1000:.2f}'
+            ])
+        report(
+            f'Filas por segundo (mediana de {repeat} repeticiones) y ms por página de 20',
+            table,
+            ['listado', 'filas', 'serializer', 'values()', 'mejora', 'página antes',
+             'página ahora']
+        )
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:3]))
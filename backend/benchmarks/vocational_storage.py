@@ -0,0 +1,132 @@
+"""
+Espacio e inserción de respuestas vocacionales: columnas de texto por
+respuesta (esquema anterior) contra llaves al banco de preguntas.
+
+El esquema anterior se recrea en una tabla auxiliar con las mismas columnas
+que tenía vocational_answers. Ambos lados insertan las mismas respuestas con
+executemany en una transacción; el banco de preguntas incluye las dos
+consultas que resuelven los textos. El espacio se mide con dbstat (tablas e
+índices) y solo está disponible en SQLite.
+
+Uso: python -m benchmarks.vocational_storage [tests]
+"""
+
+import sys
+
+from benchmarks import measure, report, test_database
+
+
+QUESTIONS = 60
+LEGACY_TABLE = 'legacy_vocational_answers'
+
+
+def build_answers(n):
+    return [
+        (f'¿Qué tanto te interesa la actividad número {i} de la sección de intereses?',
+         'Me interesa mucho' if (n + i) % 3 else 'No me interesa')
+        for i in range(QUESTIONS)
+    ]
+
+
+def table_bytes(connection, tables):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT COALESCE(SUM(pgsize), 0) FROM dbstat WHERE name IN ({}) OR name IN '
+            "(SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name IN ({}))".format(
+                ', '.join(['%s'] * len(tables)), ', '.join(['%s'] * len(tables))
+            ),
+            [*tables, *tables]
+        )
+        return cursor.fetchone()[0]
+
+
+def main(tests=500):
+    with test_database() as connection:
+        from django.db import transaction
+        from users.models import User
+        from vocational.models import (
+            VocationalTest, VocationalAnswer, VocationalQuestion, VocationalOption
+        )
+
+        if connection.vendor != 'sqlite':
+            print('dbstat solo está disponible en SQLite')
+            return
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'CREATE TABLE {LEGACY_TABLE} (id integer PRIMARY KEY AUTOINCREMENT, '
+                'pregunta text NOT NULL, respuesta text NOT NULL, '
+                'test_id bigint NOT NULL REFERENCES vocational_tests (id))'
+            )
+            cursor.execute(f'CREATE INDEX {LEGACY_TABLE}_test_id ON {LEGACY_TABLE} (test_id)')
+
+        user = User.objects.create_user(
+            username='bench', email='bench@example.com', password='bench-2025',
+            nombres='Bench', apellidos='Mark'
+        )
+        test_ids = [
+            test.id for test in VocationalTest.objects.bulk_create([
+                VocationalTest(user=user, resultado='Ingeniería', puntaje=80)
+                for _ in range(tests)
+            ])
+        ]
+        answers = {test_id: build_answers(test_id) for test_id in test_ids}
+
+        def legacy():
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.executemany(
+                    f'INSERT INTO {LEGACY_TABLE} (test_id, pregunta, respuesta) VALUES (%s, %s, %s)',
+                    [
+                        (test_id, pregunta, respuesta)
+                        for test_id in test_ids for pregunta, respuesta in answers[test_id]
+                    ]
+                )
+
+        def question_bank():
+            with transaction.atomic(), connection.cursor() as cursor:
+                pairs = [pair for test_id in test_ids for pair in answers[test_id]]
+                questions = VocationalQuestion.objects.resolve(pregunta for pregunta, _ in pairs)
+                options = VocationalOption.objects.resolve(respuesta for _, respuesta in pairs)
+                cursor.executemany(
+                    f'INSERT INTO {VocationalAnswer._meta.db_table} '
+                    '(test_id, question_id, option_id) VALUES (%s, %s, %s)',
+                    [
+                        (test_id, questions[pregunta], options[respuesta])
+                        for test_id in test_ids for pregunta, respuesta in answers[test_id]
+                    ]
+                )
+
+        def reset():
+            with connection.cursor() as cursor:
+                cursor.execute(f'DELETE FROM {LEGACY_TABLE}')
+            VocationalAnswer.objects.all().delete()
+
+        rows = []
+        total = tests * QUESTIONS
+        for name, function, tables in [
+            ('texto por respuesta', legacy, [LEGACY_TABLE]),
+            ('banco de preguntas', question_bank, [
+                VocationalAnswer._meta.db_table, VocationalQuestion._meta.db_table,
+                VocationalOption._meta.db_table,
+            ]),
+        ]:
+            seconds = measure(function, repeat=3, setup=reset)
+            reset()
+            function()
+            with connection.cursor() as cursor:
+                cursor.execute('VACUUM')
+            size = table_bytes(connection, tables)
+            rows.append([
+                name,
+                f'{seconds / total * 1_000_000:.2f}',
+                f'{size / 1024:.0f}',
+                f'{size / total:.1f}',
+            ])
+        report(
+            f'{tests} tests x {QUESTIONS} respuestas ({connection.vendor})',
+            rows, ['esquema', 'µs por respuesta', 'KiB', 'bytes por respuesta']
+        )
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,89 @@
+"""
+Costo por test vocacional enviado (60 respuestas por test):
+
+- legacy: un INSERT con autocommit por cada respuesta (implementación anterior,
+  medida solo en el ORM, sin el costo HTTP que sí incluyen las otras dos; el
+  banco de preguntas se resuelve antes de medir).
+- create-test/: un test por petición, en una transacción con bulk_create.
+- create-tests/: lotes de tests en una sola transacción.
+
+Uso: python -m benchmarks.vocational_submission [tests]
+"""
+
+import sys
+
+from benchmarks import measure, report, test_database
+
+
+QUESTIONS = 60
+
+
+def build_test(n):
+    return {
+        'resultado': 'Ingeniería', 'puntaje': n % 100,
+        'answers': [
+            {'pregunta': f'¿Te interesa la actividad {i}?', 'respuesta': 'Sí' if (n + i) % 2 else 'No'}
+            for i in range(QUESTIONS)
+        ]
+    }
+
+
+def main(tests=50):
+    with test_database() as connection:
+        from django.db import reset_queries
+        from django.test.utils import CaptureQueriesContext
+        from rest_framework.test import APIClient
+        from users.models import User
+        from vocational.models import (
+            VocationalTest, VocationalAnswer, VocationalQuestion, VocationalOption
+        )
+
+        user = User.objects.create_user(
+            username='bench', email='bench@example.com', password='bench-2025',
+            nombres='Bench', apellidos='Mark'
+        )
+        client = APIClient()
+        client.force_authenticate(user)
+        payloads = [build_test(n) for n in range(tests)]
+        answers = [answer for payload in payloads for answer in payload['answers']]
+        questions = VocationalQuestion.objects.resolve(answer['pregunta'] for answer in answers)
+        options = VocationalOption.objects.resolve(answer['respuesta'] for answer in answers)
+
+        def legacy():
+            for payload in payloads:
+                data = dict(payload)
+                answers = data.pop('answers')
+                test = VocationalTest.objects.create(user=user, **data)
+                for answer in answers:
+                    VocationalAnswer.objects.create(
+                        test=test, question_id=questions[answer['pregunta']],
+                        option_id=options[answer['respuesta']]
+                    )
+
+        def single():
+            for payload in payloads:
+                client.post('/api/vocational/create-test/', payload, format='json')
+
+        def batch():
+            client.post('/api/vocational/create-tests/', payloads, format='json')
+
+        rows = []
+        for name, function in [('legacy', legacy), ('create-test/', single), ('create-tests/', batch)]:
+            reset_queries()
+            with CaptureQueriesContext(connection) as context:
+                function()
+            queries = len(context)
+            seconds = measure(function, repeat=3)
+            rows.append([
+                name,
+                f'{seconds / tests * 1000:.2f}',
+                f'{queries / tests:.1f}',
+            ])
+        report(
+            f'{tests} tests x {QUESTIONS} respuestas ({connection.vendor})',
+            rows, ['método', 'ms por test', 'consultas por test']
+        )
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -1,7 +1,7 @@
 from django.contrib import admin
 from .models import (
     LearningPath, Course, Lesson, UserLearningPath,
-    LessonProgress, UserCourseProgress, LearningPathCourse
+    LessonProgress, UserCourseProgress, LearningPathCourse, UserDashboard, GeneratedRoute
 )
 
 
@@ -68,3 +68,19 @@ class LearningPathCourseAdmin(admin.ModelAdmin):
     list_filter = ['path__categoria', 'course__categoria']
     search_fields = ['path__nombre', 'course__titulo']
     ordering = ['path', 'orden']
+
+
+@admin.register(UserDashboard)
+class UserDashboardAdmin(admin.ModelAdmin):
+    list_display = [
+        'user', 'cursos_total', 'rutas_activas', 'lecciones_completadas', 'ultima_actividad'
+    ]
+    search_fields = ['user__nombres', 'user__apellidos', 'user__email']
+    readonly_fields = [field.name for field in UserDashboard._meta.fields]
+
+
+@admin.register(GeneratedRoute)
+class GeneratedRouteAdmin(admin.ModelAdmin):
+    list_display = ['path', 'respuestas_hash', 'created_at']
+    search_fields = ['path__nombre', 'respuestas_hash']
+    readonly_fields = ['respuestas_hash', 'path', 'ruta', 'created_at']
@@ -0,0 +1,184 @@
+"""
+Conversaciones con el asistente virtual.
+
+El estado de cada conversación vive en la caché de Django, por usuario y
+conversation_id, hasta ASSISTANT_CONVERSATION_TIMEOUT segundos después del
+último mensaje: un resumen de lo anterior y a lo más
+ASSISTANT_HISTORY_MESSAGES mensajes recientes completos. Cada turno envía al
+modelo las instrucciones del asistente con el resumen como instrucciones de
+sistema, los mensajes recientes y el nuevo mensaje, en lugar de todo el
+historial como un solo texto.
+
+Cuando los mensajes recientes rebasan el límite, los más antiguos se
+incorporan al resumen con otra llamada al modelo. En el stream eso ocurre
+después del evento `done`: el texto y el conversation_id ya llegaron al
+cliente, pero el stream sigue abierto hasta que termina el resumen. Si
+mientras tanto llega otro turno de la misma conversación, el resumen se
+aplica sin perderlo (ver merge_compacted).
+"""
+
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+
+from ascendya import llm
+
+
+ASSISTANT_CONTEXT = """Eres un asistente virtual especializado en educación y mentor académico llamado "Ascend AI".
+Tu función es ayudar a estudiantes que se preparan para exámenes de admisión universitaria y su desarrollo académico.
+
+CARACTERÍSTICAS:
+- Eres amigable, motivador y profesional
+- Proporcionas respuestas claras y estructuradas
+- Te enfocas en educación, estudio y desarrollo personal
+- Puedes analizar documentos académicos cuando se adjunten
+- Ofreces consejos de estudio personalizados
+- Ayudas con dudas específicas de materias
+
+CAPACIDADES:
+- Responder preguntas sobre materias académicas
+- Crear planes de estudio personalizados
+- Analizar documentos y archivos académicos
+- Proporcionar técnicas de estudio
+- Dar consejos motivacionales
+- Explicar conceptos complejos de forma simple
+
+REGLAS:
+- Siempre mantén un tono positivo y motivador
+- Si no sabes algo específico, reconócelo honestamente
+- Sugiere recursos adicionales cuando sea apropiado
+- Enfócate en el aprendizaje efectivo
+- Personaliza tus respuestas según el contexto del usuario
+
+Responde en español de manera conversacional y útil."""
+
+# Un mensaje puede incluir el texto de un archivo adjunto
+MAX_MESSAGE_LENGTH = 8000
+MAX_SUMMARY_LENGTH = 2000
+
+ROLES = {'user': 'Usuario', 'model': 'Asistente'}
+
+
+def conversation_key(user_id, conversation_id):
+    return f'assistant:conversation:{user_id}:{conversation_id}'
+
+
+def new_conversation():
+    return {'summary': '', 'messages': []}
+
+
+def system_prompt(conversation):
+    if not conversation['summary']:
+        return ASSISTANT_CONTEXT
+    return (
+        f"{ASSISTANT_CONTEXT}\n\nResumen de la conversación hasta ahora:\n"
+        f"{conversation['summary']}"
+    )
+
+
+def model_contents(conversation, message):
+    return [
+        {'role': role, 'parts': [{'text': text}]} for role, text in conversation['messages']
+    ] + [llm.user_message(message)]
+
+
+def add_turn(conversation, message, answer):
+    """
+    Agrega el turno a la conversación; regresa True si hay que resumirla
+    """
+    conversation['messages'] += [['user', message], ['model', answer]]
+    return len(conversation['messages']) > settings.ASSISTANT_HISTORY_MESSAGES
+
+
+def summarize(summary, messages):
+    transcript = '\n'.join(f'{ROLES[role]}: {text}' for role, text in messages)
+    prompt = (
+        'Resume en a lo más 150 palabras la conversación entre un estudiante y su '
+        'asistente académico: temas tratados, datos del estudiante, acuerdos y '
+        'preguntas pendientes. Responde solo con el resumen.\n\n'
+        f"Resumen anterior:\n{summary or '(ninguno)'}\n\nMensajes nuevos:\n{transcript}"
+    )
+    try:
+        return llm.generate([llm.user_message(prompt)])[:MAX_SUMMARY_LENGTH]
+    except llm.ModelError:
+        # Se conserva el resumen anterior; la historia sigue acotada
+        return summary
+
+
+def compact(conversation):
+    """
+    Incorpora al resumen los mensajes más antiguos y deja los turnos más
+    recientes (la mitad del límite)
+    """
+    keep = settings.ASSISTANT_HISTORY_MESSAGES // 4 * 2
+    old = conversation['messages'][:len(conversation['messages']) - keep]
+    conversation['summary'] = summarize(conversation['summary'], old)
+    conversation['messages'] = conversation['messages'][len(old):]
+
+
+def merge_compacted(current, summarized, compacted):
+    """
+    Aplica a `current` (el estado en la caché) el resumen `compacted` de
+    `summarized`, con los mensajes que se agregaron después; regresa False si
+    la conversación cambió de otra forma y el resumen ya no aplica
+    """
+    if current is None or current['summary'] != summarized['summary']:
+        return False
+    messages = summarized['messages']
+    if current['messages'][:len(messages)] != messages:
+        return False
+    current['summary'] = compacted['summary']
+    current['messages'] = compacted['messages'] + current['messages'][len(messages):]
+    return True
+
+
+def reply(user_id, conversation_id, message):
+    """
+    Respuesta completa del asistente al mensaje
+    """
+    key = conversation_key(user_id, conversation_id)
+    conversation = cache.get(key) or new_conversation()
+    answer = llm.generate(model_contents(conversation, message), system=system_prompt(conversation))
+    if add_turn(conversation, message, answer):
+        compact(conversation)
+    cache.set(key, conversation, settings.ASSISTANT_CONVERSATION_TIMEOUT)
+    return answer
+
+
+def event(name, data):
+    return f'event: {name}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n'.encode()
+
+
+async def stream_reply(user_id, conversation_id, message):
+    """
+    Server-sent events del turno: `token` con cada fragmento de la respuesta
+    conforme llega del modelo y `done` al terminar, o `error`
+    """
+    key = conversation_key(user_id, conversation_id)
+    conversation = await cache.aget(key) or new_conversation()
+    parts = []
+    try:
+        async for text in llm.astream(
+            model_contents(conversation, message), system=system_prompt(conversation)
+        ):
+            parts.append(text)
+            yield event('token', {'text': text})
+    except llm.ModelError as exc:
+        yield event('error', {'error': f'No se pudo obtener la respuesta: {exc}'})
+        return
+    yield event('done', {'conversation_id': conversation_id})
+
+    # El turno se guarda antes de resumir, por si el cliente cierra la conexión
+    timeout = settings.ASSISTANT_CONVERSATION_TIMEOUT
+    if not add_turn(conversation, message, ''.join(parts)):
+        await cache.aset(key, conversation, timeout)
+        return
+    await cache.aset(key, conversation, timeout)
+    summarized = dict(conversation)
+    await sync_to_async(compact, thread_sensitive=False)(conversation)
+    # Mientras se resumía pudo llegar otro turno: se conserva
+    current = await cache.aget(key)
+    if merge_compacted(current, summarized, conversation):
+        await cache.aset(key, current, timeout)
@@ -0,0 +1,161 @@
+"""
+Mantenimiento del resumen por usuario (UserDashboard).
+
+Cada cambio de progreso se traduce en un UPDATE con expresiones F sobre la
+fila del usuario. Si la fila no existe no se crea aquí: se calcula completa la
+primera vez que se lee, con rebuild(). Cuando no es posible conocer la
+diferencia (p. ej. una instancia que no se leyó de la base de datos) la fila
+se elimina para que la siguiente lectura la reconstruya.
+
+`ultima_actividad` es la fecha más reciente del progreso del usuario: inicio
+y fin de lecciones y cursos, última modificación de sus rutas y fecha de sus
+tests. Los cambios la adelantan con la fecha de la fila que cambió; los
+borrados y las fechas de fin que se quitan la recalculan en el mismo UPDATE
+(recent_activity()).
+"""
+
+from datetime import datetime, timezone as dt_timezone
+
+from django.db.models import (
+    BigIntegerField, Case, Count, F, Max, OuterRef, Q, Subquery, Sum, Value, When
+)
+from django.db.models.functions import Coalesce, Greatest, NullIf
+
+from vocational.models import VocationalTest
+from .models import UserDashboard, UserCourseProgress, UserLearningPath, LessonProgress
+
+
+ESTADO_FIELDS = {
+    'activa': 'rutas_activas',
+    'terminada': 'rutas_terminadas',
+    'descartada': 'rutas_descartadas',
+}
+
+
+def top_path(user_id):
+    return (
+        UserLearningPath.objects.filter(user_id=user_id, estado='activa')
+        .order_by('-progreso', '-updated_at')
+        .values('path_id', 'progreso')
+        .first()
+    ) or {'path_id': None, 'progreso': 0}
+
+
+def latest(*dates):
+    return max((date for date in dates if date is not None), default=None)
+
+
+# Cota inferior para comparar fechas que pueden ser NULL
+NO_ACTIVITY = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def recent_activity(user_id):
+    """
+    Expresión con la fecha más reciente del progreso del usuario, para
+    asignar ultima_actividad cuando puede retroceder
+    """
+    sources = [
+        (LessonProgress, 'fecha_inicio'), (LessonProgress, 'fecha_fin'),
+        (UserCourseProgress, 'fecha_inicio'), (UserCourseProgress, 'fecha_fin'),
+        (UserLearningPath, 'updated_at'), (VocationalTest, 'fecha'),
+    ]
+    dates = [
+        Coalesce(Subquery(
+            model.objects.filter(user_id=user_id).order_by().values('user')
+            .annotate(last=Max(field)).values('last')
+        ), Value(NO_ACTIVITY))
+        for model, field in sources
+    ]
+    return NullIf(Greatest(*dates), Value(NO_ACTIVITY))
+
+
+def rebuild(user):
+    """
+    Calcula el resumen completo del usuario y lo guarda
+    """
+    courses = UserCourseProgress.objects.filter(user=user).aggregate(
+        cursos_total=Count('id'),
+        cursos_completados=Count('id', filter=Q(porcentaje__gte=100)),
+        porcentaje_total=Coalesce(Sum('porcentaje'), 0),
+        cursos_inicio=Max('fecha_inicio'),
+        cursos_fin=Max('fecha_fin'),
+    )
+    paths = UserLearningPath.objects.filter(user=user).aggregate(**{
+        field: Count('id', filter=Q(estado=estado)) for estado, field in ESTADO_FIELDS.items()
+    }, rutas_actividad=Max('updated_at'))
+    lessons = LessonProgress.objects.filter(user=user).aggregate(
+        lecciones_iniciadas=Count('id'),
+        lecciones_completadas=Count('id', filter=Q(completado=True)),
+        minutos_vistos=Coalesce(Sum('duracion_real'), 0),
+        lecciones_inicio=Max('fecha_inicio'),
+        lecciones_fin=Max('fecha_fin'),
+    )
+    last_test = user.vocational_tests.order_by('-fecha').values('resultado', 'fecha').first()
+    top = top_path(user.pk)
+    activity = latest(
+        courses.pop('cursos_inicio'), courses.pop('cursos_fin'), paths.pop('rutas_actividad'),
+        lessons.pop('lecciones_inicio'), lessons.pop('lecciones_fin'),
+        last_test['fecha'] if last_test else None,
+    )
+
+    dashboard, created = UserDashboard.objects.update_or_create(user=user, defaults={
+        **courses, **paths, **lessons,
+        'tests_total': user.vocational_tests.count(),
+        'ultimo_resultado': last_test['resultado'] if last_test else None,
+        'ruta_principal_id': top['path_id'],
+        'ruta_principal_progreso': top['progreso'],
+        'ultima_actividad': activity,
+    })
+    return dashboard
+
+
+def apply(user_id, counters, activity=None, **values):
+    """
+    Suma `counters` a los contadores del usuario, adelanta ultima_actividad a
+    `activity` y asigna `values` en un solo UPDATE
+    """
+    changes = {field: F(field) + delta for field, delta in counters.items() if delta}
+    if activity is not None:
+        changes['ultima_actividad'] = Greatest(
+            Coalesce('ultima_actividad', Value(activity)), Value(activity)
+        )
+    if changes or values:
+        UserDashboard.objects.filter(user_id=user_id).update(**changes, **values)
+
+
+def invalidate(user_id):
+    UserDashboard.objects.filter(user_id=user_id).delete()
+
+
+def promote_path(user_path):
+    """
+    Valores para `apply()` que hacen de `user_path` la ruta principal si
+    supera a la actual, evaluados en el mismo UPDATE
+    """
+    condition = Q(ruta_principal__isnull=True) | Q(ruta_principal_progreso__lte=user_path.progreso)
+    return {
+        'ruta_principal_id': Case(
+            When(condition, then=Value(user_path.path_id)), default=F('ruta_principal_id'),
+            output_field=BigIntegerField()
+        ),
+        'ruta_principal_progreso': Case(
+            When(condition, then=Value(user_path.progreso)), default=F('ruta_principal_progreso')
+        ),
+    }
+
+
+def replace_top_path(user_path):
+    """
+    Si `user_path` era la ruta principal y bajó, terminó o se eliminó, elige
+    de nuevo la ruta activa con mayor progreso en un solo UPDATE
+    """
+    top = (
+        UserLearningPath.objects.filter(user_id=OuterRef('user_id'), estado='activa')
+        .order_by('-progreso', '-updated_at')
+    )
+    UserDashboard.objects.filter(
+        user_id=user_path.user_id, ruta_principal_id=user_path.path_id
+    ).update(
+        ruta_principal_id=Subquery(top.values('path_id')[:1]),
+        ruta_principal_progreso=Coalesce(Subquery(top.values('progreso')[:1]), 0),
+    )
@@ -0,0 +1,213 @@
+"""
+Acumulación en caché del tiempo de reproducción de las lecciones.
+
+El reproductor envía cada tanto los segundos vistos de varias lecciones en
+una sola petición. Los segundos se suman en la caché por (usuario, lección)
+dentro de ventanas de HEARTBEAT_FLUSH_INTERVAL segundos, sin tocar la base de
+datos. Las ventanas cerradas se vuelcan a LessonProgress.duracion_real con
+un bulk_update; las vuelca la primera petición que las encuentra pendientes
+(con un candado en la caché) o el comando `flush_heartbeats`.
+
+Claves de cada ventana:
+
+- heartbeat:<ventana>:<usuario>:<lección>  segundos acumulados
+- heartbeat:<ventana>:slots                número de pares registrados
+- heartbeat:<ventana>:slot:<n>             par "<usuario>:<lección>"
+
+duracion_real guarda minutos completos: los segundos que no completan un
+minuto quedan en heartbeat:remainder:<usuario>:<lección> y se suman al
+siguiente volcado del par.
+
+Con LocMemCache cada proceso tiene su propia caché: el volcado ocurre en el
+mismo worker y el comando no ve esos datos. En producción se espera
+REDIS_URL (ver settings.py).
+"""
+
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from . import dashboard
+from .models import Lesson, LessonProgress
+
+
+FLUSHED_KEY = 'heartbeat:flushed'
+LOCK_KEY = 'heartbeat:flush-lock'
+REMAINDER_TIMEOUT = 60 * 60 * 24 * 30
+
+
+def current_window():
+    return int(time.time() // settings.HEARTBEAT_FLUSH_INTERVAL)
+
+
+def retention():
+    return settings.HEARTBEAT_FLUSH_INTERVAL * settings.HEARTBEAT_RETENTION_WINDOWS
+
+
+def counter_key(window, user_id, lesson_id):
+    return f'heartbeat:{window}:{user_id}:{lesson_id}'
+
+
+def record(user_id, deltas):
+    """
+    Suma los segundos de `deltas` ({lesson_id: segundos}) en la ventana actual
+    """
+    window = current_window()
+    for lesson_id, seconds in deltas.items():
+        key = counter_key(window, user_id, lesson_id)
+        if cache.add(key, seconds, retention()):
+            # Primer latido del par en esta ventana: registrarlo para el volcado
+            slots_key = f'heartbeat:{window}:slots'
+            cache.add(slots_key, 0, retention())
+            slot = cache.incr(slots_key)
+            cache.set(f'heartbeat:{window}:slot:{slot}', f'{user_id}:{lesson_id}', retention())
+        else:
+            cache.incr(key, seconds)
+
+
+def pending_windows(include_current=False):
+    """
+    Ventanas que ya se pueden volcar. La ventana anterior a la actual se
+    espera un intervalo más por si aún llegan latidos calculados con ella.
+    """
+    last = current_window() - (0 if include_current else 2)
+    flushed = cache.get(FLUSHED_KEY)
+    first = last - settings.HEARTBEAT_RETENTION_WINDOWS + 1
+    if flushed is not None:
+        first = max(first, flushed + 1)
+    return range(first, last + 1)
+
+
+def collect(windows):
+    """
+    Lee y elimina de la caché los segundos acumulados en `windows`
+    """
+    slot_counts = cache.get_many([f'heartbeat:{window}:slots' for window in windows])
+    slot_keys = [
+        f'heartbeat:{window}:slot:{slot}'
+        for window in windows
+        for slot in range(1, slot_counts.get(f'heartbeat:{window}:slots', 0) + 1)
+    ]
+    pairs = cache.get_many(slot_keys)
+    counter_keys = {}
+    for slot_key, pair in pairs.items():
+        window = slot_key.split(':')[1]
+        user_id, lesson_id = pair.split(':')
+        counter_keys[counter_key(window, user_id, lesson_id)] = (int(user_id), int(lesson_id))
+    counters = cache.get_many(list(counter_keys))
+    cache.delete_many([*slot_counts, *slot_keys, *counters])
+
+    seconds = defaultdict(int)
+    for key, value in counters.items():
+        seconds[counter_keys[key]] += value
+    return seconds
+
+
+def remainder_key(user_id, lesson_id):
+    return f'heartbeat:remainder:{user_id}:{lesson_id}'
+
+
+def whole_minutes(seconds):
+    """
+    Minutos completos de cada (usuario, lección) con los segundos que
+    sobraron de volcados anteriores; guarda los nuevos sobrantes
+    """
+    keys = {pair: remainder_key(*pair) for pair in seconds}
+    remainders = cache.get_many(list(keys.values()))
+    minutes = {}
+    carried = {}
+    for pair, value in seconds.items():
+        total = value + remainders.get(keys[pair], 0)
+        minutes[pair], carried[keys[pair]] = divmod(total, 60)
+    cache.set_many(
+        {key: value for key, value in carried.items() if value}, REMAINDER_TIMEOUT
+    )
+    cache.delete_many([key for key, value in carried.items() if not value and key in remainders])
+    return {pair: value for pair, value in minutes.items() if value}
+
+
+def save_watch_time(seconds):
+    """
+    Suma a duracion_real los minutos completos de cada (usuario, lección) y
+    crea el progreso de las lecciones sin registro
+    """
+    minutes = whole_minutes(seconds)
+    if not minutes:
+        return
+
+    user_ids = {user_id for user_id, lesson_id in minutes}
+    lesson_ids = {lesson_id for user_id, lesson_id in minutes}
+    existing = {
+        (row.user_id, row.lesson_id): row
+        for row in LessonProgress.objects.filter(
+            user_id__in=user_ids, lesson_id__in=lesson_ids
+        ).only('id', 'user_id', 'lesson_id', 'duracion_real')
+    }
+    to_update = []
+    missing = []
+    for pair, value in minutes.items():
+        if pair in existing:
+            existing[pair].duracion_real += value
+            to_update.append(existing[pair])
+        else:
+            missing.append(pair)
+
+    valid_lessons = set(
+        Lesson.objects.filter(pk__in={lesson_id for user_id, lesson_id in missing})
+        .values_list('pk', flat=True)
+    ) if missing else set()
+    to_create = [
+        LessonProgress(
+            user_id=user_id, lesson_id=lesson_id, duracion_real=minutes[user_id, lesson_id]
+        )
+        for user_id, lesson_id in missing if lesson_id in valid_lessons
+    ]
+
+    # bulk_update y bulk_create no emiten señales: el resumen se ajusta aquí
+    counters = defaultdict(lambda: defaultdict(int))
+    for row in [*to_update, *to_create]:
+        counters[row.user_id]['minutos_vistos'] += minutes[row.user_id, row.lesson_id]
+    for row in to_create:
+        counters[row.user_id]['lecciones_iniciadas'] += 1
+
+    with transaction.atomic():
+        LessonProgress.objects.bulk_update(to_update, ['duracion_real'], batch_size=500)
+        LessonProgress.objects.bulk_create(to_create, batch_size=500, ignore_conflicts=True)
+        # bulk_create asigna fecha_inicio a las lecciones nuevas
+        started = defaultdict(list)
+        for row in to_create:
+            started[row.user_id].append(row.fecha_inicio)
+        for user_id, values in counters.items():
+            dashboard.apply(user_id, values, activity=dashboard.latest(*started[user_id]))
+
+
+def flush(include_current=False):
+    """
+    Vuelca las ventanas pendientes a la base de datos. Regresa el número de
+    pares (usuario, lección) volcados, o None si otro proceso está volcando.
+    Con include_current también se vacían las ventanas abiertas, que se
+    vuelven a revisar en los volcados siguientes.
+    """
+    windows = pending_windows(include_current)
+    if not windows:
+        return 0
+    if not cache.add(LOCK_KEY, 1, settings.HEARTBEAT_FLUSH_INTERVAL):
+        return None
+    try:
+        seconds = collect(windows)
+        save_watch_time(seconds)
+        # Las ventanas abiertas no se marcan para recoger los latidos que aún lleguen
+        closed = current_window() - 2
+        if windows[0] <= closed:
+            cache.set(FLUSHED_KEY, min(windows[-1], closed), retention())
+        return len(seconds)
+    finally:
+        cache.delete(LOCK_KEY)
+
+
+def flush_if_due():
+    if cache.get(FLUSHED_KEY, current_window() - 3) < current_window() - 2:
+        flush()
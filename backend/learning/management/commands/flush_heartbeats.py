@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from learning import heartbeats
+
+
+class Command(BaseCommand):
+    help = 'Vuelca a la base de datos el tiempo de reproducción acumulado en caché'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all', action='store_true', dest='include_current',
+            help='Incluir la ventana actual y la anterior'
+        )
+
+    def handle(self, *args, **options):
+        flushed = heartbeats.flush(include_current=options['include_current'])
+        if flushed is None:
+            self.stdout.write(self.style.WARNING('Otro proceso está volcando los latidos'))
+            return
+        self.stdout.write(self.style.SUCCESS(f'Latidos volcados: {flushed} lecciones de usuarios'))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from learning import progress
+
+
+class Command(BaseCommand):
+    help = 'Recalcula el progreso de cursos y rutas a partir de las lecciones completadas'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--course', type=int, action='append', dest='courses',
+            help='Limitar a un curso (se puede repetir)'
+        )
+        parser.add_argument(
+            '--user', type=int, action='append', dest='users',
+            help='Limitar a un usuario (se puede repetir)'
+        )
+
+    def handle(self, *args, **options):
+        courses, paths = progress.recompute(
+            course_ids=options['courses'], user_ids=options['users']
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Progreso recalculado: {courses} cursos y {paths} rutas de usuarios'
+        ))
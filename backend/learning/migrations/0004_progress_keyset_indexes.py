@@ -0,0 +1,39 @@
+# Generated by Django 5.2.5 on 2026-10-18 06:30
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("learning", "0003_lesson_updated_at_learningpathcourse_updated_at"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="lessonprogress",
+            index=models.Index(
+                fields=["fecha_inicio", "id"], name="lesson_progress_fecha_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="lessonprogress",
+            index=models.Index(
+                fields=["user", "fecha_inicio", "id"], name="lesson_progress_user_fecha_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="usercourseprogress",
+            index=models.Index(
+                fields=["fecha_inicio", "id"], name="course_progress_fecha_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="usercourseprogress",
+            index=models.Index(
+                fields=["user", "fecha_inicio", "id"], name="course_progress_user_fecha_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,65 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("learning", "0004_progress_keyset_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UserDashboard",
+            fields=[
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="dashboard",
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                ("cursos_total", models.IntegerField(default=0)),
+                ("cursos_completados", models.IntegerField(default=0)),
+                (
+                    "porcentaje_total",
+                    models.IntegerField(
+                        default=0, help_text="Suma del porcentaje de cada curso"
+                    ),
+                ),
+                ("rutas_activas", models.IntegerField(default=0)),
+                ("rutas_terminadas", models.IntegerField(default=0)),
+                ("rutas_descartadas", models.IntegerField(default=0)),
+                ("lecciones_iniciadas", models.IntegerField(default=0)),
+                ("lecciones_completadas", models.IntegerField(default=0)),
+                ("minutos_vistos", models.IntegerField(default=0)),
+                ("tests_total", models.IntegerField(default=0)),
+                (
+                    "ultimo_resultado",
+                    models.CharField(blank=True, max_length=255, null=True),
+                ),
+                ("ruta_principal_progreso", models.IntegerField(default=0)),
+                ("ultima_actividad", models.DateTimeField(blank=True, null=True)),
+                (
+                    "ruta_principal",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="learning.learningpath",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Resumen de Usuario",
+                "verbose_name_plural": "Resúmenes de Usuarios",
+                "db_table": "user_dashboards",
+            },
+        ),
+    ]
@@ -0,0 +1,128 @@
+from django.db import migrations, models
+from django.db.models import Count, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Greatest, Least, NullIf
+from django.utils import timezone
+
+
+def recompute_progress(apps, schema_editor):
+    # Los porcentajes anteriores los escribían los clientes. Copia de
+    # learning.progress.recompute() con los modelos históricos.
+    Course = apps.get_model("learning", "Course")
+    Lesson = apps.get_model("learning", "Lesson")
+    LessonProgress = apps.get_model("learning", "LessonProgress")
+    LearningPathCourse = apps.get_model("learning", "LearningPathCourse")
+    UserCourseProgress = apps.get_model("learning", "UserCourseProgress")
+    UserLearningPath = apps.get_model("learning", "UserLearningPath")
+    UserDashboard = apps.get_model("learning", "UserDashboard")
+
+    Course.objects.update(
+        duracion_total=Coalesce(
+            Subquery(
+                Lesson.objects.filter(course=OuterRef("pk"))
+                .order_by()
+                .values("course")
+                .annotate(total=Sum(Greatest("duracion_estimada", 1)))
+                .values("total")
+            ),
+            0,
+        )
+    )
+
+    UserCourseProgress.objects.update(
+        minutos_completados=Coalesce(
+            Subquery(
+                LessonProgress.objects.filter(
+                    user=OuterRef("user_id"),
+                    lesson__course=OuterRef("course_id"),
+                    completado=True,
+                )
+                .order_by()
+                .values("user")
+                .annotate(total=Sum(Greatest("lesson__duracion_estimada", 1)))
+                .values("total")
+            ),
+            0,
+        )
+    )
+    course_total = Subquery(
+        Course.objects.filter(pk=OuterRef("course_id")).values("duracion_total")
+    )
+    UserCourseProgress.objects.update(
+        porcentaje=Coalesce(
+            Least(
+                F("minutos_completados") * 100 / NullIf(course_total, 0), Value(100)
+            ),
+            0,
+        )
+    )
+    UserCourseProgress.objects.filter(
+        porcentaje__gte=100, fecha_fin__isnull=True
+    ).update(fecha_fin=timezone.now())
+    UserCourseProgress.objects.filter(porcentaje__lt=100).update(fecha_fin=None)
+
+    UserLearningPath.objects.update(
+        porcentaje_cursos=Coalesce(
+            Subquery(
+                UserCourseProgress.objects.filter(
+                    user=OuterRef("user_id"),
+                    course__learning_paths__path=OuterRef("path_id"),
+                )
+                .order_by()
+                .values("user")
+                .annotate(total=Sum("porcentaje"))
+                .values("total")
+            ),
+            0,
+        )
+    )
+    path_courses = Subquery(
+        LearningPathCourse.objects.filter(path=OuterRef("path_id"))
+        .order_by()
+        .values("path")
+        .annotate(total=Count("id"))
+        .values("total")
+    )
+    UserLearningPath.objects.update(
+        progreso=Coalesce(
+            Least(F("porcentaje_cursos") / NullIf(path_courses, 0), Value(100)), 0
+        )
+    )
+    UserLearningPath.objects.filter(estado="activa", progreso__gte=100).update(
+        estado="terminada"
+    )
+
+    # Los resúmenes se reconstruyen al leerlos
+    UserDashboard.objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("learning", "0005_user_dashboard"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="course",
+            name="duracion_total",
+            field=models.IntegerField(
+                default=0,
+                help_text="Suma de la duración de las lecciones (mínimo 1 por lección)",
+            ),
+        ),
+        migrations.AddField(
+            model_name="usercourseprogress",
+            name="minutos_completados",
+            field=models.IntegerField(
+                default=0, help_text="Duración de las lecciones completadas"
+            ),
+        ),
+        migrations.AddField(
+            model_name="userlearningpath",
+            name="porcentaje_cursos",
+            field=models.IntegerField(
+                default=0, help_text="Suma del porcentaje de los cursos de la ruta"
+            ),
+        ),
+        migrations.RunPython(recompute_progress, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.5 on 2026-10-18 07:04
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("learning", "0006_progress_engine"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="userlearningpath",
+            index=models.Index(
+                fields=["user", "estado", "-progreso", "-updated_at"],
+                name="user_path_estado_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.5 on 2026-10-18 07:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("learning", "0007_user_path_estado_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="GeneratedRoute",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("respuestas_hash", models.CharField(max_length=64)),
+                (
+                    "ruta",
+                    models.JSONField(help_text="Respuesta del modelo ya validada"),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "path",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="generated_routes",
+                        to="learning.learningpath",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Ruta Generada",
+                "verbose_name_plural": "Rutas Generadas",
+                "db_table": "generated_routes",
+                "indexes": [
+                    models.Index(
+                        fields=["respuestas_hash", "-created_at"],
+                        name="generated_route_hash_idx",
+                    )
+                ],
+            },
+        ),
+    ]
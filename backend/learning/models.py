@@ -2,6 +2,93 @@ from django.db import models
 from django.conf import settings
 
 
+class LearningPathQuerySet(models.QuerySet):
+    """
+    QuerySet para las rutas de aprendizaje
+    """
+    def with_courses_count(self):
+        return self.annotate(courses_count=models.Count('path_courses', distinct=True))
+    
+    def with_courses(self):
+        # Precarga los cursos de la ruta con su conteo de lecciones
+        return self.prefetch_related(
+            models.Prefetch(
+                'path_courses',
+                queryset=LearningPathCourse.objects.prefetch_related(
+                    models.Prefetch('course', queryset=Course.objects.with_lessons_count())
+                )
+            )
+        )
+
+
+class CourseQuerySet(models.QuerySet):
+    """
+    QuerySet para los cursos
+    """
+    def with_lessons_count(self):
+        return self.annotate(lessons_count=models.Count('lessons', distinct=True))
+
+
+class LessonQuerySet(models.QuerySet):
+    """
+    QuerySet para las lecciones
+    """
+    def without_content(self):
+        # El contenido solo se envía en el detalle de la lección
+        return self.defer('contenido')
+
+
+class UserLearningPathQuerySet(models.QuerySet):
+    """
+    QuerySet para las rutas de aprendizaje de usuarios
+    """
+    def for_listing(self):
+        return self.select_related('user').prefetch_related(
+            models.Prefetch('path', queryset=LearningPath.objects.with_courses_count())
+        )
+
+
+class LessonProgressQuerySet(models.QuerySet):
+    """
+    QuerySet para el progreso de lecciones
+    """
+    def for_listing(self):
+        return self.select_related('user', 'lesson').defer('lesson__contenido')
+
+
+class UserCourseProgressQuerySet(models.QuerySet):
+    """
+    QuerySet para el progreso de cursos
+    """
+    def for_listing(self):
+        return self.select_related('user').prefetch_related(
+            models.Prefetch('course', queryset=Course.objects.with_lessons_count())
+        )
+
+
+class TrackedModel(models.Model):
+    """
+    Recuerda los valores de `tracked_fields` tal como se leyeron de la base de
+    datos, para que las señales calculen diferencias sin volver a consultar
+    """
+    tracked_fields = []
+    
+    class Meta:
+        abstract = True
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_values()
+        return instance
+    
+    def remember_values(self):
+        deferred = self.get_deferred_fields()
+        self.loaded_values = {
+            name: getattr(self, name) for name in self.tracked_fields if name not in deferred
+        }
+
+
 class LearningPath(models.Model):
     """
     Modelo para las rutas de aprendizaje
@@ -12,6 +99,8 @@ class LearningPath(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = LearningPathQuerySet.as_manager()
+    
     class Meta:
         db_table = 'learning_paths'
         verbose_name = 'Ruta de Aprendizaje'
@@ -37,9 +126,14 @@ class Course(models.Model):
     nivel = models.CharField(max_length=20, choices=NIVEL_CHOICES)
     is_externo = models.BooleanField(default=False)
     url = models.URLField(blank=True, null=True)
+    duracion_total = models.IntegerField(
+        default=0, help_text="Suma de la duración de las lecciones (mínimo 1 por lección)"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = CourseQuerySet.as_manager()
+    
     class Meta:
         db_table = 'courses'
         verbose_name = 'Curso'
@@ -49,7 +143,7 @@ class Course(models.Model):
         return self.titulo
 
 
-class Lesson(models.Model):
+class Lesson(TrackedModel):
     """
     Modelo para las lecciones de los cursos
     """
@@ -58,6 +152,11 @@ class Lesson(models.Model):
     contenido = models.TextField()
     orden = models.IntegerField()
     duracion_estimada = models.IntegerField(help_text="Duración en minutos")
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    objects = LessonQuerySet.as_manager()
+    
+    tracked_fields = ['course_id', 'duracion_estimada']
     
     class Meta:
         db_table = 'lessons'
@@ -69,7 +168,7 @@ class Lesson(models.Model):
         return f"{self.course.titulo} - {self.titulo}"
 
 
-class UserLearningPath(models.Model):
+class UserLearningPath(TrackedModel):
     """
     Modelo para el seguimiento de rutas de aprendizaje de usuarios
     """
@@ -84,20 +183,32 @@ class UserLearningPath(models.Model):
     estado = models.CharField(max_length=20, choices=ESTADO_CHOICES, default='activa')
     feedback = models.TextField(blank=True, null=True)
     progreso = models.IntegerField(default=0, help_text="Progreso en porcentaje")
+    porcentaje_cursos = models.IntegerField(
+        default=0, help_text="Suma del porcentaje de los cursos de la ruta"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = UserLearningPathQuerySet.as_manager()
+    tracked_fields = ['estado', 'progreso']
+    
     class Meta:
         db_table = 'user_learning_paths'
         verbose_name = 'Ruta de Usuario'
         verbose_name_plural = 'Rutas de Usuarios'
         unique_together = ['user', 'path']
+        indexes = [
+            # Ruta principal del dashboard: la activa con mayor progreso
+            models.Index(
+                fields=['user', 'estado', '-progreso', '-updated_at'], name='user_path_estado_idx'
+            ),
+        ]
     
     def __str__(self):
         return f"{self.user.get_full_name()} - {self.path.nombre}"
 
 
-class LessonProgress(models.Model):
+class LessonProgress(TrackedModel):
     """
     Modelo para el progreso de lecciones individuales
     """
@@ -108,43 +219,63 @@ class LessonProgress(models.Model):
     completado = models.BooleanField(default=False)
     duracion_real = models.IntegerField(default=0, help_text="Minutos vistos")
     
+    objects = LessonProgressQuerySet.as_manager()
+    tracked_fields = ['completado', 'duracion_real']
+    
     class Meta:
         db_table = 'lesson_progress'
         verbose_name = 'Progreso de Lección'
         verbose_name_plural = 'Progreso de Lecciones'
         unique_together = ['user', 'lesson']
+        indexes = [
+            models.Index(fields=['fecha_inicio', 'id'], name='lesson_progress_fecha_idx'),
+            models.Index(fields=['user', 'fecha_inicio', 'id'], name='lesson_progress_user_fecha_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.get_full_name()} - {self.lesson.titulo}"
 
 
-class UserCourseProgress(models.Model):
+class UserCourseProgress(TrackedModel):
     """
     Modelo para el progreso general de cursos
     """
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='course_progress')
     course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='user_progress')
     porcentaje = models.IntegerField(default=0)
+    minutos_completados = models.IntegerField(
+        default=0, help_text="Duración de las lecciones completadas"
+    )
     fecha_inicio = models.DateTimeField(auto_now_add=True)
     fecha_fin = models.DateTimeField(blank=True, null=True)
     
+    objects = UserCourseProgressQuerySet.as_manager()
+    tracked_fields = ['porcentaje']
+    
     class Meta:
         db_table = 'user_course_progress'
         verbose_name = 'Progreso de Curso'
         verbose_name_plural = 'Progreso de Cursos'
         unique_together = ['user', 'course']
+        indexes = [
+            models.Index(fields=['fecha_inicio', 'id'], name='course_progress_fecha_idx'),
+            models.Index(fields=['user', 'fecha_inicio', 'id'], name='course_progress_user_fecha_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.get_full_name()} - {self.course.titulo} ({self.porcentaje}%)"
 
 
-class LearningPathCourse(models.Model):
+class LearningPathCourse(TrackedModel):
     """
     Modelo para relacionar cursos con rutas de aprendizaje
     """
     path = models.ForeignKey(LearningPath, on_delete=models.CASCADE, related_name='path_courses')
     course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='learning_paths')
     orden = models.IntegerField()
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    tracked_fields = ['path_id', 'course_id']
     
     class Meta:
         db_table = 'learning_path_courses'
@@ -155,3 +286,67 @@ class LearningPathCourse(models.Model):
     
     def __str__(self):
         return f"{self.path.nombre} - {self.course.titulo}"
+
+
+class GeneratedRoute(models.Model):
+    """
+    Ruta generada por el modelo de lenguaje para unas respuestas del quiz,
+    identificadas por el hash de su forma canónica (ver learning/routes.py)
+    """
+    respuestas_hash = models.CharField(max_length=64)
+    path = models.ForeignKey(LearningPath, on_delete=models.CASCADE, related_name='generated_routes')
+    ruta = models.JSONField(help_text="Respuesta del modelo ya validada")
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'generated_routes'
+        verbose_name = 'Ruta Generada'
+        verbose_name_plural = 'Rutas Generadas'
+        indexes = [
+            models.Index(fields=['respuestas_hash', '-created_at'], name='generated_route_hash_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.path.nombre} ({self.respuestas_hash[:12]})"
+
+
+class UserDashboard(models.Model):
+    """
+    Resumen desnormalizado del avance de cada usuario para el dashboard.
+    
+    Las señales de learning/signals.py lo actualizan de forma incremental al
+    guardar el progreso; si falta o quedó obsoleto se reconstruye al leerlo.
+    """
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True, related_name='dashboard'
+    )
+    cursos_total = models.IntegerField(default=0)
+    cursos_completados = models.IntegerField(default=0)
+    porcentaje_total = models.IntegerField(default=0, help_text="Suma del porcentaje de cada curso")
+    rutas_activas = models.IntegerField(default=0)
+    rutas_terminadas = models.IntegerField(default=0)
+    rutas_descartadas = models.IntegerField(default=0)
+    lecciones_iniciadas = models.IntegerField(default=0)
+    lecciones_completadas = models.IntegerField(default=0)
+    minutos_vistos = models.IntegerField(default=0)
+    tests_total = models.IntegerField(default=0)
+    ultimo_resultado = models.CharField(max_length=255, blank=True, null=True)
+    ruta_principal = models.ForeignKey(
+        LearningPath, on_delete=models.SET_NULL, blank=True, null=True, related_name='+'
+    )
+    ruta_principal_progreso = models.IntegerField(default=0)
+    ultima_actividad = models.DateTimeField(blank=True, null=True)
+    
+    class Meta:
+        db_table = 'user_dashboards'
+        verbose_name = 'Resumen de Usuario'
+        verbose_name_plural = 'Resúmenes de Usuarios'
+    
+    def __str__(self):
+        return f"Resumen de {self.user_id}"
+    
+    @property
+    def porcentaje_promedio(self):
+        if not self.cursos_total:
+            return 0
+        return round(self.porcentaje_total / self.cursos_total)
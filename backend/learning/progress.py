@@ -0,0 +1,231 @@
+"""
+Cálculo del progreso de cursos y rutas a partir de LessonProgress.completado.
+
+El porcentaje de un curso pondera cada lección por su `duracion_estimada`
+(mínimo 1, para que las lecciones sin duración también cuenten):
+
+    porcentaje = minutos_completados * 100 // Course.duracion_total
+
+El progreso de una ruta es el promedio del porcentaje de sus cursos:
+
+    progreso = porcentaje_cursos // número de cursos de la ruta
+
+Completar o desmarcar una lección suma o resta su peso a
+`minutos_completados` y la diferencia de porcentaje a `porcentaje_cursos`
+de cada ruta que contiene el curso, sin recorrer las demás lecciones.
+`recompute()` recalcula todo con UPDATEs por conjunto; lo usa el comando
+`recompute_progress` y los cambios en las lecciones de un curso.
+`recompute_paths()` recalcula solo las rutas, cuando cambian sus cursos.
+
+Una ruta activa pasa a terminada al llegar a 100 y vuelve a activa si su
+progreso baja (p. ej. al desmarcar una lección o agregar un curso).
+"""
+
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Greatest, Least, NullIf
+from django.utils import timezone
+
+from .models import (
+    Course, Lesson, LessonProgress, LearningPathCourse, UserCourseProgress,
+    UserDashboard, UserLearningPath
+)
+
+
+def lesson_weight(duracion_estimada):
+    return max(duracion_estimada, 1)
+
+
+def course_percentage(minutos, duracion_total):
+    if duracion_total <= 0:
+        return 0
+    return min(minutos * 100 // duracion_total, 100)
+
+
+def path_percentage(porcentaje_cursos, cursos_total):
+    if cursos_total <= 0:
+        return 0
+    return min(porcentaje_cursos // cursos_total, 100)
+
+
+def path_courses_count():
+    return Subquery(
+        LearningPathCourse.objects.filter(path=OuterRef('path_id'))
+        .order_by().values('path').annotate(total=Count('id')).values('total')
+    )
+
+
+def path_estado(estado, progreso):
+    if estado == 'activa' and progreso >= 100:
+        return 'terminada'
+    if estado == 'terminada' and progreso < 100:
+        return 'activa'
+    return estado
+
+
+def set_course_percentage(course_progress, duracion_total):
+    course_progress.porcentaje = course_percentage(
+        course_progress.minutos_completados, duracion_total
+    )
+    if course_progress.porcentaje >= 100:
+        course_progress.fecha_fin = course_progress.fecha_fin or timezone.now()
+    else:
+        course_progress.fecha_fin = None
+
+
+def record_lesson(user_id, lesson, completed):
+    """
+    Aplica al curso y a sus rutas que `lesson` se completó (o se desmarcó).
+    Regresa el progreso del curso, o None si el usuario no está inscrito.
+    """
+    minutos = lesson_weight(lesson.duracion_estimada) * (1 if completed else -1)
+    with transaction.atomic():
+        course_progress = (
+            UserCourseProgress.objects.select_for_update().select_related('course')
+            .filter(user_id=user_id, course_id=lesson.course_id)
+            .first()
+        )
+        if course_progress is None:
+            # Sin inscripción no hay progreso que actualizar; se calcula al inscribirse
+            return None
+
+        previous = course_progress.porcentaje
+        course_progress.minutos_completados = max(course_progress.minutos_completados + minutos, 0)
+        set_course_percentage(course_progress, course_progress.course.duracion_total)
+        course_progress.save()
+
+        if course_progress.porcentaje != previous:
+            record_course(user_id, lesson.course_id, course_progress.porcentaje - previous)
+    return course_progress
+
+
+def record_course(user_id, course_id, delta):
+    """
+    Suma `delta` puntos de porcentaje del curso a cada ruta del usuario que
+    lo contiene
+    """
+    user_paths = (
+        UserLearningPath.objects.select_for_update()
+        .filter(user_id=user_id, path__path_courses__course_id=course_id)
+        .annotate(cursos_total=path_courses_count())
+    )
+    for user_path in user_paths:
+        user_path.porcentaje_cursos = max(user_path.porcentaje_cursos + delta, 0)
+        user_path.progreso = path_percentage(user_path.porcentaje_cursos, user_path.cursos_total)
+        user_path.estado = path_estado(user_path.estado, user_path.progreso)
+        user_path.save(update_fields=['porcentaje_cursos', 'progreso', 'estado', 'updated_at'])
+
+
+def initial_course_progress(user, course):
+    """
+    Valores iniciales al inscribirse a un curso con lecciones ya completadas
+    """
+    minutos = LessonProgress.objects.filter(
+        user=user, lesson__course=course, completado=True
+    ).aggregate(total=Coalesce(Sum(Greatest('lesson__duracion_estimada', 1)), 0))['total']
+    course_progress = UserCourseProgress(minutos_completados=minutos)
+    set_course_percentage(course_progress, course.duracion_total)
+    return {
+        'minutos_completados': course_progress.minutos_completados,
+        'porcentaje': course_progress.porcentaje,
+        'fecha_fin': course_progress.fecha_fin,
+    }
+
+
+def initial_path_progress(user, path):
+    """
+    Valores iniciales al inscribirse a una ruta con cursos ya avanzados
+    """
+    totals = LearningPathCourse.objects.filter(path=path).aggregate(
+        cursos_total=Count('id', distinct=True),
+        porcentaje_cursos=Coalesce(
+            Sum('course__user_progress__porcentaje', filter=Q(course__user_progress__user=user)), 0
+        ),
+    )
+    progreso = path_percentage(totals['porcentaje_cursos'], totals['cursos_total'])
+    return {
+        'porcentaje_cursos': totals['porcentaje_cursos'],
+        'progreso': progreso,
+        'estado': 'terminada' if progreso >= 100 else 'activa',
+    }
+
+
+def recompute(course_ids=None, user_ids=None):
+    """
+    Recalcula desde cero la duración de los cursos y el progreso de cursos y
+    rutas, opcionalmente limitado a algunos cursos o usuarios. Regresa el
+    número de progresos de curso y de ruta recalculados.
+    """
+    courses = Course.objects.all()
+    course_progress = UserCourseProgress.objects.all()
+    user_paths = UserLearningPath.objects.all()
+    if course_ids is not None:
+        courses = courses.filter(pk__in=course_ids)
+        course_progress = course_progress.filter(course_id__in=course_ids)
+        user_paths = user_paths.filter(path__path_courses__course_id__in=course_ids)
+    if user_ids is not None:
+        course_progress = course_progress.filter(user_id__in=user_ids)
+        user_paths = user_paths.filter(user_id__in=user_ids)
+
+    with transaction.atomic():
+        if user_ids is None:
+            courses.update(duracion_total=Coalesce(Subquery(
+                Lesson.objects.filter(course=OuterRef('pk')).order_by().values('course')
+                .annotate(total=Sum(Greatest('duracion_estimada', 1))).values('total')
+            ), 0))
+
+        course_progress.update(minutos_completados=Coalesce(Subquery(
+            LessonProgress.objects.filter(
+                user=OuterRef('user_id'), lesson__course=OuterRef('course_id'), completado=True
+            ).order_by().values('user')
+            .annotate(total=Sum(Greatest('lesson__duracion_estimada', 1))).values('total')
+        ), 0))
+        # División entera; un curso sin lecciones queda en 0
+        course_total = Subquery(
+            Course.objects.filter(pk=OuterRef('course_id')).values('duracion_total')
+        )
+        course_progress.update(porcentaje=Coalesce(
+            Least(F('minutos_completados') * 100 / NullIf(course_total, 0), Value(100)), 0
+        ))
+        course_progress.filter(porcentaje__gte=100, fecha_fin__isnull=True).update(
+            fecha_fin=timezone.now()
+        )
+        course_progress.filter(porcentaje__lt=100).update(fecha_fin=None)
+
+        update_user_paths(user_paths)
+
+        # Los UPDATE por conjunto no emiten señales: el resumen se reconstruye
+        # al leerlo
+        dashboards = UserDashboard.objects.all()
+        if course_ids is not None or user_ids is not None:
+            dashboards = dashboards.filter(
+                Q(user__course_progress__in=course_progress) | Q(user__learning_paths__in=user_paths)
+            )
+        dashboards.delete()
+
+    return course_progress.count(), user_paths.count()
+
+
+def update_user_paths(user_paths):
+    user_paths.update(porcentaje_cursos=Coalesce(Subquery(
+        UserCourseProgress.objects.filter(
+            user=OuterRef('user_id'), course__learning_paths__path=OuterRef('path_id')
+        ).order_by().values('user').annotate(total=Sum('porcentaje')).values('total')
+    ), 0))
+    user_paths.update(progreso=Coalesce(
+        Least(F('porcentaje_cursos') / NullIf(path_courses_count(), 0), Value(100)), 0
+    ))
+    user_paths.filter(estado='activa', progreso__gte=100).update(estado='terminada')
+    user_paths.filter(estado='terminada', progreso__lt=100).update(estado='activa')
+
+
+def recompute_paths(path_ids):
+    """
+    Recalcula el progreso de los inscritos en las rutas `path_ids`, p. ej.
+    al agregar o quitar cursos. Regresa el número de progresos recalculados.
+    """
+    user_paths = UserLearningPath.objects.filter(path_id__in=path_ids)
+    with transaction.atomic():
+        update_user_paths(user_paths)
+        UserDashboard.objects.filter(user__learning_paths__in=user_paths).delete()
+    return user_paths.count()
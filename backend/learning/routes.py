@@ -0,0 +1,340 @@
+"""
+Rutas de aprendizaje generadas con el modelo de lenguaje a partir de las
+respuestas del quiz.
+
+Las respuestas se llevan a una forma canónica (llaves y listas ordenadas, sin
+repetidos ni valores vacíos, textos en minúsculas y sin espacios extra) y se
+identifican por su SHA-256: el mismo perfil contestado en otro orden usa la
+misma ruta. La ruta se busca, en orden:
+
+1. En la caché TTL+LRU en memoria del proceso (AI_ROUTE_CACHE_SIZE entradas
+   por AI_ROUTE_CACHE_TIMEOUT segundos).
+2. En GeneratedRoute, la más reciente para el hash dentro del mismo plazo; la
+   comparten todos los procesos y sobrevive a reinicios.
+3. En el modelo. Las peticiones simultáneas del mismo hash en un proceso
+   esperan una sola llamada (single-flight), y la ruta se guarda como
+   LearningPath con sus Course y LearningPathCourse.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from ascendya import llm
+from .models import Course, GeneratedRoute, LearningPath, LearningPathCourse
+
+
+# Límites de las respuestas aceptadas, para acotar el tamaño del prompt
+MAX_ANSWERS = 30
+MAX_CHOICES = 30
+MAX_TEXT_LENGTH = 200
+
+NIVELES = {'principiante': 'basico', 'intermedio': 'intermedio', 'avanzado': 'avanzado'}
+
+TIEMPOS = {
+    '1-2_horas': '2 horas por semana',
+    '3-5_horas': '5 horas por semana',
+    '6-10_horas': '10 horas por semana',
+    'mas_10_horas': 'más de 10 horas por semana',
+}
+
+
+def canonical_text(value):
+    if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+        raise ValueError('Las respuestas deben ser textos, números o listas de textos')
+    text = ' '.join(str(value).split()).lower()
+    if len(text) > MAX_TEXT_LENGTH:
+        raise ValueError(f'Cada respuesta admite a lo más {MAX_TEXT_LENGTH} caracteres')
+    return text
+
+
+def canonical_answers(answers):
+    """
+    Forma canónica de las respuestas del quiz; lanza ValueError si no tienen
+    la forma {pregunta: texto | [textos]}
+    """
+    if len(answers) > MAX_ANSWERS:
+        raise ValueError(f'Se admiten a lo más {MAX_ANSWERS} respuestas')
+    canonical = {}
+    for key, value in answers.items():
+        if isinstance(value, (list, tuple)):
+            if len(value) > MAX_CHOICES:
+                raise ValueError(f'Cada respuesta admite a lo más {MAX_CHOICES} opciones')
+            value = sorted({canonical_text(item) for item in value} - {''})
+        elif value is not None:
+            value = canonical_text(value)
+        if value:
+            canonical[canonical_text(key)] = value
+    return dict(sorted(canonical.items()))
+
+
+def answers_hash(answers):
+    encoded = json.dumps(answers, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+def build_prompt(answers):
+    """
+    Prompt de la ruta para las respuestas canónicas. Es determinista: sin el
+    identificador aleatorio que agregaba el cliente, que impedía reutilizar
+    la ruta de un mismo perfil.
+    """
+    estilo = answers.get('learningstyle')
+    nivel = (
+        'principiante' if estilo in ('muy_practico', 'practico')
+        else 'intermedio' if estilo == 'equilibrado'
+        else 'avanzado'
+    )
+
+    def listed(name, default):
+        value = answers.get(name)
+        if isinstance(value, list):
+            return ', '.join(value) or default
+        return value or default
+
+    intereses = listed('academicinterests', 'general')
+    tiempo = TIEMPOS.get(answers.get('timecommitment'), 'flexible')
+    actividades = listed('preferredactivities', 'variadas')
+    areas = listed('vocationalareas', 'general')
+    recursos = listed('resourcepreferences', 'variados')
+
+    return f"""Crea una ruta de aprendizaje personalizada para un estudiante con este perfil específico:
+
+PERFIL DETALLADO DEL ESTUDIANTE:
+- Nivel de experiencia: {nivel}
+- Materias de mayor interés: {intereses}
+- Tiempo que puede dedicar: {tiempo}
+- Actividades que más disfruta: {actividades}
+- Áreas vocacionales que le interesan: {areas}
+- Recursos de aprendizaje preferidos: {recursos}
+- Prefiere trabajar: {listed('teamwork', 'flexible')}
+- Sus expectativas de estudio: {listed('studyexpectation', 'general')}
+
+INSTRUCCIONES IMPORTANTES:
+1. Crea una respuesta COMPLETAMENTE PERSONALIZADA basada en este perfil específico
+2. NO uses contenido genérico - adapta todo al perfil del estudiante
+3. Considera TODOS los aspectos del perfil para crear una ruta coherente
+4. Los cursos, habilidades y carreras deben estar directamente relacionados con los intereses específicos
+
+Genera una respuesta ÚNICAMENTE en formato JSON válido, sin texto adicional antes o después del JSON:
+
+{{
+  "title": "Título específico y personalizado que refleje los intereses principales ({intereses})",
+  "description": "Descripción detallada que mencione específicamente las materias de interés, actividades preferidas y tiempo disponible",
+  "level": "{nivel}",
+  "estimatedTime": "número realista de horas basado en {tiempo}",
+  "difficulty": "{nivel}",
+  "interests": "{intereses}",
+  "courses": [
+    "Curso específico 1 directamente relacionado con {intereses}",
+    "Curso específico 2 que combine {intereses} con {actividades}",
+    "Curso específico 3 orientado hacia {areas}"
+  ],
+  "skills": [
+    "Habilidad específica 1 relacionada con {intereses}",
+    "Habilidad específica 2 que se desarrolle con {actividades}",
+    "Habilidad específica 3 orientada hacia {areas}"
+  ],
+  "careerPaths": [
+    "Carrera profesional 1 que combine {intereses} y {areas}",
+    "Carrera profesional 2 específica para alguien que prefiere {actividades}",
+    "Carrera profesional 3 en el campo de {areas}"
+  ],
+  "modules": [
+    {{
+      "name": "Módulo inicial específico para {intereses}",
+      "duration": "duración apropiada para {tiempo}",
+      "topics": ["tema específico 1 de {intereses}", "tema específico 2", "tema específico 3"],
+      "resources": [
+        {{"type": "book", "title": "Título específico relacionado con {intereses}", "author": "Autor relevante"}},
+        {{"type": "course", "title": "Curso específico en {areas}", "platform": "Plataforma adecuada"}}
+      ]
+    }}
+  ]
+}}"""
+
+
+def parse_route(text):
+    """
+    JSON de la ruta dentro del texto del modelo (con o sin bloque de código),
+    con los campos mínimos que espera el cliente
+    """
+    start, end = text.find('{'), text.rfind('}')
+    try:
+        route = json.loads(text[start:end + 1]) if 0 <= start < end else None
+    except ValueError:
+        route = None
+    if not isinstance(route, dict):
+        raise llm.ModelError('La respuesta del modelo no es una ruta en JSON')
+
+    route['title'] = str(route.get('title') or 'Ruta de Aprendizaje Personalizada')
+    route['description'] = str(
+        route.get('description') or 'Una ruta de aprendizaje diseñada específicamente para ti'
+    )
+    route['level'] = str(route.get('level') or 'intermedio')
+    for name in ('courses', 'skills', 'careerPaths', 'modules'):
+        if not isinstance(route.get(name), list):
+            route[name] = []
+    route['courses'] = [str(course) for course in route['courses'] if course]
+    return route
+
+
+def save_route(key, route):
+    """
+    Guarda la ruta como LearningPath con un Course por cada curso sugerido
+    """
+    nivel = NIVELES.get(route['level'].lower(), 'intermedio')
+    categoria = str(route.get('interests') or 'general')[:100]
+    with transaction.atomic():
+        path = LearningPath.objects.create(
+            nombre=route['title'][:255], descripcion=route['description'], categoria=categoria
+        )
+        courses = Course.objects.bulk_create([
+            Course(titulo=titulo[:255], descripcion=route['description'], categoria=categoria,
+                   nivel=nivel)
+            for titulo in route['courses']
+        ])
+        LearningPathCourse.objects.bulk_create([
+            LearningPathCourse(path=path, course=course, orden=orden)
+            for orden, course in enumerate(courses, start=1)
+        ])
+        GeneratedRoute.objects.create(respuestas_hash=key, path=path, ruta=route)
+    return path
+
+
+def stored_route(key):
+    cutoff = timezone.now() - timedelta(seconds=settings.AI_ROUTE_CACHE_TIMEOUT)
+    generated = (
+        GeneratedRoute.objects.filter(respuestas_hash=key, created_at__gte=cutoff)
+        .order_by('-created_at')
+        .values('path_id', 'ruta')
+        .first()
+    )
+    if generated is None:
+        return None
+    return dict(generated['ruta'], learning_path_id=generated['path_id'])
+
+
+def generate_route(key, answers):
+    text = llm.generate(
+        [llm.user_message(build_prompt(answers))], responseMimeType='application/json'
+    )
+    route = parse_route(text)
+    path = save_route(key, route)
+    return dict(route, learning_path_id=path.pk)
+
+
+class TTLLRUCache:
+    """
+    Caché en memoria de a lo más `maxsize` entradas que expiran `timeout`
+    segundos después de guardarse; llena, descarta la usada hace más tiempo
+    """
+    maxsize = 128
+    timeout = 300
+
+    def __init__(self):
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires <= time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.timeout, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+class RouteCache(TTLLRUCache):
+    @property
+    def maxsize(self):
+        return settings.AI_ROUTE_CACHE_SIZE
+
+    @property
+    def timeout(self):
+        return settings.AI_ROUTE_CACHE_TIMEOUT
+
+
+class Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Ejecuta una sola vez a la vez la función de cada llave: quien llega
+    mientras otra petición la ejecuta espera y recibe el mismo resultado (o
+    la misma excepción)
+    """
+    def __init__(self):
+        self.flights = {}
+        self.lock = threading.Lock()
+
+    def do(self, key, function):
+        with self.lock:
+            flight = self.flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self.flights[key] = Flight()
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = function()
+        except Exception as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self.lock:
+                del self.flights[key]
+            flight.done.set()
+        return flight.result
+
+
+route_cache = RouteCache()
+flights = SingleFlight()
+
+
+def route_for(answers):
+    """
+    Ruta para unas respuestas canónicas: JSON de la ruta con el id del
+    LearningPath en `learning_path_id`
+    """
+    key = answers_hash(answers)
+    route = route_cache.get(key)
+    if route is not None:
+        return route
+
+    def load():
+        route = stored_route(key) or generate_route(key, answers)
+        route_cache.set(key, route)
+        return route
+
+    return flights.do(key, load)
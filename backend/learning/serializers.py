@@ -1,11 +1,28 @@
+import uuid
+
 from rest_framework import serializers
+from ascendya.serializers import SparseFieldsMixin
+from .assistant import MAX_MESSAGE_LENGTH
+from .routes import canonical_answers
 from .models import (
     LearningPath, Course, Lesson, UserLearningPath,
-    LessonProgress, UserCourseProgress, LearningPathCourse
+    LessonProgress, UserCourseProgress, LearningPathCourse, UserDashboard
 )
 
 
-class LessonSerializer(serializers.ModelSerializer):
+def count_lessons(course):
+    # Usar el conteo anotado por el queryset cuando está disponible
+    count = getattr(course, 'lessons_count', None)
+    return course.lessons.count() if count is None else count
+
+
+def count_courses(path):
+    # Usar el conteo anotado por el queryset cuando está disponible
+    count = getattr(path, 'courses_count', None)
+    return path.path_courses.count() if count is None else count
+
+
+class LessonSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Serializer para las lecciones
     """
@@ -14,12 +31,21 @@ class LessonSerializer(serializers.ModelSerializer):
         fields = ['id', 'titulo', 'contenido', 'orden', 'duracion_estimada']
 
 
-class CourseSerializer(serializers.ModelSerializer):
+class LessonListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """
+    Serializer simplificado para listar lecciones, sin el contenido
+    """
+    class Meta:
+        model = Lesson
+        fields = ['id', 'titulo', 'orden', 'duracion_estimada']
+
+
+class CourseSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Serializer para los cursos
     """
-    lessons = LessonSerializer(many=True, read_only=True)
-    lessons_count = serializers.IntegerField(source='lessons.count', read_only=True)
+    lessons = LessonListSerializer(many=True, read_only=True)
+    lessons_count = serializers.SerializerMethodField()
     
     class Meta:
         model = Course
@@ -27,13 +53,18 @@ class CourseSerializer(serializers.ModelSerializer):
             'id', 'titulo', 'descripcion', 'categoria', 'nivel',
             'is_externo', 'url', 'lessons_count', 'lessons', 'created_at'
         ]
+        # Conteo anotado por CourseQuerySet.with_lessons_count()
+        sparse_sources = {'lessons_count': ['lessons_count']}
+    
+    def get_lessons_count(self, obj):
+        return count_lessons(obj)
 
 
-class CourseListSerializer(serializers.ModelSerializer):
+class CourseListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Serializer simplificado para listar cursos
     """
-    lessons_count = serializers.IntegerField(source='lessons.count', read_only=True)
+    lessons_count = serializers.SerializerMethodField()
     
     class Meta:
         model = Course
@@ -41,9 +72,14 @@ class CourseListSerializer(serializers.ModelSerializer):
             'id', 'titulo', 'descripcion', 'categoria', 'nivel',
             'is_externo', 'lessons_count', 'created_at'
         ]
+        # Conteo anotado por CourseQuerySet.with_lessons_count()
+        sparse_sources = {'lessons_count': ['lessons_count']}
+    
+    def get_lessons_count(self, obj):
+        return count_lessons(obj)
 
 
-class LearningPathCourseSerializer(serializers.ModelSerializer):
+class LearningPathCourseSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Serializer para la relación entre rutas y cursos
     """
@@ -54,12 +90,12 @@ class LearningPathCourseSerializer(serializers.ModelSerializer):
         fields = ['id', 'course', 'orden']
 
 
-class LearningPathSerializer(serializers.ModelSerializer):
+class LearningPathSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Serializer para las rutas de aprendizaje
     """
     path_courses = LearningPathCourseSerializer(many=True, read_only=True)
-    courses_count = serializers.IntegerField(source='path_courses.count', read_only=True)
+    courses_count = serializers.SerializerMethodField()
     
     class Meta:
         model = LearningPath
@@ -67,20 +103,30 @@ class LearningPathSerializer(serializers.ModelSerializer):
             'id', 'nombre', 'descripcion', 'categoria',
             'courses_count', 'path_courses', 'created_at'
         ]
+        # Conteo anotado por LearningPathQuerySet.with_courses_count()
+        sparse_sources = {'courses_count': ['courses_count']}
+    
+    def get_courses_count(self, obj):
+        return count_courses(obj)
 
 
-class LearningPathListSerializer(serializers.ModelSerializer):
+class LearningPathListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Serializer simplificado para listar rutas de aprendizaje
     """
-    courses_count = serializers.IntegerField(source='path_courses.count', read_only=True)
+    courses_count = serializers.SerializerMethodField()
     
     class Meta:
         model = LearningPath
         fields = ['id', 'nombre', 'descripcion', 'categoria', 'courses_count', 'created_at']
+        # Conteo anotado por LearningPathQuerySet.with_courses_count()
+        sparse_sources = {'courses_count': ['courses_count']}
+    
+    def get_courses_count(self, obj):
+        return count_courses(obj)
 
 
-class UserLearningPathSerializer(serializers.ModelSerializer):
+class UserLearningPathSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Serializer para el seguimiento de rutas de usuarios
     """
@@ -93,14 +139,15 @@ class UserLearningPathSerializer(serializers.ModelSerializer):
             'id', 'user', 'user_name', 'path', 'estado',
             'feedback', 'progreso', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['user', 'created_at', 'updated_at']
+        # El progreso lo calcula learning/progress.py a partir de las lecciones
+        read_only_fields = ['user', 'progreso', 'created_at', 'updated_at']
 
 
-class LessonProgressSerializer(serializers.ModelSerializer):
+class LessonProgressSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Serializer para el progreso de lecciones
     """
-    lesson = LessonSerializer(read_only=True)
+    lesson = LessonListSerializer(read_only=True)
     user_name = serializers.CharField(source='user.get_full_name', read_only=True)
     
     class Meta:
@@ -109,10 +156,10 @@ class LessonProgressSerializer(serializers.ModelSerializer):
             'id', 'user', 'user_name', 'lesson', 'fecha_inicio',
             'fecha_fin', 'completado', 'duracion_real'
         ]
-        read_only_fields = ['user', 'fecha_inicio']
+        read_only_fields = ['user', 'fecha_inicio', 'fecha_fin']
 
 
-class UserCourseProgressSerializer(serializers.ModelSerializer):
+class UserCourseProgressSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Serializer para el progreso de cursos
     """
@@ -125,7 +172,48 @@ class UserCourseProgressSerializer(serializers.ModelSerializer):
             'id', 'user', 'user_name', 'course', 'porcentaje',
             'fecha_inicio', 'fecha_fin'
         ]
-        read_only_fields = ['user', 'fecha_inicio']
+        read_only_fields = ['user', 'porcentaje', 'fecha_inicio', 'fecha_fin']
+
+
+class UserDashboardSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """
+    Serializer para el resumen del dashboard del usuario
+    """
+    porcentaje_promedio = serializers.IntegerField(read_only=True)
+    ruta_principal = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = UserDashboard
+        fields = [
+            'cursos_total', 'cursos_completados', 'porcentaje_promedio',
+            'rutas_activas', 'rutas_terminadas', 'rutas_descartadas',
+            'lecciones_iniciadas', 'lecciones_completadas', 'minutos_vistos',
+            'tests_total', 'ultimo_resultado', 'ruta_principal', 'ultima_actividad'
+        ]
+    
+    def get_ruta_principal(self, obj):
+        if obj.ruta_principal is None:
+            return None
+        return {
+            'id': obj.ruta_principal.id,
+            'nombre': obj.ruta_principal.nombre,
+            'progreso': obj.ruta_principal_progreso,
+        }
+
+
+class HeartbeatDeltaSerializer(serializers.Serializer):
+    """
+    Segundos vistos de una lección desde el latido anterior
+    """
+    lesson_id = serializers.IntegerField(min_value=1)
+    segundos = serializers.IntegerField(min_value=1, max_value=3600)
+
+
+class HeartbeatSerializer(serializers.Serializer):
+    """
+    Serializer para un lote de latidos del reproductor
+    """
+    deltas = HeartbeatDeltaSerializer(many=True, allow_empty=False, max_length=50)
 
 
 class EnrollCourseSerializer(serializers.Serializer):
@@ -154,3 +242,29 @@ class EnrollLearningPathSerializer(serializers.Serializer):
         except LearningPath.DoesNotExist:
             raise serializers.ValidationError("La ruta de aprendizaje no existe")
         return value
+
+
+class GenerateRouteSerializer(serializers.Serializer):
+    """
+    Serializer para las respuestas del quiz con las que se genera una ruta;
+    las regresa en su forma canónica (ver learning/routes.py)
+    """
+    answers = serializers.DictField()
+    
+    def validate_answers(self, value):
+        try:
+            answers = canonical_answers(value)
+        except ValueError as exc:
+            raise serializers.ValidationError(str(exc))
+        if not answers:
+            raise serializers.ValidationError("Las respuestas están vacías")
+        return answers
+
+
+class AssistantMessageSerializer(serializers.Serializer):
+    """
+    Serializer para un mensaje al asistente virtual; sin conversation_id se
+    inicia una conversación nueva
+    """
+    message = serializers.CharField(max_length=MAX_MESSAGE_LENGTH)
+    conversation_id = serializers.UUIDField(format='hex', default=uuid.uuid4)
@@ -0,0 +1,226 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from vocational.models import VocationalTest
+from vocational.signals import tests_created
+from . import dashboard, progress
+from .models import (
+    Lesson, LearningPathCourse, UserCourseProgress, UserLearningPath, LessonProgress
+)
+
+
+def previous_values(instance, created):
+    """
+    Valores anteriores de `tracked_fields`, o None si no se conocen
+    """
+    if created:
+        return {}
+    loaded = getattr(instance, 'loaded_values', {})
+    if set(loaded) != set(instance.tracked_fields):
+        return None
+    return loaded
+
+
+def course_counters(porcentaje, sign=1):
+    return {
+        'cursos_total': sign,
+        'cursos_completados': sign * (porcentaje >= 100),
+        'porcentaje_total': sign * porcentaje,
+    }
+
+
+def lesson_counters(completado, duracion_real, sign=1):
+    return {
+        'lecciones_iniciadas': sign,
+        'lecciones_completadas': sign * bool(completado),
+        'minutos_vistos': sign * duracion_real,
+    }
+
+
+def difference(new, old):
+    return {field: value - old.get(field, 0) for field, value in new.items()}
+
+
+def progress_activity(instance, cleared=False):
+    """
+    Argumentos de dashboard.apply() para ultima_actividad: las fechas de la
+    fila, o recalcularla si la fila perdió su fecha de fin
+    """
+    if cleared:
+        return {'ultima_actividad': dashboard.recent_activity(instance.user_id)}
+    return {'activity': dashboard.latest(instance.fecha_inicio, instance.fecha_fin)}
+
+
+@receiver(post_save, sender=UserCourseProgress)
+def course_progress_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = previous_values(instance, created)
+    if previous is None:
+        dashboard.invalidate(instance.user_id)
+    else:
+        new = course_counters(instance.porcentaje)
+        old = {} if created else course_counters(previous['porcentaje'])
+        cleared = not created and previous['porcentaje'] >= 100 > instance.porcentaje
+        dashboard.apply(
+            instance.user_id, difference(new, old), **progress_activity(instance, cleared)
+        )
+    instance.remember_values()
+
+
+@receiver(post_delete, sender=UserCourseProgress)
+def course_progress_deleted(sender, instance, **kwargs):
+    previous = getattr(instance, 'loaded_values', {}).get('porcentaje', instance.porcentaje)
+    dashboard.apply(
+        instance.user_id, course_counters(previous, sign=-1),
+        ultima_actividad=dashboard.recent_activity(instance.user_id)
+    )
+
+
+@receiver(pre_save, sender=LessonProgress)
+def stamp_lesson_completion(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    if instance.completado and instance.fecha_fin is None:
+        instance.fecha_fin = timezone.now()
+    elif not instance.completado:
+        instance.fecha_fin = None
+
+
+@receiver(post_save, sender=LessonProgress)
+def lesson_progress_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = previous_values(instance, created)
+    if previous is None:
+        dashboard.invalidate(instance.user_id)
+        progress.recompute(course_ids=[instance.lesson.course_id], user_ids=[instance.user_id])
+    else:
+        new = lesson_counters(instance.completado, instance.duracion_real)
+        old = {} if created else lesson_counters(previous['completado'], previous['duracion_real'])
+        cleared = bool(previous.get('completado')) and not instance.completado
+        dashboard.apply(
+            instance.user_id, difference(new, old), **progress_activity(instance, cleared)
+        )
+        if instance.completado != bool(previous.get('completado')):
+            progress.record_lesson(instance.user_id, instance.lesson, instance.completado)
+    instance.remember_values()
+
+
+@receiver(post_delete, sender=LessonProgress)
+def lesson_progress_deleted(sender, instance, origin=None, **kwargs):
+    loaded = getattr(instance, 'loaded_values', {})
+    completado = loaded.get('completado', instance.completado)
+    dashboard.apply(instance.user_id, lesson_counters(
+        completado, loaded.get('duracion_real', instance.duracion_real), sign=-1
+    ), ultima_actividad=dashboard.recent_activity(instance.user_id))
+    # En un borrado en cascada (usuario, lección o curso) el curso se
+    # recalcula desde la lección o desaparece junto con el progreso
+    if completado and isinstance(origin, LessonProgress):
+        progress.record_lesson(instance.user_id, instance.lesson, completed=False)
+
+
+@receiver(post_save, sender=Lesson)
+def lesson_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, 'loaded_values', {})
+    changed = created or any(
+        previous.get(name) != getattr(instance, name) for name in instance.tracked_fields
+    )
+    if changed:
+        # Cambia el peso de todas las lecciones del curso para cada alumno
+        progress.recompute(course_ids={instance.course_id, previous.get('course_id')} - {None})
+    instance.remember_values()
+
+
+@receiver(post_delete, sender=Lesson)
+def lesson_deleted(sender, instance, origin=None, **kwargs):
+    if isinstance(origin, Lesson):
+        progress.recompute(course_ids=[instance.course_id])
+
+
+@receiver(post_save, sender=LearningPathCourse)
+def path_course_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, 'loaded_values', {})
+    changed = created or any(
+        previous.get(name) != getattr(instance, name) for name in instance.tracked_fields
+    )
+    if changed:
+        # Cambian los cursos de la ruta (y de la anterior, si se movió)
+        progress.recompute_paths({instance.path_id, previous.get('path_id')} - {None})
+    instance.remember_values()
+
+
+@receiver(post_delete, sender=LearningPathCourse)
+def path_course_deleted(sender, instance, origin=None, **kwargs):
+    # Si se borra la ruta completa, sus inscripciones se borran con ella
+    if isinstance(origin, LearningPathCourse):
+        progress.recompute_paths([instance.path_id])
+
+
+@receiver(post_save, sender=UserLearningPath)
+def user_path_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = previous_values(instance, created)
+    if previous is None:
+        dashboard.invalidate(instance.user_id)
+        instance.remember_values()
+        return
+
+    counters = {dashboard.ESTADO_FIELDS[instance.estado]: 1}
+    if not created:
+        field = dashboard.ESTADO_FIELDS[previous['estado']]
+        counters[field] = counters.get(field, 0) - 1
+    dropped = not created and instance.progreso < previous['progreso']
+    if instance.estado == 'activa' and not dropped:
+        dashboard.apply(
+            instance.user_id, counters, activity=instance.updated_at,
+            **dashboard.promote_path(instance)
+        )
+    else:
+        dashboard.apply(instance.user_id, counters, activity=instance.updated_at)
+        dashboard.replace_top_path(instance)
+    instance.remember_values()
+
+
+@receiver(post_delete, sender=UserLearningPath)
+def user_path_deleted(sender, instance, **kwargs):
+    estado = getattr(instance, 'loaded_values', {}).get('estado', instance.estado)
+    dashboard.apply(
+        instance.user_id, {dashboard.ESTADO_FIELDS[estado]: -1},
+        ultima_actividad=dashboard.recent_activity(instance.user_id)
+    )
+    dashboard.replace_top_path(instance)
+
+
+@receiver(post_save, sender=VocationalTest)
+def vocational_test_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        dashboard.apply(
+            instance.user_id, {'tests_total': 1}, activity=instance.fecha,
+            ultimo_resultado=instance.resultado
+        )
+    else:
+        # El resultado editado puede no ser el más reciente
+        dashboard.invalidate(instance.user_id)
+
+
+@receiver(tests_created)
+def vocational_tests_created(sender, user, tests, **kwargs):
+    # Los envíos por lotes usan bulk_create, que no emite post_save
+    dashboard.apply(
+        user.pk, {'tests_total': len(tests)}, activity=dashboard.latest(*(test.fecha for test in tests)),
+        ultimo_resultado=tests[-1].resultado
+    )
+
+
+@receiver(post_delete, sender=VocationalTest)
+def vocational_test_deleted(sender, instance, **kwargs):
+    dashboard.invalidate(instance.user_id)
@@ -1,3 +1,1082 @@
-from django.test import TestCase
+import gzip
+import json
+import threading
+import time
+from datetime import timedelta
+from io import StringIO
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import AsyncClient, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from ascendya.testing import STUB_ROUTE, StubModelServer
+from users.models import User
+from users.serializers import CustomTokenObtainPairSerializer
+from . import assistant, heartbeats, routes
+from .models import (
+    LearningPath, Course, Lesson, UserLearningPath,
+    LessonProgress, UserCourseProgress, LearningPathCourse, UserDashboard, GeneratedRoute
+)
+
+
+class LearningQueryCountTests(TestCase):
+    """
+    Verifica que los listados y detalles usen un número fijo de consultas
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='estudiante', email='estudiante@example.com',
+            password='secreta123', nombres='Ana', apellidos='López'
+        )
+        cls.path = LearningPath.objects.create(
+            nombre='Ingeniería', descripcion='Ruta de ingeniería', categoria='ingenieria'
+        )
+        for i in range(15):
+            course = Course.objects.create(
+                titulo=f'Curso {i}', descripcion='Descripción', categoria='ingenieria',
+                nivel='basico'
+            )
+            for orden in range(3):
+                lesson = Lesson.objects.create(
+                    course=course, titulo=f'Lección {orden}', contenido='Contenido',
+                    orden=orden, duracion_estimada=10
+                )
+                LessonProgress.objects.create(user=cls.user, lesson=lesson)
+            LearningPathCourse.objects.create(path=cls.path, course=course, orden=i)
+            UserCourseProgress.objects.create(user=cls.user, course=course)
+        for i in range(5):
+            path = LearningPath.objects.create(
+                nombre=f'Ruta {i}', descripcion='Descripción', categoria='general'
+            )
+            UserLearningPath.objects.create(user=cls.user, path=path)
+        cls.course = course
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_course_list(self):
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/learning/courses/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'][0]['lessons_count'], 3)
+
+    def test_course_detail(self):
+        with self.assertNumQueries(3):
+            response = self.client.get(f'/api/learning/courses/{self.course.id}/')
+        self.assertEqual(response.data['lessons_count'], 3)
+        self.assertEqual(len(response.data['lessons']), 3)
+
+    def test_learning_path_list(self):
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/learning/learning-paths/')
+        counts = {item['id']: item['courses_count'] for item in response.data['results']}
+        self.assertEqual(counts[self.path.id], 15)
+
+    def test_learning_path_detail(self):
+        with self.assertNumQueries(4):
+            response = self.client.get(f'/api/learning/learning-paths/{self.path.id}/')
+        self.assertEqual(response.data['courses_count'], 15)
+        self.assertEqual(response.data['path_courses'][0]['course']['lessons_count'], 3)
+
+    def test_my_progress_lists(self):
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/learning/my-courses/')
+        self.assertEqual(response.data['results'][0]['course']['lessons_count'], 3)
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/learning/my-paths/')
+        self.assertEqual(response.data['results'][0]['path']['courses_count'], 0)
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/learning/my-lessons/')
+        self.assertEqual(response.data['count'], 45)
+
+
+class ConditionalGetTests(TestCase):
+    """
+    Verifica las respuestas 304 de los ViewSets de catálogo
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.path = LearningPath.objects.create(
+            nombre='Ciencias', descripcion='Ruta de ciencias', categoria='ciencias'
+        )
+        cls.course = Course.objects.create(
+            titulo='Química', descripcion='Curso de química', categoria='ciencias', nivel='basico'
+        )
+        cls.lesson = Lesson.objects.create(
+            course=cls.course, titulo='Átomos', contenido='Contenido', orden=1,
+            duracion_estimada=20
+        )
+        LearningPathCourse.objects.create(path=cls.path, course=cls.course, orden=1)
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_not_modified_skips_serialization(self):
+        url = f'/api/learning/learning-paths/{self.path.id}/'
+        etag = self.client.get(url)['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_etag_aggregates_relations_separately(self):
+        with CaptureQueriesContext(connection) as context:
+            self.client.get('/api/learning/learning-paths/')
+        # Cada relación en su subconsulta, sin multiplicar filas con LEFT JOINs
+        etag_sql = context.captured_queries[0]['sql']
+        self.assertNotIn('LEFT OUTER JOIN', etag_sql)
+
+    def test_etag_changes_with_nested_rows(self):
+        list_url = '/api/learning/learning-paths/'
+        detail_url = f'/api/learning/courses/{self.course.id}/'
+        list_etag = self.client.get(list_url)['ETag']
+        detail_etag = self.client.get(detail_url)['ETag']
+
+        self.lesson.titulo = 'Átomos y moléculas'
+        self.lesson.save()
+        response = self.client.get(list_url, HTTP_IF_NONE_MATCH=list_etag)
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get(detail_url, HTTP_IF_NONE_MATCH=detail_etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['lessons'][0]['titulo'], 'Átomos y moléculas')
+
+    def test_etag_differs_per_page(self):
+        first = self.client.get('/api/learning/courses/')['ETag']
+        second = self.client.get('/api/learning/courses/', {'page': 1})['ETag']
+        self.assertNotEqual(first, second)
+
+
+class LessonPayloadTests(TestCase):
+    """
+    Verifica que el contenido de las lecciones solo se cargue en su detalle
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='lector', email='lector@example.com', password='secreta123',
+            nombres='Pablo', apellidos='Castro'
+        )
+        cls.course = Course.objects.create(
+            titulo='Historia', descripcion='Curso de historia', categoria='humanidades',
+            nivel='basico'
+        )
+        cls.lesson = Lesson.objects.create(
+            course=cls.course, titulo='Independencia', contenido='Texto de la lección. ' * 500,
+            orden=1, duracion_estimada=15
+        )
+        LessonProgress.objects.create(user=cls.user, lesson=cls.lesson)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def assertContentNotLoaded(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('contenido', response.content.decode())
+        self.assertFalse(any('contenido' in query['sql'] for query in context.captured_queries))
+
+    def test_lists_and_nested_lessons_skip_content(self):
+        self.assertContentNotLoaded('/api/learning/lessons/')
+        self.assertContentNotLoaded(f'/api/learning/courses/{self.course.id}/')
+        self.assertContentNotLoaded('/api/learning/lesson-progress/')
+        self.assertContentNotLoaded('/api/learning/my-lessons/')
+
+    def test_detail_returns_compressed_content(self):
+        url = f'/api/learning/lessons/{self.lesson.id}/'
+        self.assertEqual(self.client.get(url).data['contenido'], self.lesson.contenido)
+
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertLess(len(response.content), len(self.lesson.contenido) // 10)
+        data = json.loads(gzip.decompress(response.content))
+        self.assertEqual(data['contenido'], self.lesson.contenido)
+
+        response = self.client.get(
+            url, HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        self.assertEqual(response.status_code, 304)
+
+
+class KeysetPaginationTests(TestCase):
+    """
+    Verifica la paginación por cursor del progreso de lecciones
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='lector', email='lector@example.com', password='secreta123',
+            nombres='Luis', apellidos='Pérez'
+        )
+        course = Course.objects.create(
+            titulo='Historia', descripcion='Curso de historia', categoria='humanidades',
+            nivel='basico'
+        )
+        lessons = Lesson.objects.bulk_create([
+            Lesson(course=course, titulo=f'Tema {i}', contenido='Contenido', orden=i,
+                   duracion_estimada=5)
+            for i in range(45)
+        ])
+        LessonProgress.objects.bulk_create([
+            LessonProgress(user=cls.user, lesson=lesson) for lesson in lessons
+        ])
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_pages_cover_every_row_newest_first(self):
+        ids = []
+        url = '/api/learning/lesson-progress/'
+        while url:
+            with self.assertNumQueries(1):
+                response = self.client.get(url)
+            self.assertNotIn('count', response.data)
+            ids += [item['id'] for item in response.data['results']]
+            url = response.data['next']
+        expected = list(
+            LessonProgress.objects.filter(user=self.user)
+            .order_by('-fecha_inicio', '-id').values_list('id', flat=True)
+        )
+        self.assertEqual(ids, expected)
+
+
+class SparseFieldsetTests(TestCase):
+    """
+    Verifica que ?fields= y ?expand= recorten la respuesta y las consultas
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='disperso', email='disperso@example.com', password='secreta123',
+            nombres='Elena', apellidos='Ruiz'
+        )
+        cls.path = LearningPath.objects.create(
+            nombre='Artes', descripcion='Ruta de artes', categoria='artes'
+        )
+        cls.course = Course.objects.create(
+            titulo='Pintura', descripcion='Curso de pintura', categoria='artes', nivel='basico'
+        )
+        LearningPathCourse.objects.create(path=cls.path, course=cls.course, orden=1)
+        cls.lessons = [
+            Lesson.objects.create(
+                course=cls.course, titulo=f'Tema {i}', contenido='Contenido', orden=i,
+                duracion_estimada=10
+            )
+            for i in range(3)
+        ]
+        UserLearningPath.objects.create(user=cls.user, path=cls.path)
+        LessonProgress.objects.bulk_create([
+            LessonProgress(user=cls.user, lesson=lesson) for lesson in cls.lessons
+        ])
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def get(self, url, params):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return response, [query['sql'] for query in context.captured_queries]
+
+    def test_collapsed_relation_skips_join_and_prefetch(self):
+        url = '/api/learning/user-learning-paths/'
+        full, full_queries = self.get(url, {})
+        response, queries = self.get(url, {'fields': 'id,progreso,path'})
+        self.assertEqual(
+            response.data['results'], [{'id': full.data['results'][0]['id'], 'progreso': 0,
+                                        'path': self.path.id}]
+        )
+        self.assertLess(len(queries), len(full_queries))
+        self.assertFalse(any('learning_paths' in sql and 'user_learning_paths' not in sql
+                             for sql in queries))
+        self.assertFalse(any('"feedback"' in sql for sql in queries))
+
+    def test_expand_and_nested_fields(self):
+        url = '/api/learning/user-learning-paths/'
+        response, queries = self.get(url, {'fields': 'id,path', 'expand': 'path'})
+        self.assertEqual(response.data['results'][0]['path']['courses_count'], 1)
+
+        response, queries = self.get(url, {'fields': 'path.nombre'})
+        self.assertEqual(response.data['results'], [{'path': {'nombre': 'Artes'}}])
+        self.assertFalse(any('"descripcion"' in sql for sql in queries))
+
+    def test_nested_lessons_without_counts(self):
+        response, queries = self.get(
+            f'/api/learning/courses/{self.course.id}/', {'fields': 'titulo,lessons.titulo'}
+        )
+        self.assertEqual(response.data, {
+            'titulo': 'Pintura', 'lessons': [{'titulo': f'Tema {i}'} for i in range(3)]
+        })
+        # La primera consulta es la del ETag
+        self.assertFalse(any('COUNT(' in sql for sql in queries[1:]))
+        self.assertFalse(any('"duracion_estimada"' in sql for sql in queries[1:]))
+
+    def test_keyset_pages_with_sparse_fields(self):
+        url = '/api/learning/lesson-progress/'
+        response, queries = self.get(url, {'fields': 'id'})
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(list(response.data['results'][0]), ['id'])
+        self.assertFalse(any('JOIN' in sql for sql in queries))
+
+    def test_without_fields_and_on_writes_nothing_changes(self):
+        progress = LessonProgress.objects.filter(user=self.user).first()
+        url = f'/api/learning/lesson-progress/{progress.id}/'
+        self.assertEqual(self.client.get(url).data['lesson']['titulo'], progress.lesson.titulo)
+        response = self.client.patch(f'{url}?fields=id', {'completado': True}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('completado', response.data)
+
+
+class DashboardTests(TestCase):
+    """
+    Verifica que el resumen del dashboard se mantenga igual a un recálculo
+    completo al guardar progreso
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='constante', email='constante@example.com', password='secreta123',
+            nombres='Carla', apellidos='Ruiz'
+        )
+        cls.course = Course.objects.create(
+            titulo='Álgebra', descripcion='Curso de álgebra', categoria='ciencias', nivel='basico'
+        )
+        cls.lessons = [
+            Lesson.objects.create(
+                course=cls.course, titulo=f'Tema {i}', contenido='Contenido', orden=i,
+                duracion_estimada=10
+            )
+            for i in range(3)
+        ]
+        cls.paths = [
+            LearningPath.objects.create(nombre=f'Ruta {i}', descripcion='Ruta', categoria='ciencias')
+            for i in range(2)
+        ]
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def get_dashboard(self):
+        response = self.client.get('/api/learning/dashboard/')
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def assertMatchesRebuild(self):
+        incremental = self.get_dashboard()
+        UserDashboard.objects.filter(user=self.user).delete()
+        rebuilt = self.get_dashboard()
+        self.assertEqual(incremental, rebuilt)
+
+    def test_last_activity_comes_from_progress(self):
+        self.assertIsNone(self.get_dashboard()['ultima_actividad'])
+
+        # Un usuario inactivo desde hace meses no aparece activo al reconstruir
+        started = timezone.now() - timedelta(days=90)
+        LessonProgress.objects.create(user=self.user, lesson=self.lessons[0])
+        LessonProgress.objects.filter(user=self.user).update(fecha_inicio=started)
+        UserDashboard.objects.filter(user=self.user).delete()
+        self.assertEqual(
+            self.get_dashboard()['ultima_actividad'],
+            timezone.localtime(started).isoformat()
+        )
+
+    def test_single_row_lookup(self):
+        self.get_dashboard()
+        with self.assertNumQueries(1):
+            self.get_dashboard()
+
+    def test_progress_updates_summary(self):
+        self.get_dashboard()
+        self.client.post('/api/learning/enroll-course/', {'course_id': self.course.id})
+        progress = [
+            LessonProgress.objects.create(user=self.user, lesson=lesson) for lesson in self.lessons
+        ]
+        for lesson_progress in progress:
+            self.client.patch(
+                f'/api/learning/lesson-progress/{lesson_progress.id}/',
+                {'completado': True, 'duracion_real': 12}, format='json'
+            )
+        self.client.delete(f'/api/learning/lesson-progress/{progress[0].id}/')
+
+        data = self.get_dashboard()
+        self.assertEqual(data['cursos_total'], 1)
+        self.assertEqual(data['cursos_completados'], 0)
+        self.assertEqual(data['porcentaje_promedio'], 66)
+        self.assertEqual(data['lecciones_iniciadas'], 2)
+        self.assertEqual(data['lecciones_completadas'], 2)
+        self.assertEqual(data['minutos_vistos'], 24)
+        self.assertMatchesRebuild()
+
+    def test_top_path_follows_progress(self):
+        self.get_dashboard()
+        other = Course.objects.create(
+            titulo='Física', descripcion='Curso de física', categoria='ciencias', nivel='basico'
+        )
+        Lesson.objects.create(
+            course=other, titulo='Cinemática', contenido='Contenido', orden=1, duracion_estimada=10
+        )
+        LearningPathCourse.objects.create(path=self.paths[0], course=self.course, orden=1)
+        LearningPathCourse.objects.create(path=self.paths[1], course=self.course, orden=1)
+        LearningPathCourse.objects.create(path=self.paths[1], course=other, orden=2)
+        self.client.post('/api/learning/enroll-course/', {'course_id': self.course.id})
+        for path in self.paths:
+            self.client.post('/api/learning/enroll-path/', {'path_id': path.id})
+
+        lesson_progress = LessonProgress.objects.create(user=self.user, lesson=self.lessons[0])
+        lesson_progress.completado = True
+        lesson_progress.save()
+        self.assertEqual(self.get_dashboard()['ruta_principal'], {
+            'id': self.paths[0].id, 'nombre': 'Ruta 0', 'progreso': 33
+        })
+
+        first = UserLearningPath.objects.get(user=self.user, path=self.paths[0])
+        self.client.patch(
+            f'/api/learning/user-learning-paths/{first.id}/', {'estado': 'descartada'},
+            format='json'
+        )
+        data = self.get_dashboard()
+        self.assertEqual(data['ruta_principal'], {
+            'id': self.paths[1].id, 'nombre': 'Ruta 1', 'progreso': 16
+        })
+        self.assertEqual((data['rutas_activas'], data['rutas_descartadas']), (1, 1))
+        self.assertMatchesRebuild()
+
+    def test_vocational_submissions_are_counted(self):
+        self.get_dashboard()
+        answers = [{'pregunta': '¿Te gustan los números?', 'respuesta': 'Sí'}]
+        self.client.post(
+            '/api/vocational/create-test/',
+            {'resultado': 'Ciencias', 'puntaje': 80, 'answers': answers}, format='json'
+        )
+        self.client.post('/api/vocational/create-tests/', [
+            {'resultado': resultado, 'puntaje': 70, 'answers': answers}
+            for resultado in ['Artes', 'Ingeniería']
+        ], format='json')
+        data = self.get_dashboard()
+        self.assertEqual(data['tests_total'], 3)
+        self.assertEqual(data['ultimo_resultado'], 'Ingeniería')
+
+
+class ProgressEngineTests(TestCase):
+    """
+    Verifica el cálculo del progreso de cursos y rutas en el servidor
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='avance', email='avance@example.com', password='secreta123',
+            nombres='Diego', apellidos='Torres'
+        )
+        cls.course = Course.objects.create(
+            titulo='Biología', descripcion='Curso de biología', categoria='ciencias', nivel='basico'
+        )
+        cls.lessons = [
+            Lesson.objects.create(
+                course=cls.course, titulo=f'Tema {minutos}', contenido='Contenido', orden=i,
+                duracion_estimada=minutos
+            )
+            for i, minutos in enumerate([10, 30, 60])
+        ]
+        cls.other = Course.objects.create(
+            titulo='Química', descripcion='Curso de química', categoria='ciencias', nivel='basico'
+        )
+        cls.paths = [
+            LearningPath.objects.create(nombre=f'Ruta {i}', descripcion='Ruta', categoria='ciencias')
+            for i in range(2)
+        ]
+        LearningPathCourse.objects.create(path=cls.paths[0], course=cls.course, orden=1)
+        LearningPathCourse.objects.create(path=cls.paths[1], course=cls.course, orden=1)
+        LearningPathCourse.objects.create(path=cls.paths[1], course=cls.other, orden=2)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.client.post('/api/learning/enroll-course/', {'course_id': self.course.id})
+        for path in self.paths:
+            self.client.post('/api/learning/enroll-path/', {'path_id': path.id})
+        self.progress = [
+            LessonProgress.objects.create(user=self.user, lesson=lesson) for lesson in self.lessons
+        ]
+
+    def complete(self, index, completado=True):
+        response = self.client.patch(
+            f'/api/learning/lesson-progress/{self.progress[index].id}/',
+            {'completado': completado}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def course_progress(self):
+        return UserCourseProgress.objects.get(user=self.user, course=self.course)
+
+    def path_progress(self):
+        return list(
+            UserLearningPath.objects.filter(user=self.user).order_by('path_id')
+            .values_list('progreso', 'estado')
+        )
+
+    def test_percentage_weighted_by_duration(self):
+        self.complete(1)
+        self.assertEqual(self.course_progress().porcentaje, 30)
+        self.assertEqual(self.path_progress(), [(30, 'activa'), (15, 'activa')])
+
+    def test_completion_stamps_and_clears_fecha_fin(self):
+        response = self.complete(0)
+        self.assertIsNotNone(response.data['fecha_fin'])
+        self.complete(1)
+        self.complete(2)
+        progress = self.course_progress()
+        self.assertEqual(progress.porcentaje, 100)
+        self.assertIsNotNone(progress.fecha_fin)
+        self.assertEqual(self.path_progress(), [(100, 'terminada'), (50, 'activa')])
+
+        self.complete(2, completado=False)
+        progress = self.course_progress()
+        self.assertEqual(progress.porcentaje, 40)
+        self.assertIsNone(progress.fecha_fin)
+        # La ruta vuelve a estar activa
+        self.assertEqual(self.path_progress(), [(40, 'activa'), (20, 'activa')])
+
+    def test_completion_cost_does_not_grow_with_lessons(self):
+        def completion_queries(index):
+            with CaptureQueriesContext(connection) as context:
+                self.complete(index)
+            return len(context)
+
+        first = completion_queries(0)
+        Lesson.objects.bulk_create([
+            Lesson(course=self.course, titulo=f'Extra {i}', contenido='Contenido', orden=10 + i,
+                   duracion_estimada=5)
+            for i in range(50)
+        ])
+        self.assertEqual(completion_queries(1), first)
+
+    def test_clients_cannot_write_percentages(self):
+        progress = self.course_progress()
+        self.client.patch(
+            f'/api/learning/course-progress/{progress.id}/', {'porcentaje': 100}, format='json'
+        )
+        self.assertEqual(self.course_progress().porcentaje, 0)
+
+    def test_new_lesson_reweights_course(self):
+        self.complete(2)
+        self.assertEqual(self.course_progress().porcentaje, 60)
+        Lesson.objects.create(
+            course=self.course, titulo='Genética', contenido='Contenido', orden=4,
+            duracion_estimada=50
+        )
+        self.assertEqual(self.course_progress().porcentaje, 40)
+        self.assertEqual(self.path_progress(), [(40, 'activa'), (20, 'activa')])
+
+    def test_path_courses_update_enrolled_progress(self):
+        for index in range(3):
+            self.complete(index)
+        self.assertEqual(self.path_progress(), [(100, 'terminada'), (50, 'activa')])
+
+        added = LearningPathCourse.objects.create(path=self.paths[0], course=self.other, orden=2)
+        self.assertEqual(self.path_progress(), [(50, 'activa'), (50, 'activa')])
+
+        LearningPathCourse.objects.filter(path=self.paths[1], course=self.other).get().delete()
+        self.assertEqual(self.path_progress(), [(50, 'activa'), (100, 'terminada')])
+
+        # Cambiar solo el orden no recalcula
+        added.orden = 3
+        with CaptureQueriesContext(connection) as context:
+            added.save()
+        self.assertEqual(len(context), 1)
+
+        added.delete()
+        self.assertEqual(self.path_progress(), [(100, 'terminada'), (100, 'terminada')])
+
+    def test_recompute_command_matches_incremental(self):
+        self.complete(0)
+        self.complete(2)
+        expected = (self.course_progress().porcentaje, self.path_progress())
+        UserCourseProgress.objects.update(porcentaje=0, minutos_completados=0)
+        UserLearningPath.objects.update(progreso=0, porcentaje_cursos=0)
+
+        out = StringIO()
+        call_command('recompute_progress', '--user', str(self.user.id), stdout=out)
+        self.assertIn('1 cursos y 2 rutas', out.getvalue())
+        self.assertEqual((self.course_progress().porcentaje, self.path_progress()), expected)
+
+
+class HeartbeatTests(TestCase):
+    """
+    Verifica que los latidos se acumulen en caché y se vuelquen en lote
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='latidos', email='latidos@example.com', password='secreta123',
+            nombres='Sofía', apellidos='Reyes'
+        )
+        cls.course = Course.objects.create(
+            titulo='Física', descripcion='Curso de física', categoria='ciencias', nivel='basico'
+        )
+        cls.lessons = [
+            Lesson.objects.create(
+                course=cls.course, titulo=f'Tema {i}', contenido='Contenido', orden=i,
+                duracion_estimada=10
+            )
+            for i in range(3)
+        ]
+        cls.progress = LessonProgress.objects.create(
+            user=cls.user, lesson=cls.lessons[0], duracion_real=5
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def beat(self, *deltas):
+        return self.client.post('/api/learning/heartbeat/', {'deltas': [
+            {'lesson_id': lesson.id, 'segundos': segundos} for lesson, segundos in deltas
+        ]}, format='json')
+
+    def test_heartbeat_does_not_touch_database(self):
+        self.beat((self.lessons[0], 30))
+        with CaptureQueriesContext(connection) as context:
+            response = self.beat((self.lessons[0], 30), (self.lessons[1], 20), (self.lessons[0], 10))
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['lecciones'], 2)
+        self.assertEqual(len(context), 0)
+
+    def test_flush_adds_coalesced_minutes(self):
+        for _ in range(4):
+            self.beat((self.lessons[0], 30))
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(heartbeats.flush(include_current=True), 1)
+        self.progress.refresh_from_db()
+        self.assertEqual(self.progress.duracion_real, 7)
+        self.assertFalse(any(
+            query['sql'].startswith('INSERT') for query in context.captured_queries
+        ))
+
+        # Lo volcado sale de la caché
+        self.assertEqual(heartbeats.flush(include_current=True), 0)
+        self.progress.refresh_from_db()
+        self.assertEqual(self.progress.duracion_real, 7)
+
+    def test_flush_creates_progress_and_ignores_unknown_lessons(self):
+        self.beat((self.lessons[1], 120))
+        heartbeats.record(self.user.pk, {999999: 120})
+        heartbeats.flush(include_current=True)
+        progress = LessonProgress.objects.get(user=self.user, lesson=self.lessons[1])
+        self.assertEqual(progress.duracion_real, 2)
+        self.assertFalse(progress.completado)
+        self.assertFalse(LessonProgress.objects.filter(lesson_id=999999).exists())
+
+    def test_flush_carries_partial_minutes(self):
+        window = heartbeats.current_window()
+
+        def beat_and_flush(lesson, seconds):
+            # Cada latido en una ventana distinta, volcada por separado
+            nonlocal window
+            window += 1
+            with mock.patch.object(heartbeats, 'current_window', return_value=window):
+                self.beat((lesson, seconds))
+                heartbeats.flush(include_current=True)
+
+        # 45 s por ventana suman 3 minutos en 4 ventanas, no 4
+        for _ in range(4):
+            beat_and_flush(self.lessons[0], 45)
+        self.progress.refresh_from_db()
+        self.assertEqual(self.progress.duracion_real, 5 + 3)
+
+        # 25 s por ventana no se pierden
+        for _ in range(3):
+            beat_and_flush(self.lessons[1], 25)
+        progress = LessonProgress.objects.get(user=self.user, lesson=self.lessons[1])
+        self.assertEqual(progress.duracion_real, 1)
+        self.assertEqual(cache.get(heartbeats.remainder_key(self.user.pk, self.lessons[1].pk)), 15)
+
+    def test_flush_all_keeps_collecting_open_windows(self):
+        window = heartbeats.current_window()
+        with mock.patch.object(heartbeats, 'current_window', return_value=window):
+            self.beat((self.lessons[0], 120))
+            call_command('flush_heartbeats', '--all', stdout=StringIO())
+            # Latidos en la misma ventana, después del volcado
+            self.beat((self.lessons[0], 180))
+        with mock.patch.object(heartbeats, 'current_window', return_value=window + 2):
+            self.beat((self.lessons[0], 60))
+            heartbeats.flush_if_due()
+        self.progress.refresh_from_db()
+        self.assertEqual(self.progress.duracion_real, 5 + 2 + 3)
+
+        with mock.patch.object(heartbeats, 'current_window', return_value=window + 4):
+            heartbeats.flush_if_due()
+        self.progress.refresh_from_db()
+        self.assertEqual(self.progress.duracion_real, 5 + 2 + 3 + 1)
+
+    def test_flush_updates_dashboard(self):
+        self.client.get('/api/learning/dashboard/')
+        self.beat((self.lessons[0], 60), (self.lessons[2], 120))
+        heartbeats.flush(include_current=True)
+        summary = UserDashboard.objects.get(user=self.user)
+        self.assertEqual(summary.minutos_vistos, 5 + 1 + 2)
+        self.assertEqual(summary.lecciones_iniciadas, 2)
+
+    def test_rejects_invalid_batches(self):
+        self.assertEqual(self.client.post(
+            '/api/learning/heartbeat/', {'deltas': []}, format='json'
+        ).status_code, 400)
+        self.assertEqual(self.beat((self.lessons[0], 0)).status_code, 400)
+
+    def test_flush_command(self):
+        self.beat((self.lessons[0], 120))
+        out = StringIO()
+        call_command('flush_heartbeats', '--all', stdout=out)
+        self.assertIn('1 lecciones', out.getvalue())
+        self.progress.refresh_from_db()
+        self.assertEqual(self.progress.duracion_real, 7)
+
+
+class RouteGenerationTests(TestCase):
+    """
+    Verifica que las rutas generadas con el modelo se reutilicen para
+    respuestas equivalentes y se guarden como rutas y cursos
+    """
+    answers = {
+        'learningStyle': 'practico', 'timeCommitment': '3-5_horas',
+        'academicInterests': ['informatica', 'matematicas'], 'teamWork': 'equipo',
+    }
+    # Las mismas respuestas en otro orden, con otras mayúsculas y repetidos
+    equivalent = {
+        'teamWork': ' Equipo ', 'academicInterests': ['Matematicas', 'informatica', 'informatica'],
+        'timeCommitment': '3-5_horas', 'learningStyle': 'practico', 'vocationalAreas': [],
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='quiz', email='quiz@example.com', password='secreta123',
+            nombres='Lucía', apellidos='Torres'
+        )
+
+    def setUp(self):
+        cache.clear()
+        routes.route_cache.clear()
+        self.model = self.enterContext(StubModelServer())
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def generate(self, answers):
+        return self.client.post('/api/learning/generate-route/', {'answers': answers}, format='json')
+
+    def test_route_is_persisted_as_path_and_courses(self):
+        response = self.generate(self.answers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['title'], STUB_ROUTE['title'])
+        path = LearningPath.objects.get(pk=response.data['learning_path_id'])
+        self.assertEqual(path.nombre, STUB_ROUTE['title'])
+        self.assertEqual(
+            [row.course.titulo for row in path.path_courses.select_related('course')],
+            STUB_ROUTE['courses']
+        )
+        self.assertEqual({row.course.nivel for row in path.path_courses.all()}, {'basico'})
+
+        prompt = self.model.requests[0][1]['contents'][0]['parts'][0]['text']
+        self.assertIn('informatica, matematicas', prompt)
+        self.assertTrue(self.model.requests[0][0].endswith(':generateContent'))
+
+    def test_equivalent_answers_share_one_generation(self):
+        first = self.generate(self.answers)
+        with CaptureQueriesContext(connection) as context:
+            second = self.generate(self.equivalent)
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(len(self.model.requests), 1)
+        self.assertEqual(len(context), 0)
+
+        # Sin la caché del proceso se usa la ruta guardada
+        routes.route_cache.clear()
+        third = self.generate(self.equivalent)
+        self.assertEqual(third.data, first.data)
+        self.assertEqual(len(self.model.requests), 1)
+        self.assertEqual(GeneratedRoute.objects.count(), 1)
+
+    def test_expired_routes_are_regenerated(self):
+        first = self.generate(self.answers)
+        routes.route_cache.clear()
+        GeneratedRoute.objects.update(
+            created_at=timezone.now() - timedelta(seconds=settings.AI_ROUTE_CACHE_TIMEOUT + 1)
+        )
+        second = self.generate(self.answers)
+        self.assertEqual(len(self.model.requests), 2)
+        self.assertNotEqual(second.data['learning_path_id'], first.data['learning_path_id'])
+
+    def test_concurrent_requests_share_one_call(self):
+        self.model.delay = 0.2
+        answers = routes.canonical_answers(self.answers)
+        results = []
+        path = SimpleNamespace(pk=1)
+        # Sin base de datos en los hilos: solo se mide la llamada al modelo
+        with mock.patch.object(routes, 'stored_route', return_value=None), \
+                mock.patch.object(routes, 'save_route', return_value=path) as save:
+            threads = [
+                threading.Thread(target=lambda: results.append(routes.route_for(answers)))
+                for _ in range(8)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(len(results), 8)
+        self.assertEqual(len(self.model.requests), 1)
+        self.assertEqual(save.call_count, 1)
+
+    def test_model_errors(self):
+        self.model.status = 503
+        response = self.generate(self.answers)
+        self.assertEqual(response.status_code, 502)
+        self.model.status = None
+        response = self.generate(self.answers)
+        self.assertEqual(response.status_code, 502)
+        self.model.status = 200
+        self.model.reply = 'No puedo generar la ruta'
+        response = self.generate(self.answers)
+        self.assertEqual(response.status_code, 502)
+        self.assertFalse(GeneratedRoute.objects.exists())
+        self.assertFalse(LearningPath.objects.exists())
+
+    def test_rejects_invalid_answers(self):
+        for answers in [{}, {'learningStyle': {'a': 1}}, {'intereses': ['x' * 201]}]:
+            with self.subTest(answers=answers):
+                self.assertEqual(self.generate(answers).status_code, 400)
+        self.assertEqual(self.model.requests, [])
+
+
+class RouteCacheTests(TestCase):
+    """
+    Verifica la caché TTL+LRU y el single-flight de learning/routes.py
+    """
+    def test_cache_evicts_least_recently_used_and_expires(self):
+        cache = routes.TTLLRUCache()
+        cache.maxsize = 2
+        with mock.patch.object(routes.time, 'monotonic', return_value=0):
+            cache.set('a', 1)
+            cache.set('b', 2)
+            cache.get('a')
+            cache.set('c', 3)
+            self.assertIsNone(cache.get('b'))
+            self.assertEqual(cache.get('a'), 1)
+        with mock.patch.object(routes.time, 'monotonic', return_value=cache.timeout):
+            self.assertIsNone(cache.get('a'))
+            self.assertEqual(cache.entries, {'c': (cache.timeout, 3)})
+
+    def run_flight(self, flights, function, count=5):
+        """
+        Llama flights.do() desde `count` hilos a la vez; `function` no
+        termina hasta que todos los hilos llegaron
+        """
+        arrived = threading.Barrier(count + 1)
+        release = threading.Event()
+        outcomes = []
+
+        def blocked():
+            release.wait()
+            return function()
+
+        def run():
+            arrived.wait()
+            try:
+                outcomes.append(flights.do('llave', blocked))
+            except ValueError as exc:
+                outcomes.append(exc)
+
+        threads = [threading.Thread(target=run) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        arrived.wait()
+        release.wait(0.05)
+        release.set()
+        for thread in threads:
+            thread.join()
+        return outcomes
+
+    def test_single_flight_shares_results_and_errors(self):
+        flights = routes.SingleFlight()
+        calls = []
+
+        def generate():
+            calls.append(1)
+            return {'ruta': 1}
+
+        def fail():
+            calls.append(1)
+            raise ValueError('falló')
+
+        outcomes = self.run_flight(flights, generate)
+        self.assertEqual(outcomes, [{'ruta': 1}] * 5)
+        self.assertTrue(all(outcome is outcomes[0] for outcome in outcomes))
+
+        outcomes = self.run_flight(flights, fail)
+        self.assertEqual(len(outcomes), 5)
+        self.assertTrue(all(isinstance(outcome, ValueError) for outcome in outcomes))
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(flights.flights, {})
+
+
+class AssistantTests(TestCase):
+    """
+    Verifica el asistente virtual: respuestas por server-sent events y la
+    conversación guardada en el servidor con la historia acotada
+    """
+    reply = 'Organiza tu semana en bloques de estudio de 45 minutos con descansos cortos'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='asistente', email='asistente@example.com', password='secreta123',
+            nombres='Diego', apellidos='Luna'
+        )
+        cls.token = str(CustomTokenObtainPairSerializer.get_token(cls.user).access_token)
+
+    def setUp(self):
+        cache.clear()
+        self.model = self.enterContext(StubModelServer(reply=self.reply))
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def send(self, message, conversation_id=None):
+        data = {'message': message}
+        if conversation_id:
+            data['conversation_id'] = conversation_id
+        return self.client.post('/api/learning/assistant/chat/', data, format='json')
+
+    async def stream(self, message, conversation_id=None, **headers):
+        """
+        Regresa [(evento, datos, segundos desde la petición)]
+        """
+        data = {'message': message}
+        if conversation_id:
+            data['conversation_id'] = conversation_id
+        start = time.perf_counter()
+        client = AsyncClient(enforce_csrf_checks=True)
+        response = await client.post(
+            '/api/learning/async/assistant/chat/', data,
+            content_type='application/json',
+            headers={'Authorization': f'Bearer {self.token}', **headers}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        events = []
+        async for chunk in response.streaming_content:
+            name, data = chunk.decode().strip().split('\n')
+            events.append((name[len('event: '):], json.loads(data[len('data: '):]),
+                           time.perf_counter() - start))
+        return events
+
+    async def test_stream_relays_tokens_as_they_arrive(self):
+        self.model.chunk_delay = 0.02
+        events = await self.stream('¿Cómo organizo mi semana?')
+        tokens = [data['text'] for name, data, elapsed in events if name == 'token']
+        self.assertEqual(len(tokens), len(self.reply.split()))
+        self.assertEqual(''.join(tokens), self.reply)
+
+        name, data, elapsed = events[-1]
+        self.assertEqual(name, 'done')
+        # El primer fragmento llega antes de que el modelo termine
+        self.assertLess(events[0][2], elapsed - 0.1)
+
+        conversation = await cache.aget(
+            assistant.conversation_key(self.user.pk, data['conversation_id'])
+        )
+        self.assertEqual(
+            conversation['messages'],
+            [['user', '¿Cómo organizo mi semana?'], ['model', self.reply]]
+        )
+        path, body = self.model.requests[0]
+        self.assertTrue(path.endswith(':streamGenerateContent?alt=sse'))
+        self.assertEqual(body['systemInstruction']['parts'][0]['text'], assistant.ASSISTANT_CONTEXT)
+
+    async def test_stream_reports_model_errors(self):
+        self.model.status = 503
+        events = await self.stream('Hola')
+        self.assertEqual([name for name, data, elapsed in events], ['error'])
+
+    async def test_stream_requires_authentication(self):
+        response = await self.async_client.post(
+            '/api/learning/async/assistant/chat/', {'message': 'Hola'},
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 401)
+        self.assertIn('WWW-Authenticate', response)
+        self.assertEqual(self.model.requests, [])
+
+    def test_conversation_continues_server_side(self):
+        first = self.send('Quiero estudiar medicina')
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.data['response'], self.reply)
+        second = self.send('¿Qué materias repaso?', first.data['conversation_id'])
+        self.assertEqual(second.data['conversation_id'], first.data['conversation_id'])
+
+        contents = self.model.requests[1][1]['contents']
+        self.assertEqual(
+            [(message['role'], message['parts'][0]['text']) for message in contents],
+            [('user', 'Quiero estudiar medicina'), ('model', self.reply),
+             ('user', '¿Qué materias repaso?')]
+        )
+        # Otra conversación no ve la historia
+        self.send('Hola')
+        self.assertEqual(len(self.model.requests[2][1]['contents']), 1)
+
+    @override_settings(ASSISTANT_HISTORY_MESSAGES=4)
+    def test_history_is_bounded_and_summarized(self):
+        conversation_id = self.send('Mensaje 0').data['conversation_id']
+        for i in range(1, 8):
+            self.send(f'Mensaje {i}', conversation_id)
+
+        chat = [body for path, body in self.model.requests if 'systemInstruction' in body]
+        summaries = [body for path, body in self.model.requests if 'systemInstruction' not in body]
+        self.assertEqual(len(chat), 8)
+        self.assertEqual(len(summaries), 3)
+        self.assertLessEqual(max(len(body['contents']) for body in chat), 5)
+        self.assertIn('Resumen de la conversación', chat[-1]['systemInstruction']['parts'][0]['text'])
+        self.assertIn('Mensaje 5', summaries[-1]['contents'][0]['parts'][0]['text'])
+
+        # El prompt deja de crecer con los turnos
+        sizes = [len(json.dumps(body)) for body in chat]
+        self.assertEqual(max(sizes[4:]), max(sizes[3:]))
+
+    @override_settings(ASSISTANT_HISTORY_MESSAGES=2)
+    async def test_turn_sent_while_summarizing_is_kept(self):
+        conversation_id = (await sync_to_async(self.send)('Mensaje 0')).data['conversation_id']
+        key = assistant.conversation_key(self.user.pk, conversation_id)
+
+        def summarize(summary, messages):
+            # Otra petición agrega su turno después del evento done
+            conversation = cache.get(key)
+            conversation['messages'] += [['user', 'Mensaje 2'], ['model', 'Respuesta 2']]
+            cache.set(key, conversation)
+            return 'Resumen'
+
+        with mock.patch.object(assistant, 'summarize', summarize):
+            events = await self.stream('Mensaje 1', conversation_id)
+        self.assertEqual(events[-1][0], 'done')
+
+        conversation = await cache.aget(key)
+        self.assertEqual(conversation['summary'], 'Resumen')
+        # Los dos primeros turnos quedan en el resumen; el nuevo se conserva
+        self.assertEqual(
+            conversation['messages'], [['user', 'Mensaje 2'], ['model', 'Respuesta 2']]
+        )
+
+    def test_model_errors(self):
+        self.model.status = 503
+        response = self.send('Hola')
+        self.assertEqual(response.status_code, 502)
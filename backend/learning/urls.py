@@ -19,6 +19,17 @@ urlpatterns = [
     path('my-courses/', views.MyCourseProgressView.as_view(), name='my-courses'),
     path('my-paths/', views.MyLearningPathsView.as_view(), name='my-paths'),
     path('my-lessons/', views.MyLessonProgressView.as_view(), name='my-lessons'),
+    path('dashboard/', views.DashboardView.as_view(), name='dashboard'),
+    path('heartbeat/', views.HeartbeatView.as_view(), name='heartbeat'),
+    path('generate-route/', views.GenerateRouteView.as_view(), name='generate-route'),
+    path('assistant/chat/', views.AssistantChatView.as_view(), name='assistant-chat'),
+    
+    # Variantes async de las lecturas del usuario (servidor ASGI)
+    path('async/my-courses/', views.AsyncMyCourseProgressView.as_view(), name='async-my-courses'),
+    path('async/my-paths/', views.AsyncMyLearningPathsView.as_view(), name='async-my-paths'),
+    path('async/my-lessons/', views.AsyncMyLessonProgressView.as_view(), name='async-my-lessons'),
+    path('async/dashboard/', views.AsyncDashboardView.as_view(), name='async-dashboard'),
+    path('async/assistant/chat/', views.AsyncAssistantChatView.as_view(), name='async-assistant-chat'),
     
     # ViewSets del router
     path('', include(router.urls)),
@@ -2,26 +2,52 @@ from rest_framework import generics, viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly
+from rest_framework.throttling import ScopedRateThrottle
+from asgiref.sync import sync_to_async
+from django.db.models import Prefetch
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils.decorators import method_decorator
+from django.views.decorators.gzip import gzip_page
+from ascendya.async_views import AsyncAPIView, AsyncListView
+from ascendya.llm import ModelError
+from ascendya.mixins import ConditionalGetMixin, SparseQuerysetMixin, ValuesListMixin
+from ascendya.pagination import KeysetPagination
+from users.authentication import STATELESS_READ_AUTHENTICATION
 from .models import (
     LearningPath, Course, Lesson, UserLearningPath,
-    LessonProgress, UserCourseProgress, LearningPathCourse
+    LessonProgress, UserCourseProgress, LearningPathCourse, UserDashboard
 )
 from .serializers import (
     LearningPathSerializer, CourseSerializer, LessonSerializer,
     UserLearningPathSerializer, LessonProgressSerializer,
     UserCourseProgressSerializer, EnrollCourseSerializer,
     EnrollLearningPathSerializer, LearningPathListSerializer,
-    CourseListSerializer
+    CourseListSerializer, UserDashboardSerializer, HeartbeatSerializer,
+    LessonListSerializer, GenerateRouteSerializer, AssistantMessageSerializer
 )
+from . import assistant, dashboard, heartbeats, routes
+from .progress import initial_course_progress, initial_path_progress
 
 
-class LearningPathViewSet(viewsets.ModelViewSet):
+class LearningPathViewSet(
+    SparseQuerysetMixin, ConditionalGetMixin, ValuesListMixin, viewsets.ModelViewSet
+):
     """
     ViewSet para el manejo de rutas de aprendizaje
     """
     queryset = LearningPath.objects.all()
     permission_classes = [IsAuthenticatedOrReadOnly]
+    authentication_classes = STATELESS_READ_AUTHENTICATION
+    etag_related = ['path_courses', 'path_courses__course', 'path_courses__course__lessons']
+    
+    def get_queryset(self):
+        queryset = LearningPath.objects.all()
+        if self.wants_field('courses_count'):
+            queryset = queryset.with_courses_count()
+        if self.action != 'list':
+            queryset = queryset.with_courses()
+        return queryset
     
     def get_serializer_class(self):
         if self.action == 'list':
@@ -29,12 +55,26 @@ class LearningPathViewSet(viewsets.ModelViewSet):
         return LearningPathSerializer
 
 
-class CourseViewSet(viewsets.ModelViewSet):
+class CourseViewSet(
+    SparseQuerysetMixin, ConditionalGetMixin, ValuesListMixin, viewsets.ModelViewSet
+):
     """
     ViewSet para el manejo de cursos
     """
     queryset = Course.objects.all()
     permission_classes = [IsAuthenticatedOrReadOnly]
+    authentication_classes = STATELESS_READ_AUTHENTICATION
+    etag_related = ['lessons']
+    
+    def get_queryset(self):
+        queryset = Course.objects.all()
+        if self.wants_field('lessons_count'):
+            queryset = queryset.with_lessons_count()
+        if self.action != 'list':
+            queryset = queryset.prefetch_related(
+                Prefetch('lessons', queryset=Lesson.objects.without_content())
+            )
+        return queryset
     
     def get_serializer_class(self):
         if self.action == 'list':
@@ -42,16 +82,34 @@ class CourseViewSet(viewsets.ModelViewSet):
         return CourseSerializer
 
 
-class LessonViewSet(viewsets.ModelViewSet):
+class LessonViewSet(
+    SparseQuerysetMixin, ConditionalGetMixin, ValuesListMixin, viewsets.ModelViewSet
+):
     """
     ViewSet para el manejo de lecciones
     """
     queryset = Lesson.objects.all()
-    serializer_class = LessonSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    authentication_classes = STATELESS_READ_AUTHENTICATION
+    
+    def get_queryset(self):
+        if self.action == 'list':
+            return Lesson.objects.without_content()
+        return Lesson.objects.all()
+    
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return LessonListSerializer
+        return LessonSerializer
+    
+    @method_decorator(gzip_page)
+    def retrieve(self, request, *args, **kwargs):
+        # Solo el detalle lleva el contenido completo; se comprime si el
+        # cliente envía Accept-Encoding: gzip
+        return super().retrieve(request, *args, **kwargs)
 
 
-class UserLearningPathViewSet(viewsets.ModelViewSet):
+class UserLearningPathViewSet(SparseQuerysetMixin, viewsets.ModelViewSet):
     """
     ViewSet para el manejo de rutas de aprendizaje de usuarios
     """
@@ -59,35 +117,42 @@ class UserLearningPathViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
     
     def get_queryset(self):
+        queryset = UserLearningPath.objects.for_listing()
         if self.request.user.is_staff:
-            return UserLearningPath.objects.all()
-        return UserLearningPath.objects.filter(user=self.request.user)
+            return queryset
+        return queryset.filter(user=self.request.user)
 
 
-class LessonProgressViewSet(viewsets.ModelViewSet):
+class LessonProgressViewSet(SparseQuerysetMixin, viewsets.ModelViewSet):
     """
     ViewSet para el manejo del progreso de lecciones
     """
     serializer_class = LessonProgressSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    keyset_ordering = ('-fecha_inicio', '-id')
     
     def get_queryset(self):
+        queryset = LessonProgress.objects.for_listing()
         if self.request.user.is_staff:
-            return LessonProgress.objects.all()
-        return LessonProgress.objects.filter(user=self.request.user)
+            return queryset
+        return queryset.filter(user=self.request.user)
 
 
-class UserCourseProgressViewSet(viewsets.ModelViewSet):
+class UserCourseProgressViewSet(SparseQuerysetMixin, viewsets.ModelViewSet):
     """
     ViewSet para el manejo del progreso de cursos
     """
     serializer_class = UserCourseProgressSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    keyset_ordering = ('-fecha_inicio', '-id')
     
     def get_queryset(self):
+        queryset = UserCourseProgress.objects.for_listing()
         if self.request.user.is_staff:
-            return UserCourseProgress.objects.all()
-        return UserCourseProgress.objects.filter(user=self.request.user)
+            return queryset
+        return queryset.filter(user=self.request.user)
 
 
 class EnrollCourseView(generics.CreateAPIView):
@@ -108,7 +173,7 @@ class EnrollCourseView(generics.CreateAPIView):
         progress, created = UserCourseProgress.objects.get_or_create(
             user=request.user,
             course=course,
-            defaults={'porcentaje': 0}
+            defaults=initial_course_progress(request.user, course)
         )
         
         if not created:
@@ -140,7 +205,7 @@ class EnrollLearningPathView(generics.CreateAPIView):
         user_path, created = UserLearningPath.objects.get_or_create(
             user=request.user,
             path=path,
-            defaults={'estado': 'activa', 'progreso': 0}
+            defaults=initial_path_progress(request.user, path)
         )
         
         if not created:
@@ -154,34 +219,186 @@ class EnrollLearningPathView(generics.CreateAPIView):
         }, status=status.HTTP_201_CREATED)
 
 
-class MyCourseProgressView(generics.ListAPIView):
+class MyCourseProgressView(SparseQuerysetMixin, generics.ListAPIView):
     """
     Vista para listar el progreso de cursos del usuario actual
     """
     serializer_class = UserCourseProgressSerializer
     permission_classes = [IsAuthenticated]
+    authentication_classes = STATELESS_READ_AUTHENTICATION
     
     def get_queryset(self):
-        return UserCourseProgress.objects.filter(user=self.request.user)
+        return UserCourseProgress.objects.for_listing().filter(user=self.request.user)
 
 
-class MyLearningPathsView(generics.ListAPIView):
+class MyLearningPathsView(SparseQuerysetMixin, generics.ListAPIView):
     """
     Vista para listar las rutas de aprendizaje del usuario actual
     """
     serializer_class = UserLearningPathSerializer
     permission_classes = [IsAuthenticated]
+    authentication_classes = STATELESS_READ_AUTHENTICATION
     
     def get_queryset(self):
-        return UserLearningPath.objects.filter(user=self.request.user)
+        return UserLearningPath.objects.for_listing().filter(user=self.request.user)
 
 
-class MyLessonProgressView(generics.ListAPIView):
+class MyLessonProgressView(SparseQuerysetMixin, generics.ListAPIView):
     """
     Vista para listar el progreso de lecciones del usuario actual
     """
     serializer_class = LessonProgressSerializer
     permission_classes = [IsAuthenticated]
+    authentication_classes = STATELESS_READ_AUTHENTICATION
+    
+    def get_queryset(self):
+        return LessonProgress.objects.for_listing().filter(user=self.request.user)
+
+
+class DashboardView(generics.RetrieveAPIView):
+    """
+    Vista con el resumen del usuario actual para el dashboard, leída de una
+    sola fila de UserDashboard
+    """
+    serializer_class = UserDashboardSerializer
+    permission_classes = [IsAuthenticated]
+    authentication_classes = STATELESS_READ_AUTHENTICATION
     
     def get_queryset(self):
-        return LessonProgress.objects.filter(user=self.request.user)
+        return UserDashboard.objects.select_related('ruta_principal').filter(user=self.request.user)
+    
+    def get_object(self):
+        summary = self.get_queryset().first()
+        if summary is None:
+            summary = dashboard.rebuild(self.request.user)
+        return summary
+
+
+class HeartbeatView(generics.GenericAPIView):
+    """
+    Vista que recibe en lote los segundos vistos de varias lecciones. Se
+    acumulan en caché y se vuelcan a LessonProgress cada
+    HEARTBEAT_FLUSH_INTERVAL segundos.
+    """
+    serializer_class = HeartbeatSerializer
+    permission_classes = [IsAuthenticated]
+    
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        deltas = {}
+        for delta in serializer.validated_data['deltas']:
+            deltas[delta['lesson_id']] = deltas.get(delta['lesson_id'], 0) + delta['segundos']
+        heartbeats.record(request.user.pk, deltas)
+        heartbeats.flush_if_due()
+        
+        return Response({
+            'message': 'Latidos recibidos',
+            'lecciones': len(deltas)
+        }, status=status.HTTP_202_ACCEPTED)
+
+
+class GenerateRouteView(generics.GenericAPIView):
+    """
+    Vista que genera con el modelo de lenguaje la ruta de aprendizaje para
+    las respuestas del quiz, o reutiliza la de unas respuestas equivalentes
+    (ver learning/routes.py)
+    """
+    serializer_class = GenerateRouteSerializer
+    permission_classes = [IsAuthenticated]
+    throttle_classes = [ScopedRateThrottle]
+    throttle_scope = 'ai_route'
+    
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        try:
+            route = routes.route_for(serializer.validated_data['answers'])
+        except ModelError as exc:
+            return Response({
+                'error': f'No se pudo generar la ruta: {exc}'
+            }, status=status.HTTP_502_BAD_GATEWAY)
+        
+        return Response(route)
+
+
+class AssistantChatView(generics.GenericAPIView):
+    """
+    Vista que responde un mensaje del asistente virtual con la respuesta
+    completa; AsyncAssistantChatView la entrega por server-sent events
+    conforme se genera (ver learning/assistant.py)
+    """
+    serializer_class = AssistantMessageSerializer
+    permission_classes = [IsAuthenticated]
+    throttle_classes = [ScopedRateThrottle]
+    throttle_scope = 'ai_chat'
+    
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        conversation_id = serializer.validated_data['conversation_id'].hex
+        try:
+            answer = assistant.reply(
+                request.user.pk, conversation_id, serializer.validated_data['message']
+            )
+        except ModelError as exc:
+            return Response({
+                'error': f'No se pudo obtener la respuesta: {exc}'
+            }, status=status.HTTP_502_BAD_GATEWAY)
+        
+        return Response({
+            'conversation_id': conversation_id,
+            'response': answer
+        })
+
+
+# Variantes async (ASGI) de las lecturas del usuario; ver ascendya/async_views.py
+
+class AsyncMyCourseProgressView(AsyncListView):
+    view_class = MyCourseProgressView
+
+
+class AsyncMyLearningPathsView(AsyncListView):
+    view_class = MyLearningPathsView
+
+
+class AsyncMyLessonProgressView(AsyncListView):
+    view_class = MyLessonProgressView
+
+
+class AsyncDashboardView(AsyncAPIView):
+    view_class = DashboardView
+    
+    async def get_data(self, view):
+        summary = await view.get_queryset().afirst()
+        if summary is None:
+            # rebuild() escribe y el serializer lee la ruta principal sin select_related
+            return await sync_to_async(lambda: view.get_serializer(view.get_object()).data)()
+        return view.get_serializer(summary).data
+
+
+class AsyncAssistantChatView(AsyncAPIView):
+    view_class = AssistantChatView
+    http_method_names = ['post']
+    
+    async def post(self, request, *args, **kwargs):
+        return await self.handle(request, args, kwargs)
+    
+    async def respond(self, view):
+        serializer = view.get_serializer(data=view.request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        response = StreamingHttpResponse(
+            assistant.stream_reply(
+                view.request.user.pk, serializer.validated_data['conversation_id'].hex,
+                serializer.validated_data['message']
+            ),
+            content_type='text/event-stream'
+        )
+        response['Cache-Control'] = 'no-cache'
+        # Sin buffer en nginx, para que cada fragmento salga en cuanto llega
+        response['X-Accel-Buffering'] = 'no'
+        return response
@@ -0,0 +1,47 @@
+"""
+Caché de la respuesta de detalle de universidades.
+
+La respuesta serializada se guarda por universidad en la caché de Django y se
+invalida con las señales de University, Program y Scholarship (ver
+signals.py). Las operaciones masivas como QuerySet.update() no envían señales;
+para esos casos las entradas expiran después de
+UNIVERSITY_DETAIL_CACHE_TIMEOUT segundos.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.http import quote_etag
+
+
+def detail_key(pk):
+    return f'universities:detail:{pk}'
+
+
+def get_detail(pk):
+    return cache.get(detail_key(pk))
+
+
+def set_detail(university, data):
+    """
+    Guarda la respuesta junto con su ETag y Last-Modified.
+
+    Espera que programs y scholarships estén precargados. El ETag incluye los
+    conteos para que un borrado también cambie su valor.
+    """
+    programs = list(university.programs.all())
+    scholarships = list(university.scholarships.all())
+    last_modified = max(row.updated_at for row in [university, *programs, *scholarships])
+    entry = {
+        'data': data,
+        'etag': quote_etag(
+            f'{university.pk}-{len(programs)}-{len(scholarships)}-{last_modified.timestamp()}'
+        ),
+        'last_modified': last_modified.timestamp(),
+    }
+    cache.set(detail_key(university.pk), entry, settings.UNIVERSITY_DETAIL_CACHE_TIMEOUT)
+    return entry
+
+
+def invalidate_detail(pk):
+    if pk is not None:
+        cache.delete(detail_key(pk))
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.5 on 2026-10-18 07:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("universities", "0002_search_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="university",
+            index=models.Index(fields=["tipo"], name="universities_tipo_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="scholarship",
+            index=models.Index(fields=["tipo"], name="scholarships_tipo_idx"),
+        ),
+    ]
@@ -1,4 +1,46 @@
 from django.db import models
+from django.db.models.functions import Coalesce
+
+from . import search
+
+
+class SearchQuerySet(models.QuerySet):
+    """
+    QuerySet con búsqueda de texto completo ordenada por relevancia
+    """
+    def search(self, text):
+        return search.search(self, text)
+
+
+class UniversityQuerySet(SearchQuerySet):
+    """
+    QuerySet para las universidades
+    """
+    def for_listing(self, counts=('programs', 'scholarships')):
+        # Subconsultas en lugar de JOINs para no multiplicar programas por becas
+        models_by_name = {'programs': Program, 'scholarships': Scholarship}
+        return self.annotate(**{
+            f'{name}_count': count_related(models_by_name[name]) for name in counts
+        })
+
+
+class UniversityRelatedQuerySet(SearchQuerySet):
+    """
+    QuerySet para los modelos que pertenecen a una universidad
+    """
+    def for_listing(self):
+        return self.select_related('universidad')
+
+
+def count_related(model):
+    related = (
+        model.objects.filter(universidad=models.OuterRef('pk'))
+        .order_by()
+        .values('universidad')
+        .annotate(total=models.Count('pk'))
+        .values('total')
+    )
+    return Coalesce(models.Subquery(related), 0)
 
 
 class University(models.Model):
@@ -17,10 +59,15 @@ class University(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = UniversityQuerySet.as_manager()
+    
     class Meta:
         db_table = 'universities'
         verbose_name = 'Universidad'
         verbose_name_plural = 'Universidades'
+        indexes = [
+            models.Index(fields=['tipo'], name='universities_tipo_idx'),
+        ]
     
     def __str__(self):
         return self.nombre
@@ -39,6 +86,8 @@ class Program(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = UniversityRelatedQuerySet.as_manager()
+    
     class Meta:
         db_table = 'programs'
         verbose_name = 'Programa'
@@ -67,10 +116,15 @@ class Scholarship(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = UniversityRelatedQuerySet.as_manager()
+    
     class Meta:
         db_table = 'scholarships'
         verbose_name = 'Beca'
         verbose_name_plural = 'Becas'
+        indexes = [
+            models.Index(fields=['tipo'], name='scholarships_tipo_idx'),
+        ]
     
     def __str__(self):
         return f"{self.universidad.nombre} - {self.nombre}"
@@ -0,0 +1,224 @@
+"""
+Índice de búsqueda de texto completo para universidades, programas y becas.
+
+Cada modelo tiene una tabla de índice `<tabla>_fts` que se mantiene
+sincronizada mediante triggers de la base de datos, por lo que también cubre
+bulk_create, update() y borrados en cascada:
+
+- SQLite: tabla virtual FTS5 con el tokenizador unicode61 sin diacríticos.
+- PostgreSQL: tabla con una columna tsvector e índice GIN, usando una
+  configuración de búsqueda en español con unaccent.
+
+En cualquier otro motor la búsqueda usa `icontains` sobre los mismos campos.
+"""
+
+import re
+
+from django.db import connections
+from django.db.models import Q
+
+
+PG_CONFIG = 'ascendya_es'
+
+# Tabla del modelo -> columnas indexadas con su peso y expresión SQL de origen.
+# `{row}` se reemplaza por NEW en los triggers y por la tabla en la carga inicial.
+# `watch` son las columnas cuyo cambio reindexa la fila.
+INDEXES = {
+    'universities': {
+        'columns': [
+            ('nombre', 10.0, '{row}.nombre'),
+            ('descripcion', 1.0, '{row}.descripcion'),
+        ],
+        'watch': ['nombre', 'descripcion'],
+        'fallback': ['nombre', 'descripcion'],
+    },
+    'programs': {
+        'columns': [
+            ('nombre', 10.0, '{row}.nombre'),
+            ('universidad', 2.0, '(SELECT nombre FROM universities WHERE id = {row}.universidad_id)'),
+        ],
+        'watch': ['nombre', 'universidad_id'],
+        'fallback': ['nombre', 'universidad__nombre'],
+    },
+    'scholarships': {
+        'columns': [
+            ('nombre', 10.0, '{row}.nombre'),
+            ('requisitos', 1.0, '{row}.requisitos'),
+            ('universidad', 2.0, '(SELECT nombre FROM universities WHERE id = {row}.universidad_id)'),
+        ],
+        'watch': ['nombre', 'requisitos', 'universidad_id'],
+        'fallback': ['nombre', 'requisitos', 'universidad__nombre'],
+    },
+}
+
+# Tablas cuyo índice incluye el nombre de la universidad
+UNIVERSITY_DEPENDENTS = ['programs', 'scholarships']
+
+PG_WEIGHTS = ['A', 'B', 'C', 'D']
+
+
+def get_terms(text):
+    return re.findall(r'\w+', text or '')
+
+
+def column_values(table, row):
+    return ', '.join(
+        expression.format(row=row) for name, weight, expression in INDEXES[table]['columns']
+    )
+
+
+def sqlite_statements(table):
+    fts = f'{table}_fts'
+    names = ', '.join(name for name, weight, expression in INDEXES[table]['columns'])
+    watch = ', '.join(INDEXES[table]['watch'])
+    assignments = ', '.join(
+        f'{name} = {expression.format(row="new")}'
+        for name, weight, expression in INDEXES[table]['columns']
+    )
+    return [
+        f"CREATE VIRTUAL TABLE {fts} USING fts5("
+        f"{names}, tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+        f'INSERT INTO {fts}(rowid, {names}) SELECT {table}.id, {column_values(table, table)} FROM {table}',
+        f'CREATE TRIGGER {fts}_insert AFTER INSERT ON {table} BEGIN '
+        f'INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {column_values(table, "new")}); END',
+        f'CREATE TRIGGER {fts}_update AFTER UPDATE OF {watch} ON {table} BEGIN '
+        f'UPDATE {fts} SET {assignments} WHERE rowid = new.id; END',
+        f'CREATE TRIGGER {fts}_delete AFTER DELETE ON {table} BEGIN '
+        f'DELETE FROM {fts} WHERE rowid = old.id; END',
+    ]
+
+
+def pg_document(table, row):
+    return ' || '.join(
+        f"setweight(to_tsvector('{PG_CONFIG}', coalesce({expression.format(row=row)}, '')), "
+        f"'{PG_WEIGHTS[min(index, len(PG_WEIGHTS) - 1)]}')"
+        for index, (name, weight, expression) in enumerate(
+            sorted(INDEXES[table]['columns'], key=lambda column: -column[1])
+        )
+    )
+
+
+def pg_statements(table):
+    fts = f'{table}_fts'
+    return [
+        f'CREATE TABLE {fts} (id bigint PRIMARY KEY, document tsvector NOT NULL)',
+        f'CREATE INDEX {fts}_document ON {fts} USING GIN (document)',
+        f'INSERT INTO {fts} (id, document) SELECT {table}.id, {pg_document(table, table)} FROM {table}',
+        f'CREATE FUNCTION {fts}_sync() RETURNS trigger AS $$ BEGIN '
+        f'IF TG_OP = \'DELETE\' THEN DELETE FROM {fts} WHERE id = OLD.id; RETURN OLD; END IF; '
+        f'INSERT INTO {fts} (id, document) VALUES (NEW.id, {pg_document(table, "NEW")}) '
+        f'ON CONFLICT (id) DO UPDATE SET document = EXCLUDED.document; RETURN NEW; '
+        f'END $$ LANGUAGE plpgsql',
+        f'CREATE TRIGGER {fts}_sync AFTER INSERT OR UPDATE OR DELETE ON {table} '
+        f'FOR EACH ROW EXECUTE FUNCTION {fts}_sync()',
+    ]
+
+
+def install(schema_editor):
+    """
+    Crea las tablas de índice y sus triggers (usado por la migración)
+    """
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        for table in INDEXES:
+            for statement in sqlite_statements(table):
+                schema_editor.execute(statement)
+        # Propagar cambios de nombre de la universidad a programas y becas
+        updates = ' '.join(
+            f'UPDATE {table}_fts SET universidad = new.nombre WHERE rowid IN '
+            f'(SELECT id FROM {table} WHERE universidad_id = new.id);'
+            for table in UNIVERSITY_DEPENDENTS
+        )
+        schema_editor.execute(
+            f'CREATE TRIGGER universities_fts_rename AFTER UPDATE OF nombre ON universities '
+            f'BEGIN {updates} END'
+        )
+    elif vendor == 'postgresql':
+        schema_editor.execute('CREATE EXTENSION IF NOT EXISTS unaccent')
+        schema_editor.execute(f'CREATE TEXT SEARCH CONFIGURATION {PG_CONFIG} (COPY = spanish)')
+        schema_editor.execute(
+            f'ALTER TEXT SEARCH CONFIGURATION {PG_CONFIG} '
+            f'ALTER MAPPING FOR hword, hword_part, word WITH unaccent, spanish_stem'
+        )
+        for table in INDEXES:
+            for statement in pg_statements(table):
+                schema_editor.execute(statement)
+        updates = ' '.join(
+            f'UPDATE {table}_fts SET document = {pg_document(table, table)} FROM {table} '
+            f'WHERE {table}_fts.id = {table}.id AND {table}.universidad_id = NEW.id;'
+            for table in UNIVERSITY_DEPENDENTS
+        )
+        schema_editor.execute(
+            f'CREATE FUNCTION universities_fts_rename() RETURNS trigger AS $$ BEGIN '
+            f'IF NEW.nombre IS DISTINCT FROM OLD.nombre THEN {updates} END IF; RETURN NEW; '
+            f'END $$ LANGUAGE plpgsql'
+        )
+        schema_editor.execute(
+            'CREATE TRIGGER universities_fts_rename AFTER UPDATE ON universities '
+            'FOR EACH ROW EXECUTE FUNCTION universities_fts_rename()'
+        )
+
+
+def uninstall(schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute('DROP TRIGGER IF EXISTS universities_fts_rename')
+        for table in INDEXES:
+            for suffix in ['insert', 'update', 'delete']:
+                schema_editor.execute(f'DROP TRIGGER IF EXISTS {table}_fts_{suffix}')
+            schema_editor.execute(f'DROP TABLE IF EXISTS {table}_fts')
+    elif vendor == 'postgresql':
+        schema_editor.execute('DROP TRIGGER IF EXISTS universities_fts_rename ON universities')
+        schema_editor.execute('DROP FUNCTION IF EXISTS universities_fts_rename()')
+        for table in INDEXES:
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS {table}_fts_sync ON {table}')
+            schema_editor.execute(f'DROP FUNCTION IF EXISTS {table}_fts_sync()')
+            schema_editor.execute(f'DROP TABLE IF EXISTS {table}_fts')
+        schema_editor.execute(f'DROP TEXT SEARCH CONFIGURATION IF EXISTS {PG_CONFIG}')
+
+
+def search(queryset, text):
+    """
+    Filtra el queryset por `text` y lo ordena por relevancia.
+
+    Cada palabra se busca como prefijo y todas deben aparecer, p. ej.
+    "educacion sup" encuentra "Educación Superior".
+    """
+    terms = get_terms(text)
+    if not terms:
+        return queryset
+
+    table = queryset.model._meta.db_table
+    fts = f'{table}_fts'
+    vendor = connections[queryset.db].vendor
+
+    # La unión con la tabla de índice requiere extra(): no hay un modelo para
+    # la tabla virtual y la relevancia debe calcularse en la misma consulta.
+    if vendor == 'sqlite':
+        weights = ', '.join(str(weight) for name, weight, expression in INDEXES[table]['columns'])
+        match = ' '.join('"{}"*'.format(term.replace('"', '""')) for term in terms)
+        return queryset.extra(
+            tables=[fts],
+            where=[f'{fts}.rowid = {table}.id', f'{fts} MATCH %s'],
+            params=[match],
+            select={'search_rank': f'bm25({fts}, {weights})'},
+            order_by=['search_rank', 'id'],
+        )
+
+    if vendor == 'postgresql':
+        tsquery = ' & '.join(f'{term}:*' for term in terms)
+        return queryset.extra(
+            tables=[fts],
+            where=[f'{fts}.id = {table}.id', f"{fts}.document @@ to_tsquery('{PG_CONFIG}', %s)"],
+            params=[tsquery],
+            select={'search_rank': f"ts_rank({fts}.document, to_tsquery('{PG_CONFIG}', %s))"},
+            select_params=[tsquery],
+            order_by=['-search_rank', 'id'],
+        )
+
+    for term in terms:
+        condition = Q()
+        for field in INDEXES[table]['fallback']:
+            condition |= Q(**{f'{field}__icontains': term})
+        queryset = queryset.filter(condition)
+    return queryset
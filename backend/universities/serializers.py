@@ -1,8 +1,15 @@
 from rest_framework import serializers
+from ascendya.serializers import SparseFieldsMixin
 from .models import University, Program, Scholarship
 
 
-class ScholarshipSerializer(serializers.ModelSerializer):
+def count_related(university, related_name):
+    # Usar el conteo anotado por el queryset cuando está disponible
+    count = getattr(university, f'{related_name}_count', None)
+    return getattr(university, related_name).count() if count is None else count
+
+
+class ScholarshipSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Serializer para las becas
     """
@@ -16,7 +23,7 @@ class ScholarshipSerializer(serializers.ModelSerializer):
         ]
 
 
-class ProgramSerializer(serializers.ModelSerializer):
+class ProgramSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Serializer para los programas académicos
     """
@@ -32,14 +39,14 @@ class ProgramSerializer(serializers.ModelSerializer):
         ]
 
 
-class UniversitySerializer(serializers.ModelSerializer):
+class UniversitySerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Serializer para las universidades con programas y becas
     """
     programs = ProgramSerializer(many=True, read_only=True)
     scholarships = ScholarshipSerializer(many=True, read_only=True)
-    programs_count = serializers.IntegerField(source='programs.count', read_only=True)
-    scholarships_count = serializers.IntegerField(source='scholarships.count', read_only=True)
+    programs_count = serializers.SerializerMethodField()
+    scholarships_count = serializers.SerializerMethodField()
     
     class Meta:
         model = University
@@ -48,14 +55,24 @@ class UniversitySerializer(serializers.ModelSerializer):
             'programs_count', 'scholarships_count',
             'programs', 'scholarships', 'created_at'
         ]
+        # Conteos anotados por UniversityQuerySet.for_listing()
+        sparse_sources = {
+            'programs_count': ['programs_count'], 'scholarships_count': ['scholarships_count']
+        }
+    
+    def get_programs_count(self, obj):
+        return count_related(obj, 'programs')
+    
+    def get_scholarships_count(self, obj):
+        return count_related(obj, 'scholarships')
 
 
-class UniversityListSerializer(serializers.ModelSerializer):
+class UniversityListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Serializer simplificado para listar universidades
     """
-    programs_count = serializers.IntegerField(source='programs.count', read_only=True)
-    scholarships_count = serializers.IntegerField(source='scholarships.count', read_only=True)
+    programs_count = serializers.SerializerMethodField()
+    scholarships_count = serializers.SerializerMethodField()
     
     class Meta:
         model = University
@@ -63,9 +80,19 @@ class UniversityListSerializer(serializers.ModelSerializer):
             'id', 'nombre', 'estado', 'tipo', 'descripcion',
             'programs_count', 'scholarships_count', 'created_at'
         ]
+        # Conteos anotados por UniversityQuerySet.for_listing()
+        sparse_sources = {
+            'programs_count': ['programs_count'], 'scholarships_count': ['scholarships_count']
+        }
+    
+    def get_programs_count(self, obj):
+        return count_related(obj, 'programs')
+    
+    def get_scholarships_count(self, obj):
+        return count_related(obj, 'scholarships')
 
 
-class ProgramListSerializer(serializers.ModelSerializer):
+class ProgramListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Serializer simplificado para listar programas
     """
@@ -81,7 +108,7 @@ class ProgramListSerializer(serializers.ModelSerializer):
         ]
 
 
-class ScholarshipListSerializer(serializers.ModelSerializer):
+class ScholarshipListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Serializer simplificado para listar becas
     """
@@ -0,0 +1,31 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .caching import invalidate_detail
+from .models import University, Program, Scholarship
+
+
+@receiver([post_save, post_delete], sender=University)
+def invalidate_university(sender, instance, **kwargs):
+    invalidate_detail(instance.pk)
+
+
+@receiver(pre_save, sender=Program)
+@receiver(pre_save, sender=Scholarship)
+def remember_university(sender, instance, raw=False, **kwargs):
+    # Si el registro cambia de universidad también hay que invalidar la anterior
+    if instance.pk and not raw:
+        instance.previous_universidad_id = (
+            sender.objects.filter(pk=instance.pk)
+            .values_list('universidad_id', flat=True)
+            .first()
+        )
+
+
+@receiver([post_save, post_delete], sender=Program)
+@receiver([post_save, post_delete], sender=Scholarship)
+def invalidate_related_university(sender, instance, **kwargs):
+    invalidate_detail(instance.universidad_id)
+    previous = getattr(instance, 'previous_universidad_id', None)
+    if previous != instance.universidad_id:
+        invalidate_detail(previous)
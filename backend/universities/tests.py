@@ -1,3 +1,155 @@
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from .models import University, Program, Scholarship
+
+
+class SearchIndexTests(TestCase):
+    """
+    Verifica la búsqueda de texto completo y la sincronización del índice
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.unam = University.objects.create(
+            nombre='Universidad Nacional', estado='Ciudad de México', tipo='publica',
+            descripcion='Institución con licenciaturas en ingeniería'
+        )
+        cls.upn = University.objects.create(
+            nombre='Universidad Pedagógica de Educación', estado='Jalisco', tipo='publica',
+            descripcion='Formación docente'
+        )
+        cls.tec = University.objects.create(
+            nombre='Instituto Tecnológico', estado='Nuevo León', tipo='privada',
+            descripcion='Programas de educación continua'
+        )
+        cls.program = Program.objects.create(
+            universidad=cls.unam, nombre='Ingeniería en Computación', area='Ingeniería'
+        )
+        Program.objects.bulk_create([
+            Program(universidad=cls.tec, nombre='Administración', area='Negocios'),
+        ])
+        cls.scholarship = Scholarship.objects.create(
+            universidad=cls.upn, nombre='Beca de Excelencia', tipo='academica',
+            requisitos='Promedio mínimo de 9 en bachillerato'
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def search(self, url, text):
+        response = self.client.get(url, {'search': text})
+        self.assertEqual(response.status_code, 200)
+        return [item['nombre'] for item in response.data['results']]
+
+    def test_accent_insensitive_and_ranked(self):
+        # La coincidencia en el nombre pesa más que en la descripción
+        names = self.search('/api/universities/search-universities/', 'educacion')
+        self.assertEqual(names, ['Universidad Pedagógica de Educación', 'Instituto Tecnológico'])
+
+    def test_prefix_terms_must_all_match(self):
+        names = self.search('/api/universities/search-universities/', 'univ nacio')
+        self.assertEqual(names, ['Universidad Nacional'])
+
+    def test_programs_match_university_name(self):
+        names = self.search('/api/universities/search-programs/', 'tecnologico')
+        self.assertEqual(names, ['Administración'])
+
+    def test_scholarships_match_requisitos(self):
+        names = self.search('/api/universities/search-scholarships/', 'bachillerato')
+        self.assertEqual(names, ['Beca de Excelencia'])
+
+    def test_index_follows_updates_and_deletes(self):
+        self.unam.nombre = 'Universidad Autónoma'
+        self.unam.save()
+        self.assertEqual(list(University.objects.search('autonoma')), [self.unam])
+        self.assertEqual(list(Program.objects.search('autonoma')), [self.program])
+        self.assertFalse(Program.objects.search('nacional').exists())
+
+        Scholarship.objects.filter(pk=self.scholarship.pk).update(requisitos='Carta de motivos')
+        self.assertFalse(Scholarship.objects.search('bachillerato').exists())
+
+        self.unam.delete()
+        self.assertFalse(University.objects.search('autonoma').exists())
+        self.assertFalse(Program.objects.search('computacion').exists())
+
+
+class UniversityDetailCacheTests(TestCase):
+    """
+    Verifica la caché del detalle de universidades y su invalidación
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.university = University.objects.create(
+            nombre='Universidad de Guadalajara', estado='Jalisco', tipo='publica',
+            descripcion='Red universitaria'
+        )
+        cls.other = University.objects.create(
+            nombre='Universidad de Colima', estado='Colima', tipo='publica',
+            descripcion='Universidad estatal'
+        )
+        cls.program = Program.objects.create(
+            universidad=cls.university, nombre='Medicina', area='Salud'
+        )
+        Scholarship.objects.create(
+            universidad=cls.university, nombre='Beca Deportiva', tipo='deportiva',
+            requisitos='Pertenecer a un equipo'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.url = f'/api/universities/universities/{self.university.pk}/'
+
+    def test_second_request_served_from_cache(self):
+        with self.assertNumQueries(3):
+            first = self.client.get(self.url)
+        with self.assertNumQueries(0):
+            second = self.client.get(self.url)
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(first['ETag'], second['ETag'])
+        self.assertIn('Last-Modified', second)
+
+    def test_conditional_get_returns_not_modified(self):
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_related_changes_invalidate(self):
+        etag = self.client.get(self.url)['ETag']
+        self.program.nombre = 'Medicina y Cirugía'
+        self.program.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['programs'][0]['nombre'], 'Medicina y Cirugía')
+
+        Scholarship.objects.get(universidad=self.university).delete()
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['scholarships_count'], 0)
+
+    def test_moving_program_invalidates_both_universities(self):
+        other_url = f'/api/universities/universities/{self.other.pk}/'
+        self.client.get(self.url)
+        self.client.get(other_url)
+        self.program.universidad = self.other
+        self.program.save()
+        self.assertEqual(self.client.get(self.url).data['programs_count'], 0)
+        self.assertEqual(self.client.get(other_url).data['programs_count'], 1)
+
+    def test_sparse_fields_bypass_cache(self):
+        self.client.get(self.url)
+        response = self.client.get(self.url, {'fields': 'nombre,programs.nombre'})
+        self.assertEqual(response.data, {
+            'nombre': 'Universidad de Guadalajara', 'programs': [{'nombre': 'Medicina'}]
+        })
+        self.assertEqual(self.client.get(self.url).data['programs_count'], 1)
+
+    def test_sparse_list_skips_counts(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get('/api/universities/universities/', {'fields': 'id,nombre'})
+        self.assertEqual(list(response.data['results'][0]), ['id', 'nombre'])
+        # La primera consulta es la del ETag
+        self.assertFalse(any('programs' in query['sql'] for query in context.captured_queries[1:]))
@@ -13,6 +13,11 @@ urlpatterns = [
     path('search-programs/', views.SearchProgramsView.as_view(), name='search-programs'),
     path('search-scholarships/', views.SearchScholarshipsView.as_view(), name='search-scholarships'),
     
+    # Variantes async de las búsquedas (servidor ASGI)
+    path('async/search-universities/', views.AsyncSearchUniversitiesView.as_view(), name='async-search-universities'),
+    path('async/search-programs/', views.AsyncSearchProgramsView.as_view(), name='async-search-programs'),
+    path('async/search-scholarships/', views.AsyncSearchScholarshipsView.as_view(), name='async-search-scholarships'),
+    
     # Rutas para filtros específicos
     path('programs-by-area/', views.ProgramsByAreaView.as_view(), name='programs-by-area'),
     path('scholarships-by-type/', views.ScholarshipsByTypeView.as_view(), name='scholarships-by-type'),
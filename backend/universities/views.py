@@ -2,7 +2,13 @@ from rest_framework import generics, viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
-from django.db.models import Q
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from ascendya.async_views import AsyncListView
+from ascendya.mixins import ConditionalGetMixin, SparseQuerysetMixin, ValuesListMixin
+from ascendya.serializers import requested_fields
+from users.authentication import STATELESS_READ_AUTHENTICATION
+from . import caching
 from .models import University, Program, Scholarship
 from .serializers import (
     UniversitySerializer, ProgramSerializer, ScholarshipSerializer,
@@ -10,25 +16,64 @@ from .serializers import (
 )
 
 
-class UniversityViewSet(viewsets.ModelViewSet):
+def listing_counts(view):
+    # Conteos que se van a enviar, para anotar solo esos
+    return [name for name in ('programs', 'scholarships') if view.wants_field(f'{name}_count')]
+
+
+class UniversityViewSet(
+    SparseQuerysetMixin, ConditionalGetMixin, ValuesListMixin, viewsets.ModelViewSet
+):
     """
     ViewSet para el manejo de universidades
     """
-    queryset = University.objects.all()
+    queryset = University.objects.for_listing()
     permission_classes = [IsAuthenticatedOrReadOnly]
+    authentication_classes = STATELESS_READ_AUTHENTICATION
+    etag_related = ['programs', 'scholarships']
+    
+    def get_queryset(self):
+        queryset = University.objects.for_listing(listing_counts(self))
+        if self.action != 'list':
+            queryset = queryset.prefetch_related('programs', 'scholarships')
+        return queryset
     
     def get_serializer_class(self):
         if self.action == 'list':
             return UniversityListSerializer
         return UniversitySerializer
+    
+    def retrieve(self, request, *args, **kwargs):
+        # El detalle se sirve desde la caché mientras no cambie la universidad,
+        # sus programas o sus becas (ver caching.py y signals.py)
+        if requested_fields(request) is not None:
+            # Con campos dispersos el detalle se arma sin la caché
+            return super().retrieve(request, *args, **kwargs)
+        pk = kwargs[self.lookup_url_kwarg or self.lookup_field]
+        entry = caching.get_detail(pk)
+        if entry is None:
+            instance = self.get_object()
+            entry = caching.set_detail(instance, self.get_serializer(instance).data)
+        
+        response = Response(entry['data'])
+        response['ETag'] = entry['etag']
+        response['Last-Modified'] = http_date(entry['last_modified'])
+        return get_conditional_response(
+            request, etag=entry['etag'], last_modified=entry['last_modified'],
+            response=response
+        )
 
 
-class ProgramViewSet(viewsets.ModelViewSet):
+class ProgramViewSet(
+    SparseQuerysetMixin, ConditionalGetMixin, ValuesListMixin, viewsets.ModelViewSet
+):
     """
     ViewSet para el manejo de programas académicos
     """
-    queryset = Program.objects.all()
+    queryset = Program.objects.for_listing()
     permission_classes = [IsAuthenticatedOrReadOnly]
+    authentication_classes = STATELESS_READ_AUTHENTICATION
+    etag_related = ['universidad']
     
     def get_serializer_class(self):
         if self.action == 'list':
@@ -36,12 +81,16 @@ class ProgramViewSet(viewsets.ModelViewSet):
         return ProgramSerializer
 
 
-class ScholarshipViewSet(viewsets.ModelViewSet):
+class ScholarshipViewSet(
+    SparseQuerysetMixin, ConditionalGetMixin, ValuesListMixin, viewsets.ModelViewSet
+):
     """
     ViewSet para el manejo de becas
     """
-    queryset = Scholarship.objects.all()
+    queryset = Scholarship.objects.for_listing()
     permission_classes = [IsAuthenticatedOrReadOnly]
+    authentication_classes = STATELESS_READ_AUTHENTICATION
+    etag_related = ['universidad']
     
     def get_serializer_class(self):
         if self.action == 'list':
@@ -49,23 +98,22 @@ class ScholarshipViewSet(viewsets.ModelViewSet):
         return ScholarshipSerializer
 
 
-class SearchUniversitiesView(generics.ListAPIView):
+class SearchUniversitiesView(SparseQuerysetMixin, ValuesListMixin, generics.ListAPIView):
     """
     Vista para buscar universidades por nombre, estado o tipo
     """
     serializer_class = UniversityListSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    authentication_classes = STATELESS_READ_AUTHENTICATION
     
     def get_queryset(self):
-        queryset = University.objects.all()
+        queryset = University.objects.for_listing(listing_counts(self))
         search = self.request.query_params.get('search', None)
         estado = self.request.query_params.get('estado', None)
         tipo = self.request.query_params.get('tipo', None)
         
         if search:
-            queryset = queryset.filter(
-                Q(nombre__icontains=search) | Q(descripcion__icontains=search)
-            )
+            queryset = queryset.search(search)
         
         if estado:
             queryset = queryset.filter(estado__icontains=estado)
@@ -76,25 +124,23 @@ class SearchUniversitiesView(generics.ListAPIView):
         return queryset
 
 
-class SearchProgramsView(generics.ListAPIView):
+class SearchProgramsView(SparseQuerysetMixin, ValuesListMixin, generics.ListAPIView):
     """
     Vista para buscar programas por nombre, área o universidad
     """
     serializer_class = ProgramListSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    authentication_classes = STATELESS_READ_AUTHENTICATION
     
     def get_queryset(self):
-        queryset = Program.objects.all()
+        queryset = Program.objects.for_listing()
         search = self.request.query_params.get('search', None)
         area = self.request.query_params.get('area', None)
         universidad = self.request.query_params.get('universidad', None)
         beca_disponible = self.request.query_params.get('beca_disponible', None)
         
         if search:
-            queryset = queryset.filter(
-                Q(nombre__icontains=search) | 
-                Q(universidad__nombre__icontains=search)
-            )
+            queryset = queryset.search(search)
         
         if area:
             queryset = queryset.filter(area__icontains=area)
@@ -108,25 +154,22 @@ class SearchProgramsView(generics.ListAPIView):
         return queryset
 
 
-class SearchScholarshipsView(generics.ListAPIView):
+class SearchScholarshipsView(SparseQuerysetMixin, ValuesListMixin, generics.ListAPIView):
     """
     Vista para buscar becas por nombre, tipo o universidad
     """
     serializer_class = ScholarshipListSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    authentication_classes = STATELESS_READ_AUTHENTICATION
     
     def get_queryset(self):
-        queryset = Scholarship.objects.all()
+        queryset = Scholarship.objects.for_listing()
         search = self.request.query_params.get('search', None)
         tipo = self.request.query_params.get('tipo', None)
         universidad = self.request.query_params.get('universidad', None)
         
         if search:
-            queryset = queryset.filter(
-                Q(nombre__icontains=search) | 
-                Q(requisitos__icontains=search) |
-                Q(universidad__nombre__icontains=search)
-            )
+            queryset = queryset.search(search)
         
         if tipo:
             queryset = queryset.filter(tipo=tipo)
@@ -137,29 +180,47 @@ class SearchScholarshipsView(generics.ListAPIView):
         return queryset
 
 
-class ProgramsByAreaView(generics.ListAPIView):
+class ProgramsByAreaView(SparseQuerysetMixin, ValuesListMixin, generics.ListAPIView):
     """
     Vista para obtener programas agrupados por área
     """
     serializer_class = ProgramListSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    authentication_classes = STATELESS_READ_AUTHENTICATION
     
     def get_queryset(self):
+        queryset = Program.objects.for_listing()
         area = self.request.query_params.get('area', None)
         if area:
-            return Program.objects.filter(area__icontains=area)
-        return Program.objects.all()
+            return queryset.filter(area__icontains=area)
+        return queryset
 
 
-class ScholarshipsByTypeView(generics.ListAPIView):
+class ScholarshipsByTypeView(SparseQuerysetMixin, ValuesListMixin, generics.ListAPIView):
     """
     Vista para obtener becas agrupadas por tipo
     """
     serializer_class = ScholarshipListSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    authentication_classes = STATELESS_READ_AUTHENTICATION
     
     def get_queryset(self):
+        queryset = Scholarship.objects.for_listing()
         tipo = self.request.query_params.get('tipo', None)
         if tipo:
-            return Scholarship.objects.filter(tipo=tipo)
-        return Scholarship.objects.all()
+            return queryset.filter(tipo=tipo)
+        return queryset
+
+
+# Variantes async (ASGI) de las búsquedas; ver ascendya/async_views.py
+
+class AsyncSearchUniversitiesView(AsyncListView):
+    view_class = SearchUniversitiesView
+
+
+class AsyncSearchProgramsView(AsyncListView):
+    view_class = SearchProgramsView
+
+
+class AsyncSearchScholarshipsView(AsyncListView):
+    view_class = SearchScholarshipsView
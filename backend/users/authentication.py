@@ -0,0 +1,91 @@
+from asgiref.sync import sync_to_async
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework.authentication import SessionAuthentication
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import User
+
+
+# Claims que, además del id, se cargan en el usuario de las lecturas
+CLAIM_FIELDS = ['is_staff']
+
+
+def user_from_claims(token):
+    """
+    Usuario armado con el id y los CLAIM_FIELDS del token, sin consultar la
+    base de datos; el resto de las columnas quedan diferidas. Regresa None si
+    al token le falta algún claim (tokens emitidos antes de incluirlos).
+    """
+    claims = {api_settings.USER_ID_FIELD: token.get(api_settings.USER_ID_CLAIM)}
+    for name in CLAIM_FIELDS:
+        if name not in token:
+            return None
+        claims[name] = token[name]
+    if claims[api_settings.USER_ID_FIELD] is None:
+        return None
+    fields = [field for field in User._meta.concrete_fields if field.attname in claims]
+    return User.from_db(
+        DEFAULT_DB_ALIAS, [field.attname for field in fields],
+        [claims[field.attname] for field in fields]
+    )
+
+
+class AsyncJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication con aauthenticate() para las vistas async (ver
+    ascendya/async_views.py); la consulta del usuario corre en un hilo
+    """
+    async def aauthenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        return await sync_to_async(self.get_user)(validated_token)
+
+
+class StatelessReadJWTAuthentication(AsyncJWTAuthentication):
+    """
+    JWTAuthentication que en GET, HEAD y OPTIONS no consulta la tabla de
+    usuarios: el usuario se arma con los claims del token ya verificado.
+
+    Es opcional: la usan las vistas de lectura con
+    `authentication_classes = STATELESS_READ_AUTHENTICATION`. Las escrituras,
+    y los tokens sin los claims necesarios, cargan el usuario de la base de
+    datos como JWTAuthentication. Mientras el token de acceso no expire, las
+    lecturas de esas vistas no ven una cuenta desactivada ni un cambio de
+    is_staff.
+    """
+    def authenticate(self, request):
+        self.stateless = request.method in SAFE_METHODS
+        return super().authenticate(request)
+
+    async def aauthenticate(self, request):
+        self.stateless = request.method in SAFE_METHODS
+        return await super().aauthenticate(request)
+
+    def get_user(self, validated_token):
+        if self.stateless:
+            user = user_from_claims(validated_token)
+            if user is not None:
+                return user
+        return super().get_user(validated_token)
+
+    async def aget_user(self, validated_token):
+        # Sin consultas no hace falta el hilo
+        if self.stateless:
+            user = user_from_claims(validated_token)
+            if user is not None:
+                return user
+        return await super().aget_user(validated_token)
+
+
+# Autenticación de las vistas de solo lectura que no consultan al usuario
+STATELESS_READ_AUTHENTICATION = [StatelessReadJWTAuthentication, SessionAuthentication]
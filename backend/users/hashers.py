@@ -0,0 +1,39 @@
+"""
+Hashers de contraseñas con costo configurable desde settings.
+
+Conservan el nombre de algoritmo de los hashers de Django, así que verifican
+los hashes existentes. Cuando el hasher preferido o su costo cambian, Django
+vuelve a hashear la contraseña en el siguiente login exitoso (ModelBackend
+llama a check_password con un setter que guarda el hash nuevo).
+"""
+
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    """
+    PBKDF2-SHA256 con las iteraciones de PASSWORD_PBKDF2_ITERATIONS (por
+    defecto las de Django)
+    """
+    @property
+    def iterations(self):
+        return settings.PASSWORD_PBKDF2_ITERATIONS or hashers.PBKDF2PasswordHasher.iterations
+
+
+class Argon2PasswordHasher(hashers.Argon2PasswordHasher):
+    """
+    Argon2id con el costo de ARGON2_TIME_COST, ARGON2_MEMORY_COST (KiB) y
+    ARGON2_PARALLELISM; requiere argon2-cffi
+    """
+    @property
+    def time_cost(self):
+        return settings.ARGON2_TIME_COST or hashers.Argon2PasswordHasher.time_cost
+
+    @property
+    def memory_cost(self):
+        return settings.ARGON2_MEMORY_COST or hashers.Argon2PasswordHasher.memory_cost
+
+    @property
+    def parallelism(self):
+        return settings.ARGON2_PARALLELISM or hashers.Argon2PasswordHasher.parallelism
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from users import tokens
+
+
+class Command(BaseCommand):
+    help = 'Elimina los refresh tokens expirados de la lista de tokens y de la lista negra'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Tokens eliminados por consulta'
+        )
+
+    def handle(self, *args, **options):
+        pruned = tokens.prune(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Tokens expirados eliminados: {pruned}'))
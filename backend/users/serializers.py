@@ -1,7 +1,14 @@
 from rest_framework import serializers
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer, TokenRefreshSerializer, TokenVerifySerializer
+)
+from rest_framework_simplejwt.tokens import UntypedToken
+from rest_framework_simplejwt.settings import api_settings
 from django.contrib.auth import authenticate
+from django.contrib.auth.models import update_last_login
+from ascendya.serializers import SparseFieldsMixin
 from .models import User
+from .tokens import CachedRefreshToken, is_blacklisted
 
 
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
@@ -9,6 +16,7 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     Serializer personalizado para JWT que incluye datos adicionales del usuario
     """
     username_field = 'email'  # Usar email en lugar de username
+    token_class = CachedRefreshToken
     
     @classmethod
     def get_token(cls, user):
@@ -22,6 +30,8 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
         token['full_name'] = user.get_full_name()
         token['ultimo_grado_estudios'] = user.ultimo_grado_estudios
         token['estado'] = user.estado
+        # Lo usa StatelessReadJWTAuthentication para no consultar al usuario
+        token['is_staff'] = user.is_staff
         
         return token
     
@@ -40,11 +50,36 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
         else:
             raise serializers.ValidationError('Email y contraseña son requeridos')
         
-        data = super().validate(attrs)
-        return data
+        # Lo mismo que TokenObtainPairSerializer.validate, sin volver a
+        # autenticar (y a calcular el hash de la contraseña)
+        self.user = user
+        refresh = self.get_token(user)
+        if api_settings.UPDATE_LAST_LOGIN:
+            update_last_login(None, user)
+        return {'refresh': str(refresh), 'access': str(refresh.access_token)}
 
 
-class UserSerializer(serializers.ModelSerializer):
+class CachedTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Refresh con rotación que consulta y registra la lista negra a través de
+    la caché
+    """
+    token_class = CachedRefreshToken
+
+
+class CachedTokenVerifySerializer(TokenVerifySerializer):
+    """
+    Verificación de tokens que consulta la lista negra a través de la caché
+    """
+    def validate(self, attrs):
+        token = UntypedToken(attrs['token'])
+        jti = token.get(api_settings.JTI_CLAIM)
+        if jti is not None and is_blacklisted(jti, token['exp']):
+            raise serializers.ValidationError('Token is blacklisted')
+        return {}
+
+
+class UserSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Serializer para el modelo User
     """
@@ -64,11 +99,8 @@ class UserSerializer(serializers.ModelSerializer):
         }
     
     def create(self, validated_data):
-        password = validated_data.pop('password')
-        user = User.objects.create_user(**validated_data)
-        user.set_password(password)
-        user.save()
-        return user
+        # create_user calcula el hash una vez y guarda con un solo INSERT
+        return User.objects.create_user(**validated_data)
     
     def update(self, instance, validated_data):
         password = validated_data.pop('password', None)
@@ -121,11 +153,8 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         return attrs
     
     def create(self, validated_data):
-        password = validated_data.pop('password')
-        user = User.objects.create_user(**validated_data)
-        user.set_password(password)
-        user.save()
-        return user
+        # create_user calcula el hash una vez y guarda con un solo INSERT
+        return User.objects.create_user(**validated_data)
 
 
 class JWTLoginSerializer(serializers.Serializer):
@@ -152,7 +181,7 @@ class JWTLoginSerializer(serializers.Serializer):
             raise serializers.ValidationError('Email y contraseña son requeridos')
 
 
-class UserProfileSerializer(serializers.ModelSerializer):
+class UserProfileSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Serializer para el perfil público del usuario
     """
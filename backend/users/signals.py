@@ -0,0 +1,13 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+from .tokens import remember_blacklisted
+
+
+@receiver(post_save, sender=BlacklistedToken)
+def token_blacklisted(sender, instance, raw=False, **kwargs):
+    # Reemplaza la entrada negativa de la caché (p. ej. al revocar desde el admin)
+    if raw:
+        return
+    remember_blacklisted(instance.token.jti, instance.token.expires_at.timestamp())
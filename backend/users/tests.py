@@ -1,3 +1,262 @@
-from django.test import TestCase
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.contrib.auth.hashers import get_hasher
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import AsyncClient, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt import serializers as jwt_serializers
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .models import User
+from .serializers import CustomTokenObtainPairSerializer
+from .throttles import LoginEmailThrottle, LoginIPThrottle
+
+
+class StatelessReadAuthenticationTests(TestCase):
+    """
+    Verifica que las lecturas con JWT no consulten la tabla de usuarios y que
+    las escrituras y los tokens sin claims sí la consulten
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='ana', email='ana@example.com', password='contraseña-segura',
+            nombres='Ana', apellidos='López', estado='Jalisco'
+        )
+        cls.staff = User.objects.create_user(
+            username='staff', email='staff@example.com', password='contraseña-segura',
+            nombres='Staff', apellidos='Ascendya', is_staff=True
+        )
+
+    def client_for(self, token):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        return client
+
+    def login_token(self, user):
+        return CustomTokenObtainPairSerializer.get_token(user).access_token
+
+    def user_queries(self, client, method, url, **kwargs):
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(client, method)(url, **kwargs)
+        self.assertLess(response.status_code, 300)
+        return [query['sql'] for query in queries if 'FROM "users"' in query['sql']]
+
+    def test_reads_use_token_claims(self):
+        client = self.client_for(self.login_token(self.user))
+        self.assertEqual(self.user_queries(client, 'get', '/api/learning/my-courses/'), [])
+
+        # Los claims incluyen is_staff, así que el staff ve todos los usuarios
+        staff_client = self.client_for(self.login_token(self.staff))
+        self.assertEqual(staff_client.get('/api/auth/users/').data['count'], 2)
+        self.assertEqual(client.get('/api/auth/users/').data['count'], 1)
+
+    def test_writes_and_old_tokens_load_user(self):
+        client = self.client_for(self.login_token(self.user))
+        self.assertEqual(len(self.user_queries(
+            client, 'patch', '/api/auth/profile/', data={'nombres': 'Ana María'}, format='json'
+        )), 1)
+        # Tokens emitidos sin el claim is_staff
+        old_client = self.client_for(RefreshToken.for_user(self.user).access_token)
+        self.assertEqual(len(self.user_queries(old_client, 'get', '/api/learning/my-courses/')), 1)
+
+    def test_only_opted_in_views_skip_user_lookup(self):
+        client = self.client_for(self.login_token(self.user))
+        self.assertEqual(len(self.user_queries(
+            client, 'get', '/api/learning/user-learning-paths/'
+        )), 1)
+
+        # Una cuenta desactivada pierde el acceso en las vistas por omisión
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertEqual(client.get('/api/learning/user-learning-paths/').status_code, 401)
+        self.assertEqual(client.get('/api/auth/profile/').status_code, 401)
+        self.assertEqual(client.get('/api/learning/my-courses/').status_code, 200)
+
+    async def test_async_writes_load_user(self):
+        token = await sync_to_async(self.login_token)(self.user)
+        await User.objects.filter(pk=self.user.pk).aupdate(is_active=False)
+        response = await AsyncClient().post(
+            '/api/learning/async/assistant/chat/', {'message': 'Hola'},
+            content_type='application/json', headers={'Authorization': f'Bearer {token}'}
+        )
+        self.assertEqual(response.status_code, 401)
+
+    def test_profile_is_read_from_database(self):
+        client = self.client_for(self.login_token(self.user))
+        User.objects.filter(pk=self.user.pk).update(nombres='Ana María')
+        response = client.get('/api/auth/profile/')
+        self.assertEqual(response.data['nombres'], 'Ana María')
+        self.assertEqual(response.data['date_joined'][:10], str(self.user.date_joined.date()))
+
+    def test_login_tokens_include_claims(self):
+        response = APIClient().post(
+            '/api/auth/login/',
+            {'email': 'staff@example.com', 'password': 'contraseña-segura'}, format='json'
+        )
+        client = self.client_for(response.data['access'])
+        self.assertEqual(self.user_queries(client, 'get', '/api/learning/my-courses/'), [])
+        self.assertEqual(client.get('/api/auth/users/').data['count'], 2)
+
+
+class TokenBlacklistTests(TestCase):
+    """
+    Verifica la lista negra con caché y la limpieza de tokens expirados
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='ana', email='ana@example.com', password='contraseña-segura',
+            nombres='Ana', apellidos='López'
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def refresh(self, token):
+        return APIClient().post('/api/auth/token/refresh/', {'refresh': str(token)}, format='json')
+
+    def test_rotated_token_is_rejected_from_cache(self):
+        token = CustomTokenObtainPairSerializer.get_token(self.user)
+        response = self.refresh(token)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.refresh(response.data['refresh']).status_code, 200)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.refresh(token)
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(len(queries), 0)
+
+        # Sin la caché la base de datos sigue rechazando el token
+        cache.clear()
+        self.assertEqual(self.refresh(token).status_code, 401)
+        self.assertEqual(
+            BlacklistedToken.objects.filter(token__jti=token['jti']).count(), 1
+        )
+
+    def test_valid_token_is_accepted_from_cache(self):
+        token = CustomTokenObtainPairSerializer.get_token(self.user)
+        # Sin rotación el mismo refresh token se puede usar varias veces;
+        # simplejwt lee la configuración en el módulo de sus serializers
+        with mock.patch.object(jwt_serializers.api_settings, 'ROTATE_REFRESH_TOKENS', False):
+            self.assertEqual(self.refresh(token).status_code, 200)
+            with CaptureQueriesContext(connection) as queries:
+                response = self.refresh(token)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(queries), 0)
+
+        # Revocarlo fuera de CachedRefreshToken reemplaza la entrada de la caché
+        BlacklistedToken.objects.create(token=OutstandingToken.objects.get(jti=token['jti']))
+        self.assertEqual(self.refresh(token).status_code, 401)
+
+    def test_logout_blacklists_token(self):
+        token = CustomTokenObtainPairSerializer.get_token(self.user)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token.access_token}')
+        response = client.post('/api/auth/logout/', {'refresh': str(token)}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.refresh(token).status_code, 401)
+        response = APIClient().post(
+            '/api/token/verify/', {'token': str(token)}, format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_prune_removes_expired_tokens(self):
+        expired = [CustomTokenObtainPairSerializer.get_token(self.user) for _ in range(5)]
+        for token in expired[:2]:
+            token.blacklist()
+        OutstandingToken.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        current = CustomTokenObtainPairSerializer.get_token(self.user)
+        current.blacklist()
+
+        out = StringIO()
+        call_command('prune_tokens', '--batch-size', '2', stdout=out)
+        self.assertIn('Tokens expirados eliminados: 5', out.getvalue())
+        self.assertEqual(
+            list(OutstandingToken.objects.values_list('jti', flat=True)), [current['jti']]
+        )
+        self.assertEqual(BlacklistedToken.objects.count(), 1)
+
+
+class PasswordHashingTests(TestCase):
+    """
+    Verifica que registro y login calculen un solo hash y que los hashes con
+    otro costo se actualicen en el login
+    """
+    credentials = {'email': 'ana@example.com', 'password': 'contraseña-segura'}
+
+    def setUp(self):
+        cache.clear()
+
+    def count_hashes(self, method):
+        hasher_class = type(get_hasher())
+        return mock.patch.object(
+            hasher_class, method, autospec=True, side_effect=getattr(hasher_class, method)
+        )
+
+    def test_register_and_login_hash_once(self):
+        with self.count_hashes('encode') as encode:
+            response = APIClient().post('/api/auth/register/', {
+                'username': 'ana', 'nombres': 'Ana', 'apellidos': 'López',
+                'password_confirm': self.credentials['password'], **self.credentials
+            }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(encode.call_count, 1)
+        self.assertTrue(User.objects.get(email='ana@example.com').check_password('contraseña-segura'))
+
+        for url in ['/api/auth/login/', '/api/auth/login-custom/']:
+            with self.subTest(url=url), self.count_hashes('verify') as verify:
+                response = APIClient().post(url, self.credentials, format='json')
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(verify.call_count, 1)
+
+    def test_login_rehashes_with_current_cost(self):
+        with self.settings(PASSWORD_PBKDF2_ITERATIONS=1000):
+            user = User.objects.create_user(
+                username='ana', nombres='Ana', apellidos='López', **self.credentials
+            )
+        self.assertEqual(user.password.split('$')[1], '1000')
+
+        with self.settings(PASSWORD_PBKDF2_ITERATIONS=2000):
+            response = APIClient().post('/api/auth/login/', self.credentials, format='json')
+        self.assertEqual(response.status_code, 200)
+        user.refresh_from_db()
+        self.assertEqual(user.password.split('$')[1], '2000')
+
+
+class LoginThrottleTests(TestCase):
+    """
+    Verifica los límites de intentos de login por email y por IP
+    """
+    def setUp(self):
+        cache.clear()
+
+    def login(self, email, ip='10.0.0.1'):
+        return APIClient().post(
+            '/api/auth/login/', {'email': email, 'password': 'incorrecta'},
+            format='json', REMOTE_ADDR=ip
+        )
+
+    def test_limits_by_email_across_ips(self):
+        with mock.patch.dict(LoginEmailThrottle.THROTTLE_RATES, {'login_email': '3/min'}):
+            for n in range(3):
+                self.assertEqual(self.login('ana@example.com', ip=f'10.0.0.{n}').status_code, 400)
+            # Mayúsculas y espacios cuentan como el mismo email
+            response = self.login(' Ana@Example.com', ip='10.0.0.9')
+            self.assertEqual(response.status_code, 429)
+            self.assertIn('Retry-After', response)
+            self.assertEqual(self.login('luis@example.com').status_code, 400)
+
+    def test_limits_by_ip(self):
+        with mock.patch.dict(LoginIPThrottle.THROTTLE_RATES, {'login_ip': '2/min'}):
+            self.assertEqual(self.login('a@example.com').status_code, 400)
+            self.assertEqual(self.login('b@example.com').status_code, 400)
+            self.assertEqual(self.login('c@example.com').status_code, 429)
+            self.assertEqual(self.login('c@example.com', ip='10.0.0.2').status_code, 400)
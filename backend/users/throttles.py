@@ -0,0 +1,33 @@
+import hashlib
+
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class LoginIPThrottle(SimpleRateThrottle):
+    """
+    Limita los intentos de login por IP con una ventana deslizante en caché,
+    antes de calcular ningún hash de contraseña
+    """
+    scope = 'login_ip'
+
+    def get_cache_key(self, request, view):
+        if request.method != 'POST':
+            return None
+        return self.cache_format % {'scope': self.scope, 'ident': self.get_ident(request)}
+
+
+class LoginEmailThrottle(SimpleRateThrottle):
+    """
+    Limita los intentos de login por email, aunque lleguen de varias IPs
+    """
+    scope = 'login_email'
+
+    def get_cache_key(self, request, view):
+        if request.method != 'POST' or not hasattr(request.data, 'get'):
+            return None
+        email = request.data.get('email')
+        if not isinstance(email, str) or not email.strip():
+            return None
+        # El email no se guarda en claro en la caché
+        ident = hashlib.sha256(email.strip().lower().encode()).hexdigest()
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
@@ -0,0 +1,107 @@
+"""
+Lista negra de refresh tokens con caché.
+
+Los tokens en la lista negra se guardan también en la caché hasta que
+expiran, así que reintentar un refresh token ya rotado o cerrado con logout
+se rechaza sin consultar la base de datos. Un token que no aparece en la
+caché se busca en BlacklistedToken, porque una entrada expulsada de la caché
+no debe volver válido un token revocado.
+
+Los tokens que no están en la lista negra también se recuerdan, pero solo
+JWT_BLACKLIST_MISS_TIMEOUT segundos: así una verificación o un refresh
+repetido no consultan la base de datos. Al revocar un token su entrada se
+reemplaza, ya sea desde CachedRefreshToken.blacklist() o desde la señal
+post_save de BlacklistedToken (ver users/signals.py).
+
+Las tablas de simplejwt crecen con cada login y cada rotación; los tokens
+expirados se eliminan con `python manage.py prune_tokens` (p. ej. desde cron
+una vez al día).
+"""
+
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import aware_utcnow, datetime_from_epoch
+
+
+def blacklist_key(jti):
+    return f'jwt-blacklist:{jti}'
+
+
+def remember_blacklisted(jti, exp):
+    # Después de expirar el token se rechaza por su exp, sin lista negra
+    timeout = int(exp - time.time())
+    if timeout > 0:
+        cache.set(blacklist_key(jti), True, timeout)
+
+
+def remember_not_blacklisted(jti, exp):
+    timeout = min(settings.JWT_BLACKLIST_MISS_TIMEOUT, int(exp - time.time()))
+    if timeout > 0:
+        # add y no set: si otro proceso acaba de revocar el token, su entrada gana
+        cache.add(blacklist_key(jti), False, timeout)
+
+
+def is_blacklisted(jti, exp):
+    blacklisted = cache.get(blacklist_key(jti))
+    if blacklisted is not None:
+        return blacklisted
+    if BlacklistedToken.objects.filter(token__jti=jti).exists():
+        remember_blacklisted(jti, exp)
+        return True
+    remember_not_blacklisted(jti, exp)
+    return False
+
+
+class CachedRefreshToken(RefreshToken):
+    """
+    RefreshToken que consulta y registra la lista negra a través de la caché
+    """
+    def check_blacklist(self):
+        if is_blacklisted(self.payload[api_settings.JTI_CLAIM], self.payload['exp']):
+            raise TokenError(_('Token is blacklisted'))
+
+    def blacklist(self):
+        jti = self.payload[api_settings.JTI_CLAIM]
+        exp = self.payload['exp']
+        # Primero la caché: si la escritura en la base de datos falla, el
+        # token queda rechazado de todos modos
+        remember_blacklisted(jti, exp)
+        token, _ = OutstandingToken.objects.get_or_create(
+            jti=jti,
+            defaults={'token': str(self), 'expires_at': datetime_from_epoch(exp)}
+        )
+        # Un solo INSERT; dos refresh simultáneos del mismo token no chocan
+        BlacklistedToken.objects.bulk_create(
+            [BlacklistedToken(token=token)], ignore_conflicts=True
+        )
+        return token
+
+
+def prune(batch_size=1000):
+    """
+    Elimina en lotes los tokens expirados de OutstandingToken junto con su
+    entrada en BlacklistedToken. Regresa el número de tokens eliminados.
+    """
+    now = aware_utcnow()
+    last_id = 0
+    total = 0
+    while True:
+        # expires_at no tiene índice; los tokens expirados son los de id más
+        # bajo, así que se recorre por llave primaria
+        ids = list(
+            OutstandingToken.objects.filter(pk__gt=last_id, expires_at__lte=now)
+            .order_by('pk').values_list('pk', flat=True)[:batch_size]
+        )
+        if not ids:
+            return total
+        BlacklistedToken.objects.filter(token_id__in=ids).delete()
+        OutstandingToken.objects.filter(pk__in=ids).delete()
+        last_id = ids[-1]
+        total += len(ids)
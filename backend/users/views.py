@@ -2,17 +2,19 @@ from rest_framework import generics, viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
-from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from django.contrib.auth import authenticate
+from ascendya.mixins import SparseQuerysetMixin
 from .models import User
+from .throttles import LoginEmailThrottle, LoginIPThrottle
+from .tokens import CachedRefreshToken
 from .serializers import (
     UserSerializer, UserRegistrationSerializer, 
     JWTLoginSerializer, UserProfileSerializer, CustomTokenObtainPairSerializer
 )
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(SparseQuerysetMixin, viewsets.ModelViewSet):
     """
     ViewSet para el manejo de usuarios
     """
@@ -32,6 +34,7 @@ class CustomTokenObtainPairView(TokenObtainPairView):
     Vista personalizada para obtener tokens JWT con datos adicionales del usuario
     """
     serializer_class = CustomTokenObtainPairSerializer
+    throttle_classes = [LoginIPThrottle, LoginEmailThrottle]
 
 
 class RegisterView(generics.CreateAPIView):
@@ -48,7 +51,7 @@ class RegisterView(generics.CreateAPIView):
         user = serializer.save()
         
         # Crear tokens JWT para el usuario recién registrado
-        refresh = RefreshToken.for_user(user)
+        refresh = CustomTokenObtainPairSerializer.get_token(user)
         access_token = refresh.access_token
         
         return Response({
@@ -65,6 +68,7 @@ class LoginView(generics.GenericAPIView):
     """
     serializer_class = JWTLoginSerializer
     permission_classes = [AllowAny]
+    throttle_classes = [LoginIPThrottle, LoginEmailThrottle]
     
     def post(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -73,7 +77,7 @@ class LoginView(generics.GenericAPIView):
         user = serializer.validated_data['user']
         
         # Crear tokens JWT para el usuario
-        refresh = RefreshToken.for_user(user)
+        refresh = CustomTokenObtainPairSerializer.get_token(user)
         access_token = refresh.access_token
         
         return Response({
@@ -94,7 +98,7 @@ class LogoutView(generics.GenericAPIView):
         try:
             refresh_token = request.data.get("refresh")
             if refresh_token:
-                token = RefreshToken(refresh_token)
+                token = CachedRefreshToken(refresh_token)
                 token.blacklist()
                 return Response({
                     'message': 'Logout exitoso'
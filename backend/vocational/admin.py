@@ -1,11 +1,15 @@
 from django.contrib import admin
-from .models import VocationalTest, VocationalAnswer
+from .models import VocationalTest, VocationalAnswer, VocationalQuestion, VocationalOption
 
 
 class VocationalAnswerInline(admin.TabularInline):
     model = VocationalAnswer
     extra = 0
+    fields = ['pregunta', 'respuesta']
     readonly_fields = ['pregunta', 'respuesta']
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_texts()
 
 
 @admin.register(VocationalTest)
@@ -24,7 +28,8 @@ class VocationalTestAdmin(admin.ModelAdmin):
 class VocationalAnswerAdmin(admin.ModelAdmin):
     list_display = ['test', 'pregunta_short', 'respuesta_short']
     list_filter = ['test__fecha']
-    search_fields = ['pregunta', 'respuesta']
+    search_fields = ['question__texto', 'option__texto']
+    list_select_related = ['test', 'question', 'option']
     
     def pregunta_short(self, obj):
         return obj.pregunta[:50] + "..." if len(obj.pregunta) > 50 else obj.pregunta
@@ -33,3 +38,9 @@ class VocationalAnswerAdmin(admin.ModelAdmin):
     def respuesta_short(self, obj):
         return obj.respuesta[:50] + "..." if len(obj.respuesta) > 50 else obj.respuesta
     respuesta_short.short_description = 'Respuesta'
+
+
+@admin.register(VocationalQuestion, VocationalOption)
+class TextCatalogAdmin(admin.ModelAdmin):
+    list_display = ['id', 'texto']
+    search_fields = ['texto']
@@ -0,0 +1,93 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("vocational", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="VocationalQuestion",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("texto", models.TextField()),
+                (
+                    "texto_hash",
+                    models.CharField(editable=False, max_length=40, unique=True),
+                ),
+            ],
+            options={
+                "verbose_name": "Pregunta Vocacional",
+                "verbose_name_plural": "Preguntas Vocacionales",
+                "db_table": "vocational_questions",
+            },
+        ),
+        migrations.CreateModel(
+            name="VocationalOption",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("texto", models.TextField()),
+                (
+                    "texto_hash",
+                    models.CharField(editable=False, max_length=40, unique=True),
+                ),
+            ],
+            options={
+                "verbose_name": "Opción de Respuesta",
+                "verbose_name_plural": "Opciones de Respuesta",
+                "db_table": "vocational_options",
+            },
+        ),
+        migrations.AddField(
+            model_name="vocationalanswer",
+            name="question",
+            field=models.ForeignKey(
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="answers",
+                to="vocational.vocationalquestion",
+            ),
+        ),
+        migrations.AddField(
+            model_name="vocationalanswer",
+            name="option",
+            field=models.ForeignKey(
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="answers",
+                to="vocational.vocationaloption",
+            ),
+        ),
+        # Nulos para poder revertir 0004 antes de restaurar los textos
+        migrations.AlterField(
+            model_name="vocationalanswer",
+            name="pregunta",
+            field=models.TextField(null=True),
+        ),
+        migrations.AlterField(
+            model_name="vocationalanswer",
+            name="respuesta",
+            field=models.TextField(null=True),
+        ),
+    ]
@@ -0,0 +1,55 @@
+import hashlib
+
+from django.db import migrations
+
+
+# Copia de vocational.models.normalize() y text_hash()
+def normalize(texto):
+    return texto.strip()
+
+
+def text_hash(texto):
+    return hashlib.sha1(normalize(texto).encode()).hexdigest()
+
+
+def fill_catalogs(apps, schema_editor):
+    """
+    Crea una pregunta u opción por cada texto distinto y apunta las
+    respuestas existentes a ella
+    """
+    VocationalAnswer = apps.get_model("vocational", "VocationalAnswer")
+    for field, catalog_name, fk in [
+        ("pregunta", "VocationalQuestion", "question_id"),
+        ("respuesta", "VocationalOption", "option_id"),
+    ]:
+        Catalog = apps.get_model("vocational", catalog_name)
+        ids = {}
+        for texto in VocationalAnswer.objects.values_list(field, flat=True).distinct().iterator():
+            normalized = normalize(texto)
+            if normalized not in ids:
+                ids[normalized] = Catalog.objects.create(
+                    texto=normalized, texto_hash=text_hash(normalized)
+                ).id
+            VocationalAnswer.objects.filter(**{field: texto}).update(**{fk: ids[normalized]})
+
+
+def restore_texts(apps, schema_editor):
+    VocationalAnswer = apps.get_model("vocational", "VocationalAnswer")
+    for field, catalog_name, fk in [
+        ("pregunta", "VocationalQuestion", "question_id"),
+        ("respuesta", "VocationalOption", "option_id"),
+    ]:
+        Catalog = apps.get_model("vocational", catalog_name)
+        for pk, texto in Catalog.objects.values_list("id", "texto").iterator():
+            VocationalAnswer.objects.filter(**{fk: pk}).update(**{field: texto})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("vocational", "0002_question_bank"),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_catalogs, restore_texts),
+    ]
@@ -0,0 +1,40 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("vocational", "0003_dedupe_answers"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="vocationalanswer",
+            name="pregunta",
+        ),
+        migrations.RemoveField(
+            model_name="vocationalanswer",
+            name="respuesta",
+        ),
+        migrations.AlterField(
+            model_name="vocationalanswer",
+            name="question",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="answers",
+                to="vocational.vocationalquestion",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="vocationalanswer",
+            name="option",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="answers",
+                to="vocational.vocationaloption",
+            ),
+        ),
+    ]
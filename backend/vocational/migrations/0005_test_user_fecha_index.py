@@ -0,0 +1,31 @@
+# Generated by Django 5.2.5 on 2026-10-18 07:04
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("vocational", "0004_remove_answer_texts"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # Primero el índice compuesto, que reemplaza al de la llave foránea
+        migrations.AddIndex(
+            model_name="vocationaltest",
+            index=models.Index(fields=["user", "-fecha"], name="vocational_test_user_fecha_idx"),
+        ),
+        migrations.AlterField(
+            model_name="vocationaltest",
+            name="user",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="vocational_tests",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+    ]
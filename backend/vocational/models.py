@@ -1,38 +1,167 @@
+import hashlib
+
 from django.db import models
+from django.db.models.functions import Coalesce, Concat
 from django.conf import settings
 
 
+def normalize(texto):
+    # La misma forma que usó la migración 0003 al crear el catálogo
+    return texto.strip()
+
+
+def text_hash(texto):
+    return hashlib.sha1(normalize(texto).encode()).hexdigest()
+
+
+class TextCatalogQuerySet(models.QuerySet):
+    def resolve(self, textos):
+        """
+        Regresa {texto: id} para los textos dados, creando en bloque los que
+        aún no existen en el catálogo. Textos que solo difieren en espacios
+        al inicio o al final comparten la misma fila.
+        """
+        hashes = {texto: text_hash(texto) for texto in set(textos)}
+        by_hash = {key: normalize(texto) for texto, key in hashes.items()}
+        ids = dict(self.filter(texto_hash__in=by_hash).values_list('texto_hash', 'id'))
+        missing = [
+            self.model(texto=texto, texto_hash=key)
+            for key, texto in by_hash.items() if key not in ids
+        ]
+        if missing:
+            # ignore_conflicts cubre otra petición que inserte el mismo texto a la vez
+            self.bulk_create(missing, ignore_conflicts=True)
+            ids = dict(self.filter(texto_hash__in=by_hash).values_list('texto_hash', 'id'))
+        return {texto: ids[key] for texto, key in hashes.items()}
+
+
+class TextCatalog(models.Model):
+    """
+    Texto único identificado por su hash, para que cada respuesta guarde
+    solo una llave foránea en lugar del texto completo
+    """
+    texto = models.TextField()
+    texto_hash = models.CharField(max_length=40, unique=True, editable=False)
+    
+    objects = TextCatalogQuerySet.as_manager()
+    
+    class Meta:
+        abstract = True
+    
+    def save(self, *args, **kwargs):
+        self.texto = normalize(self.texto)
+        self.texto_hash = text_hash(self.texto)
+        super().save(*args, **kwargs)
+    
+    def __str__(self):
+        return self.texto
+
+
+class VocationalTestQuerySet(models.QuerySet):
+    def with_answers(self):
+        return self.select_related('user').prefetch_related(
+            models.Prefetch('answers', queryset=VocationalAnswer.objects.with_texts())
+        )
+
+
+    def with_answers_count(self):
+        # Con una subconsulta no hay GROUP BY, que haría ignorar Meta.ordering
+        answers = (
+            VocationalAnswer.objects.filter(test=models.OuterRef('pk'))
+            .order_by().values('test').annotate(total=models.Count('id')).values('total')
+        )
+        return self.annotate(
+            answers_count=Coalesce(models.Subquery(answers), 0)
+        )
+
+    def with_user_name(self):
+        # El mismo texto que User.get_full_name(), leído con el join
+        return self.annotate(
+            user_name=Concat('user__nombres', models.Value(' '), 'user__apellidos')
+        )
+
+
+class VocationalAnswerQuerySet(models.QuerySet):
+    def with_texts(self):
+        return self.select_related('question', 'option')
+
+
 class VocationalTest(models.Model):
     """
     Modelo para los tests vocacionales realizados por los usuarios
     """
-    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='vocational_tests')
+    # Sin índice propio: vocational_test_user_fecha_idx empieza por el usuario
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='vocational_tests',
+        db_index=False
+    )
     fecha = models.DateTimeField(auto_now_add=True)
     resultado = models.CharField(max_length=255)
     puntaje = models.IntegerField()
     
+    objects = VocationalTestQuerySet.as_manager()
+    
     class Meta:
         db_table = 'vocational_tests'
         verbose_name = 'Test Vocacional'
         verbose_name_plural = 'Tests Vocacionales'
         ordering = ['-fecha']
+        indexes = [
+            models.Index(fields=['user', '-fecha'], name='vocational_test_user_fecha_idx'),
+        ]
     
     def __str__(self):
         return f"Test de {self.user.get_full_name()} - {self.resultado} ({self.puntaje})"
 
 
+class VocationalQuestion(TextCatalog):
+    """
+    Banco de preguntas de los tests vocacionales
+    """
+    class Meta:
+        db_table = 'vocational_questions'
+        verbose_name = 'Pregunta Vocacional'
+        verbose_name_plural = 'Preguntas Vocacionales'
+
+
+class VocationalOption(TextCatalog):
+    """
+    Catálogo de respuestas posibles ("Sí", "No", escalas, etc.)
+    """
+    class Meta:
+        db_table = 'vocational_options'
+        verbose_name = 'Opción de Respuesta'
+        verbose_name_plural = 'Opciones de Respuesta'
+
+
 class VocationalAnswer(models.Model):
     """
     Modelo para las respuestas individuales de cada test vocacional
     """
     test = models.ForeignKey(VocationalTest, on_delete=models.CASCADE, related_name='answers')
-    pregunta = models.TextField()
-    respuesta = models.TextField()
+    # Sin índice: ninguna consulta filtra respuestas por pregunta u opción, y
+    # cada índice extra encarece cada inserción del test
+    question = models.ForeignKey(
+        VocationalQuestion, on_delete=models.PROTECT, related_name='answers', db_index=False
+    )
+    option = models.ForeignKey(
+        VocationalOption, on_delete=models.PROTECT, related_name='answers', db_index=False
+    )
+    
+    objects = VocationalAnswerQuerySet.as_manager()
     
     class Meta:
         db_table = 'vocational_answers'
         verbose_name = 'Respuesta Vocacional'
         verbose_name_plural = 'Respuestas Vocacionales'
     
+    @property
+    def pregunta(self):
+        return self.question.texto
+    
+    @property
+    def respuesta(self):
+        return self.option.texto
+    
     def __str__(self):
-        return f"Respuesta del test {self.test.id} - {self.pregunta[:50]}..."
+        return f"Respuesta del test {self.test_id} - {self.question.texto[:50]}..."
@@ -1,17 +1,62 @@
+from django.db import transaction
+from django.db.models import Prefetch, prefetch_related_objects
 from rest_framework import serializers
-from .models import VocationalTest, VocationalAnswer
+from ascendya.serializers import SparseFieldsMixin
+from .models import VocationalTest, VocationalAnswer, VocationalQuestion, VocationalOption
+from .signals import tests_created
 
 
-class VocationalAnswerSerializer(serializers.ModelSerializer):
+def build_answers(tests_answers):
     """
-    Serializer para las respuestas de tests vocacionales
+    Construye las respuestas de cada (test, [{'pregunta', 'respuesta'}]) con
+    dos consultas para resolver los textos en el banco de preguntas
     """
+    answers_data = [
+        (test, answer_data) for test, answers in tests_answers for answer_data in answers
+    ]
+    questions = VocationalQuestion.objects.resolve(
+        answer_data['pregunta'] for test, answer_data in answers_data
+    )
+    options = VocationalOption.objects.resolve(
+        answer_data['respuesta'] for test, answer_data in answers_data
+    )
+    return [
+        VocationalAnswer(
+            test=test,
+            question_id=questions[answer_data['pregunta']],
+            option_id=options[answer_data['respuesta']]
+        )
+        for test, answer_data in answers_data
+    ]
+
+
+class VocationalAnswerSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """
+    Serializer para las respuestas de tests vocacionales.
+    
+    La pregunta y la respuesta se exponen como texto aunque se guardan como
+    llaves al banco de preguntas.
+    """
+    pregunta = serializers.CharField()
+    respuesta = serializers.CharField()
+    
     class Meta:
         model = VocationalAnswer
         fields = ['id', 'pregunta', 'respuesta']
+        sparse_sources = {'pregunta': ['question'], 'respuesta': ['option']}
+    
+    def update(self, instance, validated_data):
+        if 'pregunta' in validated_data:
+            texto = validated_data['pregunta']
+            instance.question_id = VocationalQuestion.objects.resolve([texto])[texto]
+        if 'respuesta' in validated_data:
+            texto = validated_data['respuesta']
+            instance.option_id = VocationalOption.objects.resolve([texto])[texto]
+        instance.save()
+        return instance
 
 
-class VocationalTestSerializer(serializers.ModelSerializer):
+class VocationalTestSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Serializer para los tests vocacionales
     """
@@ -24,6 +69,28 @@ class VocationalTestSerializer(serializers.ModelSerializer):
         read_only_fields = ['user', 'fecha']
 
 
+class VocationalTestBatchCreateSerializer(serializers.ListSerializer):
+    """
+    Serializer para crear varios tests vocacionales en una sola transacción
+    """
+    def create(self, validated_data):
+        user = self.context['request'].user
+        tests_data = [dict(test_data) for test_data in validated_data]
+        answers_data = [test_data.pop('answers') for test_data in tests_data]
+        
+        with transaction.atomic():
+            tests = VocationalTest.objects.bulk_create([
+                VocationalTest(user=test_data.pop('user', user), **test_data)
+                for test_data in tests_data
+            ])
+            VocationalAnswer.objects.bulk_create(
+                build_answers(zip(tests, answers_data)), batch_size=500
+            )
+            tests_created.send(sender=VocationalTest, user=user, tests=tests)
+        
+        return tests
+
+
 class VocationalTestCreateSerializer(serializers.ModelSerializer):
     """
     Serializer para crear tests vocacionales con respuestas
@@ -33,25 +100,44 @@ class VocationalTestCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = VocationalTest
         fields = ['resultado', 'puntaje', 'answers']
+        list_serializer_class = VocationalTestBatchCreateSerializer
     
     def create(self, validated_data):
         answers_data = validated_data.pop('answers')
-        user = self.context['request'].user
-        test = VocationalTest.objects.create(user=user, **validated_data)
+        user = validated_data.pop('user', self.context['request'].user)
         
-        for answer_data in answers_data:
-            VocationalAnswer.objects.create(test=test, **answer_data)
+        with transaction.atomic():
+            test = VocationalTest.objects.create(user=user, **validated_data)
+            VocationalAnswer.objects.bulk_create(build_answers([(test, answers_data)]))
         
         return test
+    
+    def to_representation(self, instance):
+        prefetch_related_objects(
+            [instance], Prefetch('answers', queryset=VocationalAnswer.objects.with_texts())
+        )
+        return super().to_representation(instance)
 
 
-class VocationalTestListSerializer(serializers.ModelSerializer):
+class VocationalTestListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Serializer simplificado para listar tests vocacionales
     """
-    user_name = serializers.CharField(source='user.get_full_name', read_only=True)
-    answers_count = serializers.IntegerField(source='answers.count', read_only=True)
+    user_name = serializers.SerializerMethodField()
+    answers_count = serializers.SerializerMethodField()
     
     class Meta:
         model = VocationalTest
         fields = ['id', 'user_name', 'fecha', 'resultado', 'puntaje', 'answers_count']
+        # Anotados por VocationalTestQuerySet.with_user_name() y with_answers_count()
+        sparse_sources = {'user_name': ['user_name'], 'answers_count': ['answers_count']}
+    
+    def get_user_name(self, obj):
+        # Usar el nombre anotado por el queryset cuando está disponible
+        name = getattr(obj, 'user_name', None)
+        return obj.user.get_full_name() if name is None else name
+    
+    def get_answers_count(self, obj):
+        # Usar el conteo anotado por el queryset cuando está disponible
+        count = getattr(obj, 'answers_count', None)
+        return obj.answers.count() if count is None else count
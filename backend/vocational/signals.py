@@ -0,0 +1,6 @@
+from django.dispatch import Signal
+
+
+# Se envía al crear tests con bulk_create, que no emite post_save.
+# Argumentos: user, tests
+tests_created = Signal()
@@ -1,3 +1,112 @@
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from users.models import User
+from .models import VocationalTest, VocationalAnswer, VocationalQuestion, VocationalOption
+
+
+def build_test(puntaje, questions=3):
+    return {
+        'resultado': 'Ingeniería', 'puntaje': puntaje,
+        'answers': [{'pregunta': f'Pregunta {i}', 'respuesta': 'Sí'} for i in range(questions)]
+    }
+
+
+class VocationalTestSubmissionTests(TestCase):
+    """
+    Verifica la creación de tests vocacionales individual y por lotes
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='aspirante', email='aspirante@example.com', password='secreta123',
+            nombres='María', apellidos='García'
+        )
+        # Banco de preguntas ya cargado, como ocurre tras el primer test
+        VocationalQuestion.objects.resolve(f'Pregunta {i}' for i in range(60))
+        VocationalOption.objects.resolve(['Sí'])
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_create_test_inserts_answers_in_bulk(self):
+        # SAVEPOINT, INSERT test, resumen del dashboard, preguntas, opciones,
+        # INSERT respuestas, RELEASE y lectura de respuestas
+        with self.assertNumQueries(8):
+            response = self.client.post(
+                '/api/vocational/create-test/', build_test(80, questions=60), format='json'
+            )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.data['answers']), 60)
+        self.assertEqual(VocationalAnswer.objects.filter(test__user=self.user).count(), 60)
+
+    def test_batch_creates_every_test(self):
+        payload = [build_test(puntaje) for puntaje in range(10)]
+        with self.assertNumQueries(7):
+            response = self.client.post('/api/vocational/create-tests/', payload, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.data['ids']), 10)
+        tests = VocationalTest.objects.filter(user=self.user)
+        self.assertEqual(tests.count(), 10)
+        self.assertEqual(VocationalAnswer.objects.filter(test__in=tests).count(), 30)
+
+    def test_answers_share_question_bank(self):
+        payload = build_test(70, questions=2)
+        payload['answers'].append({'pregunta': '¿Te gusta dibujar?', 'respuesta': 'Tal vez'})
+        for _ in range(3):
+            self.client.post('/api/vocational/create-test/', payload, format='json')
+        self.assertEqual(VocationalQuestion.objects.filter(texto='¿Te gusta dibujar?').count(), 1)
+        self.assertEqual(VocationalOption.objects.count(), 2)
+
+        test = VocationalTest.objects.filter(user=self.user).first()
+        with self.assertNumQueries(2):
+            response = self.client.get(f'/api/vocational/tests/{test.id}/')
+        self.assertEqual(response.data['answers'][-1], {
+            'id': response.data['answers'][-1]['id'],
+            'pregunta': '¿Te gusta dibujar?', 'respuesta': 'Tal vez'
+        })
+
+    def test_catalog_ignores_surrounding_whitespace(self):
+        ids = VocationalOption.objects.resolve(['Sí ', ' Sí', 'Sí'])
+        self.assertEqual(len(set(ids.values())), 1)
+        self.assertEqual(ids['Sí '], VocationalOption.objects.get(texto='Sí').pk)
+        self.assertEqual(VocationalOption.objects.count(), 1)
+
+        option = VocationalOption(texto='No ')
+        option.save()
+        self.assertEqual(VocationalOption.objects.resolve(['No'])['No'], option.pk)
+
+    def test_answer_update_keeps_text_shape(self):
+        response = self.client.post(
+            '/api/vocational/create-test/', build_test(60, questions=1), format='json'
+        )
+        url = f"/api/vocational/answers/{response.data['answers'][0]['id']}/"
+        response = self.client.patch(url, {'respuesta': 'No'}, format='json')
+        self.assertEqual(response.data['pregunta'], 'Pregunta 0')
+        self.assertEqual(response.data['respuesta'], 'No')
+        self.assertEqual(VocationalOption.objects.get(texto='No').answers.count(), 1)
+
+    def test_batch_is_all_or_nothing(self):
+        payload = [build_test(90), {'resultado': 'Artes', 'answers': []}]
+        response = self.client.post('/api/vocational/create-tests/', payload, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(VocationalTest.objects.exists())
+
+    def test_batch_size_is_limited(self):
+        payload = [build_test(50, questions=1) for _ in range(101)]
+        response = self.client.post('/api/vocational/create-tests/', payload, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_sparse_answers_skip_unused_join(self):
+        self.client.post('/api/vocational/create-test/', build_test(75), format='json')
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get('/api/vocational/answers/', {'fields': 'id,pregunta'})
+        self.assertEqual(
+            sorted(answer['pregunta'] for answer in response.data['results']),
+            [f'Pregunta {i}' for i in range(3)]
+        )
+        self.assertEqual(list(response.data['results'][0]), ['id', 'pregunta'])
+        self.assertNotIn('vocational_options', context.captured_queries[0]['sql'])
@@ -10,6 +10,8 @@ urlpatterns = [
     # Rutas específicas para tests vocacionales
     path('my-tests/', views.MyVocationalTestsView.as_view(), name='my-tests'),
     path('create-test/', views.CreateVocationalTestView.as_view(), name='create-test'),
+    path('create-tests/', views.CreateVocationalTestsBatchView.as_view(), name='create-tests'),
+    path('async/my-tests/', views.AsyncMyVocationalTestsView.as_view(), name='async-my-tests'),
     
     # ViewSets del router
     path('', include(router.urls)),
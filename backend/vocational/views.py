@@ -2,6 +2,10 @@ from rest_framework import generics, viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from ascendya.async_views import AsyncListView
+from ascendya.mixins import SparseQuerysetMixin
+from ascendya.pagination import KeysetPagination
+from users.authentication import STATELESS_READ_AUTHENTICATION
 from .models import VocationalTest, VocationalAnswer
 from .serializers import (
     VocationalTestSerializer, VocationalAnswerSerializer,
@@ -9,7 +13,7 @@ from .serializers import (
 )
 
 
-class VocationalTestViewSet(viewsets.ModelViewSet):
+class VocationalTestViewSet(SparseQuerysetMixin, viewsets.ModelViewSet):
     """
     ViewSet para el manejo de tests vocacionales
     """
@@ -17,9 +21,17 @@ class VocationalTestViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
     
     def get_queryset(self):
+        queryset = VocationalTest.objects.all()
+        if self.action == 'list':
+            if self.wants_field('user_name'):
+                queryset = queryset.with_user_name()
+            if self.wants_field('answers_count'):
+                queryset = queryset.with_answers_count()
+        elif self.action != 'create':
+            queryset = queryset.with_answers()
         if self.request.user.is_staff:
-            return VocationalTest.objects.all()
-        return VocationalTest.objects.filter(user=self.request.user)
+            return queryset
+        return queryset.filter(user=self.request.user)
     
     def get_serializer_class(self):
         if self.action == 'list':
@@ -29,28 +41,38 @@ class VocationalTestViewSet(viewsets.ModelViewSet):
         return VocationalTestSerializer
 
 
-class VocationalAnswerViewSet(viewsets.ModelViewSet):
+class VocationalAnswerViewSet(SparseQuerysetMixin, viewsets.ModelViewSet):
     """
     ViewSet para el manejo de respuestas vocacionales
     """
     serializer_class = VocationalAnswerSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    # Las respuestas se insertan junto con su test, así que el id sigue la fecha
+    keyset_ordering = ('-id',)
     
     def get_queryset(self):
+        queryset = VocationalAnswer.objects.with_texts()
         if self.request.user.is_staff:
-            return VocationalAnswer.objects.all()
-        return VocationalAnswer.objects.filter(test__user=self.request.user)
+            return queryset
+        return queryset.filter(test__user=self.request.user)
 
 
-class MyVocationalTestsView(generics.ListAPIView):
+class MyVocationalTestsView(SparseQuerysetMixin, generics.ListAPIView):
     """
     Vista para listar los tests vocacionales del usuario actual
     """
     serializer_class = VocationalTestListSerializer
     permission_classes = [IsAuthenticated]
+    authentication_classes = STATELESS_READ_AUTHENTICATION
     
     def get_queryset(self):
-        return VocationalTest.objects.filter(user=self.request.user)
+        queryset = VocationalTest.objects.filter(user=self.request.user)
+        if self.wants_field('user_name'):
+            queryset = queryset.with_user_name()
+        if self.wants_field('answers_count'):
+            queryset = queryset.with_answers_count()
+        return queryset
 
 
 class CreateVocationalTestView(generics.CreateAPIView):
@@ -62,3 +84,31 @@ class CreateVocationalTestView(generics.CreateAPIView):
     
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
+
+
+class CreateVocationalTestsBatchView(generics.CreateAPIView):
+    """
+    Vista para crear varios tests vocacionales a la vez (sincronización
+    de laboratorios escolares sin conexión)
+    """
+    serializer_class = VocationalTestCreateSerializer
+    permission_classes = [IsAuthenticated]
+    max_batch_size = 100
+    
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(
+            data=request.data, many=True, allow_empty=False, max_length=self.max_batch_size
+        )
+        serializer.is_valid(raise_exception=True)
+        tests = serializer.save()
+        
+        return Response({
+            'message': f'Se registraron {len(tests)} tests vocacionales',
+            'ids': [test.id for test in tests]
+        }, status=status.HTTP_201_CREATED)
+
+
+# Variante async (ASGI) del listado del usuario; ver ascendya/async_views.py
+
+class AsyncMyVocationalTestsView(AsyncListView):
+    view_class = MyVocationalTestsView
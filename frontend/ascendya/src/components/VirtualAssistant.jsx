@@ -31,6 +31,8 @@ const VirtualAssistant = () => {
   const messagesEndRef = useRef(null);
   const fileInputRef = useRef(null);
   const recognitionRef = useRef(null);
+  // La conversación se guarda en el servidor; solo se conserva su id
+  const conversationIdRef = useRef(null);
 
   // Auto scroll al final cuando hay nuevos mensajes
   const scrollToBottom = () => {
@@ -71,28 +73,50 @@ const VirtualAssistant = () => {
     setMessages((prev) => [...prev, newMessage]);
     setIsLoading(true);
 
-    // Obtener historial para contexto
-    const conversationHistory = messages.slice(-10).map((msg) => ({
-      role: msg.role,
-      content: msg.content,
-    }));
+    const assistantId = Date.now() + 1;
 
     try {
+      // La respuesta se muestra conforme llega del servidor
       const result = await getChatbotResponse(
         inputMessage,
-        conversationHistory,
-        attachedFile
+        conversationIdRef.current,
+        attachedFile,
+        (text) => {
+          setMessages((prev) =>
+            prev.some((msg) => msg.id === assistantId)
+              ? prev.map((msg) =>
+                  msg.id === assistantId ? { ...msg, content: text } : msg
+                )
+              : [
+                  ...prev,
+                  {
+                    id: assistantId,
+                    role: "assistant",
+                    content: text,
+                    timestamp: new Date().toISOString(),
+                  },
+                ]
+          );
+        },
+        // El id se guarda con el evento done, antes de que cierre el stream
+        (conversationId) => {
+          conversationIdRef.current = conversationId;
+        }
       );
 
       if (result.success) {
+        conversationIdRef.current = result.conversationId;
         const assistantMessage = {
-          id: Date.now() + 1,
+          id: assistantId,
           role: "assistant",
           content: result.response,
           timestamp: result.timestamp,
         };
 
-        setMessages((prev) => [...prev, assistantMessage]);
+        setMessages((prev) => [
+          ...prev.filter((msg) => msg.id !== assistantId),
+          assistantMessage,
+        ]);
 
         // Reproducir respuesta por voz si está habilitado
         if (voiceEnabled) {
@@ -100,13 +124,16 @@ const VirtualAssistant = () => {
         }
       } else {
         const errorMessage = {
-          id: Date.now() + 1,
+          id: assistantId,
           role: "assistant",
           content: `Lo siento, hubo un error: ${result.error}. Por favor intenta de nuevo.`,
           timestamp: new Date().toISOString(),
           isError: true,
         };
-        setMessages((prev) => [...prev, errorMessage]);
+        setMessages((prev) => [
+          ...prev.filter((msg) => msg.id !== assistantId),
+          errorMessage,
+        ]);
       }
     } catch (error) {
       const errorMessage = {
@@ -528,7 +555,8 @@ const VirtualAssistant = () => {
             </div>
           ))}
 
-          {isLoading && (
+          {/* La entrada sigue deshabilitada hasta que termina el stream */}
+          {isLoading && messages[messages.length - 1]?.role !== "assistant" && (
             <div className="flex justify-start">
               <div className="bg-slate-800 text-slate-100 p-3 rounded-lg">
                 <div className="flex items-center gap-2">
@@ -1,73 +1,77 @@
-import { GoogleGenerativeAI } from "@google/generative-ai";
-
-const genAI = new GoogleGenerativeAI(import.meta.env.VITE_GEMINI_API_KEY);
-
-// Contexto del asistente virtual
-const ASSISTANT_CONTEXT = `
-Eres un asistente virtual especializado en educación y mentor académico llamado "Ascend AI". 
-Tu función es ayudar a estudiantes que se preparan para exámenes de admisión universitaria y su desarrollo académico.
-
-CARACTERÍSTICAS:
-- Eres amigable, motivador y profesional
-- Proporcionas respuestas claras y estructuradas
-- Te enfocas en educación, estudio y desarrollo personal
-- Puedes analizar documentos académicos cuando se adjunten
-- Ofreces consejos de estudio personalizados
-- Ayudas con dudas específicas de materias
-
-CAPACIDADES:
-- Responder preguntas sobre materias académicas
-- Crear planes de estudio personalizados
-- Analizar documentos y archivos académicos
-- Proporcionar técnicas de estudio
-- Dar consejos motivacionales
-- Explicar conceptos complejos de forma simple
-
-REGLAS:
-- Siempre mantén un tono positivo y motivador
-- Si no sabes algo específico, reconócelo honestamente
-- Sugiere recursos adicionales cuando sea apropiado
-- Enfócate en el aprendizaje efectivo
-- Personaliza tus respuestas según el contexto del usuario
-
-Responde en español de manera conversacional y útil.
-`;
-
+import apiRequest from "./api";
+
+// El asistente responde desde el backend por server-sent events
+// (POST /api/learning/async/assistant/chat/, servido con ASGI). La
+// conversación y sus instrucciones viven en el servidor: cada mensaje solo
+// envía el conversation_id de la respuesta anterior. `onToken` recibe el
+// texto acumulado conforme llega y `onDone` el conversation_id en cuanto el
+// texto termina; el stream puede seguir abierto mientras el servidor resume
+// la conversación.
 export const getChatbotResponse = async (
   message,
-  conversationHistory = [],
-  attachedFile = null
+  conversationId = null,
+  attachedFile = null,
+  onToken = null,
+  onDone = null
 ) => {
   try {
-    const model = genAI.getGenerativeModel({ model: "gemini-1.5-flash" });
-
-    // Construir el historial de conversación
-    let conversationText = "";
-    if (conversationHistory.length > 0) {
-      conversationText =
-        "\n\nHistorial de conversación:\n" +
-        conversationHistory
-          .map((msg) => `${msg.role}: ${msg.content}`)
-          .join("\n");
-    }
-
-    let prompt = `${ASSISTANT_CONTEXT}${conversationText}\n\nUsuario: ${message}`;
-
-    let result;
+    let text = message;
 
     // Si hay un archivo adjunto, procesarlo
     if (attachedFile) {
       const fileText = await readFileAsText(attachedFile);
-      prompt += `\n\nArchivo adjunto (${attachedFile.name}):\n${fileText}`;
+      text += `\n\nArchivo adjunto (${attachedFile.name}):\n${fileText}`;
     }
 
-    result = await model.generateContent(prompt);
-    const response = await result.response;
-    const text = response.text();
+    const body = { message: text };
+    if (conversationId) {
+      body.conversation_id = conversationId;
+    }
+
+    const response = await apiRequest("/learning/async/assistant/chat/", {
+      method: "POST",
+      body: JSON.stringify(body),
+    });
+
+    if (!response || !response.ok) {
+      const data = response ? await response.json().catch(() => ({})) : {};
+      throw new Error(
+        data.detail || data.error || "Error al conectar con el asistente"
+      );
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = "";
+    let fullText = "";
+    let currentConversationId = conversationId;
+
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+
+      buffer += decoder.decode(value, { stream: true });
+      const events = buffer.split("\n\n");
+      buffer = events.pop();
+
+      for (const rawEvent of events) {
+        const { event, data } = parseEvent(rawEvent);
+        if (event === "token") {
+          fullText += data.text;
+          if (onToken) onToken(fullText);
+        } else if (event === "done") {
+          currentConversationId = data.conversation_id;
+          if (onDone) onDone(currentConversationId);
+        } else if (event === "error") {
+          throw new Error(data.error);
+        }
+      }
+    }
 
     return {
       success: true,
-      response: text,
+      response: fullText,
+      conversationId: currentConversationId,
       timestamp: new Date().toISOString(),
     };
   } catch (error) {
@@ -80,6 +84,20 @@ export const getChatbotResponse = async (
   }
 };
 
+// Separa un evento SSE en su nombre y sus datos JSON
+const parseEvent = (rawEvent) => {
+  let event = "message";
+  let data = "";
+  for (const line of rawEvent.split("\n")) {
+    if (line.startsWith("event: ")) {
+      event = line.slice(7);
+    } else if (line.startsWith("data: ")) {
+      data += line.slice(6);
+    }
+  }
+  return { event, data: data ? JSON.parse(data) : {} };
+};
+
 // Función para leer archivos como texto
 const readFileAsText = (file) => {
   return new Promise((resolve, reject) => {